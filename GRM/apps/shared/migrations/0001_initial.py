@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentLookupWatermark',
+            fields=[
+                ('source', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'payment_lookup_watermark',
+            },
+        ),
+        migrations.CreateModel(
+            name='PnrPaymentLookup',
+            fields=[
+                ('pnr', models.CharField(max_length=10, primary_key=True, serialize=False)),
+                ('transaction_master_id', models.IntegerField(default=0)),
+                ('series_group_id', models.IntegerField(default=0)),
+                ('payment_in_percent', models.CharField(default='Y', max_length=1)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'pnr_payment_lookup',
+            },
+        ),
+    ]
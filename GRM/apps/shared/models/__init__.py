@@ -0,0 +1 @@
+from .payment_lookup import PnrPaymentLookup, PaymentLookupWatermark
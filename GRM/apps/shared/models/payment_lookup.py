@@ -0,0 +1,24 @@
+from django.db import models
+
+
+# Precomputed result of the GRM payment-percentage check, one row per PNR.
+# Filled by apps.workflow_app.payment_lookup.refresh_payment_lookup.
+class PnrPaymentLookup(models.Model):
+    pnr = models.CharField(max_length=10, primary_key=True)
+    transaction_master_id = models.IntegerField(default=0)
+    series_group_id = models.IntegerField(default=0)
+    payment_in_percent = models.CharField(max_length=1, default='Y')
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'pnr_payment_lookup'
+
+
+# Highest source row id already applied to pnr_payment_lookup, per source table
+class PaymentLookupWatermark(models.Model):
+    source = models.CharField(max_length=64, primary_key=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'payment_lookup_watermark'
@@ -6,7 +6,8 @@ import json
 
 from .models import (
     NodeType, Workflow, WorkflowExecution, NodeExecution,
-    WorkflowWebhook, WorkflowSchedule, WorkflowTemplate, WorkflowVariable
+    WorkflowWebhook, WorkflowSchedule, WorkflowTemplate, WorkflowVariable,
+    WorkflowWatermark
 )
 
 @admin.register(NodeType)
@@ -163,3 +164,10 @@ class WorkflowVariableAdmin(admin.ModelAdmin):
     list_filter = ['scope', 'is_secret', 'is_encrypted']
     search_fields = ['name', 'description', 'workflow__name']
     readonly_fields = ['created_at', 'updated_at']
+
+@admin.register(WorkflowWatermark)
+class WorkflowWatermarkAdmin(admin.ModelAdmin):
+    list_display = ['workflow', 'key', 'column', 'position', 'updated_at']
+    list_filter = ['column']
+    search_fields = ['workflow__name', 'key']
+    readonly_fields = ['execution_id', 'updated_at']
@@ -1,7 +1,7 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count, Avg
 from django.utils import timezone
@@ -22,6 +22,12 @@ from .serializers import (
     WorkflowVariableSerializer, WorkflowExecuteSerializer
 )
 from .engine import WorkflowEngine
+from .db_pool import pool_enabled, pool_metrics
+from .http_cache import http_cache
+from .http_pool import http_pool_metrics
+from .replicas import replica_monitor
+from .smtp_pool import email_pool_metrics
+from .query_cache import query_cache
 from .tasks import execute_workflow_task
 
 @method_decorator(ensure_csrf_cookie, name='dispatch')
@@ -263,7 +269,7 @@ class WorkflowExecutionViewSet(viewsets.ReadOnlyModelViewSet):
         """Cancel a running execution"""
         execution = self.get_object()
         
-        if execution.status in ['queued', 'running']:
+        if execution.status in ['queued', 'running', 'waiting']:
             execution.status = 'cancelled'
             execution.finished_at = timezone.now()
             execution.calculate_duration()
@@ -275,6 +281,38 @@ class WorkflowExecutionViewSet(viewsets.ReadOnlyModelViewSet):
                 {'error': 'Execution cannot be cancelled'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+    
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        """Resume a failed execution from its last checkpoint"""
+        execution = self.get_object()
+        
+        if 'checkpoint' not in execution.execution_context:
+            return Response(
+                {'error': 'Execution has no checkpoint to resume from'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Only the request that moves the execution out of failed/timeout
+        # queues a resume; an automatic retry does the same
+        queued = WorkflowExecution.objects.filter(
+            id=execution.id,
+            status__in=['failed', 'timeout']
+        ).update(status='queued', finished_at=None)
+        
+        if not queued:
+            return Response(
+                {'error': 'Execution is not failed or is already being resumed'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        execute_workflow_task.delay(str(execution.id), resume=True)
+        
+        return Response({
+            'execution_id': str(execution.id),
+            'status': 'queued',
+            'message': 'Execution resumed from checkpoint'
+        })
 
 @method_decorator(ensure_csrf_cookie, name='dispatch')
 class WorkflowVariableViewSet(viewsets.ModelViewSet):
@@ -380,6 +418,37 @@ def dashboard_stats_api(request):
         'daily_executions': daily_executions
     })
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_pool_stats_api(request):
+    """Get database connection pool metrics and read replica status for this process"""
+    return Response({
+        'enabled': pool_enabled(),
+        'pools': pool_metrics(),
+        'replica': replica_monitor.status()
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def query_cache_stats_api(request):
+    """Get query result cache statistics for this process"""
+    return Response(query_cache.stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def http_pool_stats_api(request):
+    """Get HTTP session pool metrics and HTTP response cache statistics for this process"""
+    return Response({
+        **http_pool_metrics(),
+        'cache': http_cache.stats()
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def email_pool_stats_api(request):
+    """Get email connection pool metrics for this process"""
+    return Response(email_pool_metrics())
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 @ensure_csrf_cookie
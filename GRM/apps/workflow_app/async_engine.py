@@ -0,0 +1,433 @@
+"""
+Asyncio workflow engine - drives many I/O-bound workflow executions from one worker
+"""
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .engine import WorkflowEngine
+from .models import WorkflowExecution
+from .streams import is_stream
+
+logger = logging.getLogger(__name__)
+
+class AsyncWorkflowEngine(WorkflowEngine):
+    """
+    Workflow engine that runs on an asyncio event loop.
+
+    Nodes start as soon as all of their inputs are complete, like the
+    'parallel' mode of WorkflowEngine, and many executions can share one loop.
+    Handlers with supports_async are awaited directly; every other handler's
+    execute() runs on a bounded thread pool. ORM access goes through
+    sync_to_async so it never runs on the event loop thread.
+
+    Pool threads keep their database connections from one handler to the
+    next (dropping broken ones, and those past CONN_MAX_AGE when it is set);
+    close() closes them.
+    """
+
+    def __init__(self, max_sync_workers: Optional[int] = None):
+        super().__init__(execution_mode='parallel')
+        self.max_concurrent_executions = getattr(settings, 'WORKFLOW_ASYNC_MAX_EXECUTIONS', 100)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_sync_workers or getattr(settings, 'WORKFLOW_ASYNC_SYNC_WORKERS', 32),
+            thread_name_prefix='workflow-async'
+        )
+        # Open connections of the pool threads, closed by close()
+        self._thread_connections = set()
+        self._thread_connections_lock = threading.Lock()
+
+    def execute_workflow(self, execution_id: str, resume: bool = False) -> bool:
+        """
+        Execute a complete workflow from synchronous code
+
+        Args:
+            execution_id: UUID of the WorkflowExecution to run
+            resume: Continue from the execution's checkpoint instead of starting over
+
+        Returns:
+            bool: True if successful (or parked until a later resume), False if failed
+        """
+        return asyncio.run(self.execute_workflow_async(execution_id, resume))
+
+    def execute_workflows(self, execution_ids: List[str]) -> Dict[str, bool]:
+        """
+        Execute several workflows concurrently from synchronous code
+
+        Args:
+            execution_ids: UUIDs of the WorkflowExecutions to run
+
+        Returns:
+            Dict mapping execution ID to its success flag
+        """
+        return asyncio.run(self.execute_workflows_async(execution_ids))
+
+    async def execute_workflows_async(self, execution_ids: List[str]) -> Dict[str, bool]:
+        """
+        Execute several workflows concurrently on the running event loop
+
+        At most WORKFLOW_ASYNC_MAX_EXECUTIONS executions are in flight at once.
+
+        Args:
+            execution_ids: UUIDs of the WorkflowExecutions to run
+
+        Returns:
+            Dict mapping execution ID to its success flag
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_executions)
+
+        async def run(execution_id: str) -> bool:
+            async with semaphore:
+                return await self.execute_workflow_async(execution_id)
+
+        try:
+            outcomes = await asyncio.gather(*(run(str(execution_id)) for execution_id in execution_ids))
+        finally:
+            await self._run_db(connections.close_all)
+
+        return dict(zip((str(execution_id) for execution_id in execution_ids), outcomes))
+
+    async def execute_workflow_async(self, execution_id: str, resume: bool = False) -> bool:
+        """
+        Execute a complete workflow on the running event loop
+
+        Args:
+            execution_id: UUID of the WorkflowExecution to run
+            resume: Continue from the execution's checkpoint instead of starting over
+
+        Returns:
+            bool: True if successful (or parked until a later resume), False if failed
+        """
+        try:
+            execution = await self._run_db(self._start_execution, execution_id, resume)
+            if execution is None:
+                return False
+            workflow = execution.workflow
+
+            execution_graph = self._get_execution_plan(workflow).graph
+
+            node_results, run_state = self._load_run_state(execution, resume)
+            execution_context = await self._run_db(self._build_execution_context, execution, workflow)
+
+            success = await self._execute_nodes_async(
+                execution,
+                execution_graph,
+                execution_context,
+                node_results,
+                run_state
+            )
+
+            if success and run_state['park_seconds'] is not None:
+                await self._run_db(self._park_execution, execution, execution_graph, node_results, run_state)
+                return True
+
+            if not success:
+                self._save_checkpoint(execution, execution_graph, node_results, run_state)
+
+            await self._run_db(self._finish_execution, execution, success, node_results)
+            return success
+
+        except Exception as e:
+            await self._run_db(self._fail_execution, execution_id, e, traceback.format_exc())
+            return False
+
+    async def _execute_nodes_async(
+        self,
+        execution: WorkflowExecution,
+        graph: Dict,
+        context: Dict,
+        results: Dict,
+        run_state: Optional[Dict] = None
+    ) -> bool:
+        """
+        Execute nodes as asyncio tasks, starting each node as soon as all of
+        its incoming connections have completed.
+
+        Skip propagation, continue_on_error and parking follow
+        _execute_nodes_parallel.
+        """
+        node_lookup = graph['nodes']
+        order_lookup = {node_id: index for index, node_id in enumerate(graph['execution_order'])}
+
+        run_state = run_state if run_state is not None else self._new_run_state()
+        nodes_to_skip = run_state['nodes_to_skip']
+        completed = run_state['completed']
+        pending_inputs, ready = self._initial_ready_nodes(graph, completed)
+
+        semaphore = asyncio.Semaphore(self.max_parallel_nodes)
+        running = {}
+        batch_runs = set()
+        success = True
+
+        def mark_complete(node_id: str):
+            completed.add(node_id)
+            for connection in graph['outgoing'].get(node_id, []):
+                target = connection['target']
+                pending_inputs[target] -= 1
+                if pending_inputs[target] == 0:
+                    ready.append(target)
+
+        async def run_node(node_def: Dict, node_input: Dict, order_index: int) -> Dict:
+            async with semaphore:
+                return await self._aexecute_single_node(
+                    execution, node_def, node_input, context, order_index, graph
+                )
+
+        def can_schedule() -> bool:
+            return success and run_state['park_seconds'] is None
+
+        while running or (ready and can_schedule()):
+            while ready and can_schedule():
+                node_id = ready.popleft()
+                node_def = node_lookup[node_id]
+                order_index = order_lookup[node_id]
+
+                if node_id in nodes_to_skip:
+                    await self._run_db(
+                        self._create_node_execution_record,
+                        execution, node_def, {}, {}, order_index, 'skipped'
+                    )
+                    mark_complete(node_id)
+                    continue
+
+                try:
+                    node_input = self._prepare_node_input(
+                        node_id, node_def, graph['incoming'], results, context
+                    )
+                except Exception as e:
+                    logger.error(f"Node {node_id} ({node_def.get('name', '')}) execution failed: {str(e)}")
+                    await self._run_db(
+                        self._create_node_execution_record,
+                        execution, node_def, {}, {}, order_index, 'failed', str(e)
+                    )
+                    if not node_def.get('config', {}).get('continue_on_error', False):
+                        success = False
+                    else:
+                        mark_complete(node_id)
+                    continue
+
+                task = asyncio.ensure_future(run_node(node_def, node_input, order_index))
+                running[task] = (node_id, node_input)
+
+            if not running:
+                continue
+
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                node_id, node_input = running.pop(task)
+                node_def = node_lookup[node_id]
+
+                if task in batch_runs:
+                    batch_runs.discard(task)
+                    if self._finish_batch_run(node_id, task, graph, completed):
+                        mark_complete(graph['batch_scopes'][node_id]['merge'])
+                    else:
+                        success = False
+                    continue
+
+                try:
+                    node_result = task.result()
+                except Exception as e:
+                    logger.error(f"Node {node_id} ({node_def.get('name', '')}) execution failed: {str(e)}")
+
+                    # Create failed node execution record
+                    await self._run_db(
+                        self._create_node_execution_record,
+                        execution,
+                        node_def,
+                        node_input,
+                        {},
+                        order_lookup[node_id],
+                        'failed',
+                        str(e)
+                    )
+
+                    if not node_def.get('config', {}).get('continue_on_error', False):
+                        success = False
+                    else:
+                        mark_complete(node_id)
+                    continue
+
+                results[node_id] = node_result
+
+                if 'branch_condition' in node_result:
+                    self._handle_conditional_branching(
+                        node_id,
+                        node_result,
+                        graph,
+                        nodes_to_skip
+                    )
+
+                if 'park_seconds' in node_result:
+                    completed.add(node_id)
+                    run_state['park_seconds'] = max(run_state['park_seconds'] or 0, node_result['park_seconds'])
+                    continue
+
+                if node_id in graph.get('batch_scopes', {}) and 'batches' in node_result:
+                    # The batch body runs its chunks on threads of its own
+                    completed.add(node_id)
+                    task = asyncio.get_running_loop().run_in_executor(
+                        self._executor,
+                        self._execute_batches_threaded,
+                        execution, graph, node_id, context, results
+                    )
+                    running[task] = (node_id, None)
+                    batch_runs.add(task)
+                    continue
+
+                mark_complete(node_id)
+
+        return success
+
+    async def _aexecute_single_node(
+        self,
+        execution: WorkflowExecution,
+        node_def: Dict,
+        node_input: Dict,
+        context: Dict,
+        execution_order: int,
+        graph: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Execute a single node, awaiting async handlers and running sync ones
+        in the thread pool
+
+        Args:
+            execution: WorkflowExecution instance
+            node_def: Node definition
+            node_input: Prepared input data
+            context: Execution context
+            execution_order: Order in execution sequence
+            graph: Execution graph, used for the plan's handler classes and templates
+
+        Returns:
+            Dict containing node execution result
+        """
+        node_id = node_def['id']
+        node_name = node_def.get('name', node_def['type'])
+
+        logger.info(f"Executing node: {node_name} ({node_id})")
+
+        start_time = time.time()
+
+        try:
+            handler, node_config = self._prepare_node_handler(node_def, node_input, context, graph)
+
+            cache_key, result = await self._run_db(self._get_cached_result, node_def, node_config, node_input)
+            cache_hit = result is not None
+
+            if not cache_hit:
+                if handler.supports_async:
+                    result = await handler.aexecute(node_config, node_input, context)
+                else:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        self._executor,
+                        self._run_sync_handler,
+                        handler, node_config, node_input, context
+                    )
+
+                # Ensure result is a dictionary
+                if not isinstance(result, dict):
+                    result = {'data': result}
+
+                if is_stream(result.get('data')):
+                    # Materializing may run the producer's query
+                    await self._run_db(self._route_stream, node_id, result, graph)
+
+                await self._run_db(self._cache_result, cache_key, node_config, result)
+
+            execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+
+            await self._run_db(
+                self._create_node_execution_record,
+                execution,
+                node_def,
+                node_input,
+                result,
+                execution_order,
+                'success',
+                None,
+                execution_time,
+                cache_hit
+            )
+
+            logger.info(f"Node {node_name} executed successfully in {execution_time:.2f}ms" + (" (cached)" if cache_hit else ""))
+            return result
+
+        except Exception as e:
+            execution_time = (time.time() - start_time) * 1000
+            error_msg = str(e)
+
+            logger.error(f"Node {node_name} failed: {error_msg}")
+
+            await self._run_db(
+                self._create_node_execution_record,
+                execution,
+                node_def,
+                node_input,
+                {},
+                execution_order,
+                'failed',
+                error_msg,
+                execution_time
+            )
+
+            raise
+
+    def close(self):
+        """Shut down the thread pool used for synchronous handlers and close its DB connections"""
+        self._executor.shutdown(wait=True)
+
+        with self._thread_connections_lock:
+            thread_connections = list(self._thread_connections)
+            self._thread_connections.clear()
+
+        for connection in thread_connections:
+            # The pool threads have exited, so their connections are closed from this one
+            connection.inc_thread_sharing()
+            try:
+                connection.close()
+            finally:
+                connection.dec_thread_sharing()
+
+    def _run_sync_handler(self, handler, config: Dict, node_input: Dict, context: Dict) -> Dict:
+        """Run a synchronous handler on a pool thread, keeping its DB connections for the next one"""
+        try:
+            return handler.execute(config, node_input, context)
+        finally:
+            self._keep_thread_connections()
+
+    def _keep_thread_connections(self):
+        """
+        Close this pool thread's unusable connections and register the rest for close()
+
+        Like close_old_connections at the end of a request: broken
+        connections are dropped, and with a CONN_MAX_AGE so are connections
+        older than it. With CONN_MAX_AGE 0 (close after every request) a
+        connection stays open until close() instead of being reopened by
+        every handler.
+        """
+        for connection in connections.all():
+            if connection.connection is None:
+                continue
+
+            if connection.settings_dict['CONN_MAX_AGE']:
+                connection.close_if_unusable_or_obsolete()
+            elif connection.errors_occurred and not connection.is_usable():
+                connection.close()
+
+            if connection.connection is not None:
+                with self._thread_connections_lock:
+                    self._thread_connections.add(connection)
+
+    async def _run_db(self, func, *args) -> Any:
+        """Run ORM work off the event loop, on Django's shared sync thread"""
+        return await sync_to_async(func, thread_sensitive=True)(*args)
@@ -0,0 +1,345 @@
+"""
+Database connection pools for node handlers
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+class PooledConnection:
+    """A pooled Django connection wrapper with its pool bookkeeping"""
+
+    __slots__ = ('wrapper', 'created_at', 'last_used')
+
+    def __init__(self, wrapper):
+        self.wrapper = wrapper
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections for one alias.
+
+    Connections are Django DatabaseWrappers created with
+    connections.create_connection, so cursors behave exactly like those of
+    django.db.connection. A checked-out connection belongs to one caller
+    until it is released, which is what lets nodes on parallel branches
+    share the pool. Idle connections are health-checked before reuse and
+    connections older than recycle_seconds are replaced.
+    """
+
+    def __init__(
+        self,
+        alias: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        recycle_seconds: float = 3600,
+        health_check_after: float = 30,
+        timeout: float = 30
+    ):
+        """
+        Args:
+            alias: Database alias
+            min_size: Connections opened when the pool is first used
+            max_size: Maximum open connections (idle and checked out)
+            recycle_seconds: Age after which a connection is replaced
+            health_check_after: Idle time after which a connection is pinged before reuse
+            timeout: Seconds to wait for a free connection when the pool is full
+        """
+        self.alias = alias
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.recycle_seconds = recycle_seconds
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._warmed_up = False
+        self._stats = {
+            'created': 0,
+            'closed': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_ms': 0.0,
+            'timeouts': 0,
+            'max_in_use': 0
+        }
+
+    def acquire(self):
+        """
+        Check out a connection
+
+        Returns:
+            Django DatabaseWrapper, connected
+
+        Raises:
+            TimeoutError: If no connection became free within the timeout
+        """
+        if not self._warmed_up:
+            self._warm_up()
+
+        pooled = None
+        deadline = None
+        wait_start = None
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                if deadline is None:
+                    wait_start = time.monotonic()
+                    deadline = wait_start + self.timeout
+                    self._stats['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    self._stats['wait_ms'] += self.timeout * 1000
+                    raise TimeoutError(
+                        f"No database connection available in the '{self.alias}' pool "
+                        f"(max_size={self.max_size}) after {self.timeout}s"
+                    )
+                self._condition.wait(remaining)
+
+            if wait_start is not None:
+                self._stats['wait_ms'] += (time.monotonic() - wait_start) * 1000
+
+        try:
+            if pooled is None:
+                pooled = self._connect()
+            else:
+                pooled = self._validate(pooled)
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._in_use[id(pooled.wrapper)] = pooled
+            self._stats['checkouts'] += 1
+            self._stats['max_in_use'] = max(self._stats['max_in_use'], len(self._in_use))
+
+        return pooled.wrapper
+
+    def release(self, wrapper):
+        """
+        Return a checked-out connection to the pool
+
+        Connections left in a transaction or in an unusable state after a
+        database error are closed instead of being reused.
+        """
+        with self._condition:
+            pooled = self._in_use.pop(id(wrapper), None)
+        if pooled is None:
+            return
+
+        reusable = not wrapper.in_atomic_block and wrapper.get_autocommit()
+        if reusable and wrapper.errors_occurred:
+            reusable = wrapper.is_usable()
+            wrapper.errors_occurred = False
+
+        if not reusable:
+            self._close(pooled)
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            return
+
+        pooled.last_used = time.monotonic()
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def close_all(self):
+        """Close the idle connections (checked-out ones are closed when released)"""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._warmed_up = False
+            self._condition.notify_all()
+
+        for pooled in idle:
+            self._close(pooled)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current pool state and counters"""
+        with self._condition:
+            return {
+                'alias': self.alias,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                **self._stats
+            }
+
+    def _warm_up(self):
+        """Open min_size connections"""
+        with self._condition:
+            if self._warmed_up:
+                return
+            self._warmed_up = True
+            count = max(0, min(self.min_size - len(self._idle), self.max_size - self._size))
+            self._size += count
+
+        for _ in range(count):
+            try:
+                pooled = self._connect()
+            except Exception as e:
+                logger.warning(f"Could not open connection for the '{self.alias}' pool: {str(e)}")
+                with self._condition:
+                    self._size -= 1
+                continue
+
+            with self._condition:
+                self._idle.append(pooled)
+                self._condition.notify()
+
+    def _connect(self) -> PooledConnection:
+        """Open a new connection"""
+        wrapper = connections.create_connection(self.alias)
+        # Released connections are reused by other threads
+        wrapper.inc_thread_sharing()
+        wrapper.ensure_connection()
+
+        with self._condition:
+            self._stats['created'] += 1
+        return PooledConnection(wrapper)
+
+    def _validate(self, pooled: PooledConnection) -> PooledConnection:
+        """Replace an idle connection that is too old or fails its health check"""
+        now = time.monotonic()
+
+        if self.recycle_seconds and now - pooled.created_at > self.recycle_seconds:
+            self._close(pooled)
+            with self._condition:
+                self._stats['recycled'] += 1
+            return self._connect()
+
+        if now - pooled.last_used > self.health_check_after and not pooled.wrapper.is_usable():
+            self._close(pooled)
+            with self._condition:
+                self._stats['health_check_failures'] += 1
+            return self._connect()
+
+        return pooled
+
+    def _close(self, pooled: PooledConnection):
+        """Close a connection, ignoring errors from one that is already broken"""
+        try:
+            pooled.wrapper.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled '{self.alias}' connection: {str(e)}")
+
+        with self._condition:
+            self._stats['closed'] += 1
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Connections checked out by the current thread: alias -> [wrapper, nesting depth]
+_held = threading.local()
+
+def pool_enabled(using: str = 'default') -> bool:
+    """Whether handlers check out connections for an alias from a pool"""
+    return (
+        getattr(settings, 'WORKFLOW_DB_POOL_ENABLED', False) and
+        using in getattr(settings, 'WORKFLOW_DB_POOL_ALIASES', ('default', 'grm'))
+    )
+
+def get_pool(using: str = 'default') -> ConnectionPool:
+    """The process-wide pool for a database alias, created on first use"""
+    pool = _pools.get(using)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(using)
+            if pool is None:
+                pool = _pools[using] = ConnectionPool(
+                    using,
+                    min_size=getattr(settings, 'WORKFLOW_DB_POOL_MIN_SIZE', 1),
+                    max_size=getattr(settings, 'WORKFLOW_DB_POOL_MAX_SIZE', 10),
+                    recycle_seconds=getattr(settings, 'WORKFLOW_DB_POOL_RECYCLE_SECONDS', 3600),
+                    health_check_after=getattr(settings, 'WORKFLOW_DB_POOL_HEALTH_CHECK_AFTER', 30),
+                    timeout=getattr(settings, 'WORKFLOW_DB_POOL_TIMEOUT', 30)
+                )
+    return pool
+
+@contextmanager
+def pooled_connection(using: str = 'default'):
+    """
+    Database connection for the duration of a block
+
+    With pooling enabled for the alias the connection is checked out of its
+    pool and returned afterwards; otherwise this is Django's connection for
+    the current thread. Nested blocks on one thread (a streaming query read
+    by a node that writes, for instance) share the outer block's connection,
+    as they would share Django's, so a thread never waits on itself.
+
+    Args:
+        using: Database alias
+    """
+    if not pool_enabled(using):
+        yield connections[using]
+        return
+
+    held = getattr(_held, 'connections', None)
+    if held is None:
+        held = _held.connections = {}
+
+    entry = held.get(using)
+    if entry is not None:
+        entry[1] += 1
+        try:
+            yield entry[0]
+        finally:
+            entry[1] -= 1
+        return
+
+    pool = get_pool(using)
+    wrapper = pool.acquire()
+    entry = held[using] = [wrapper, 1]
+    try:
+        yield wrapper
+    finally:
+        entry[1] -= 1
+        if held.get(using) is entry:
+            del held[using]
+        pool.release(wrapper)
+
+@contextmanager
+def pooled_cursor(using: str = 'default'):
+    """
+    Cursor on a pooled_connection
+
+    Args:
+        using: Database alias
+    """
+    with pooled_connection(using) as wrapper:
+        with wrapper.cursor() as cursor:
+            yield cursor
+
+def pool_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every pool created in this process, by alias"""
+    return {alias: pool.metrics() for alias, pool in list(_pools.items())}
+
+def close_pools():
+    """Close the idle connections of every pool"""
+    for pool in list(_pools.values()):
+        pool.close_all()
@@ -3,17 +3,27 @@ Workflow Execution Engine - Core engine for running n8n-like workflows
 """
 import time
 import json
+import atexit
 import logging
+import threading
 import traceback
+import weakref
 from typing import Dict, List, Any, Optional, Tuple
+from datetime import timedelta
 from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from django.utils import timezone
-from django.db import transaction
+from django.db import transaction, connections
 from django.conf import settings
 
 from .models import WorkflowExecution, NodeExecution, NodeType
-from .handlers import get_node_handler
+from .handlers import NODE_HANDLERS, get_node_handler
 from .utils import VariableResolver, ExpressionEvaluator
+from .execution_plan import ExecutionPlan, plan_cache
+from .node_cache import result_cache
+from .streams import is_stream
+from .tables import is_table, as_records, to_records
+from .watermarks import commit_watermarks
 
 logger = logging.getLogger(__name__)
 
@@ -22,102 +32,357 @@ class WorkflowEngine:
     Main workflow execution engine that processes workflows node by node
     """
     
-    def __init__(self):
+    def __init__(self, execution_mode: Optional[str] = None):
         self.variable_resolver = VariableResolver()
         self.expression_evaluator = ExpressionEvaluator()
+        # 'sequential' walks execution_order one node at a time, 'parallel' runs
+        # every node whose inputs are complete on a bounded thread pool
+        self.execution_mode = execution_mode or getattr(settings, 'WORKFLOW_EXECUTION_MODE', 'sequential')
+        self.max_parallel_nodes = getattr(settings, 'WORKFLOW_MAX_PARALLEL_NODES', 8)
+        # 'immediate' inserts one NodeExecution per node, 'buffered' collects them
+        # per execution and writes them with bulk_create
+        self.node_persistence = getattr(settings, 'WORKFLOW_NODE_PERSISTENCE', 'immediate')
+        self._record_buffers = {}
     
-    def execute_workflow(self, execution_id: str) -> bool:
+    def execute_workflow(self, execution_id: str, resume: bool = False) -> bool:
         """
         Execute a complete workflow
         
         Args:
             execution_id: UUID of the WorkflowExecution to run
+            resume: Continue from the execution's checkpoint instead of starting over
             
         Returns:
-            bool: True if successful, False if failed
+            bool: True if successful (or parked until a later resume), False if failed
         """
         try:
-            execution = WorkflowExecution.objects.select_related('workflow').get(id=execution_id)
+            execution = self._start_execution(execution_id, resume)
+            if execution is None:
+                return False
             workflow = execution.workflow
             
-            logger.info(f"Starting execution of workflow '{workflow.name}' (ID: {execution_id})")
+            execution_graph = self._get_execution_plan(workflow).graph
             
-            execution.status = 'running'
-            execution.save()
+            node_results, run_state = self._load_run_state(execution, resume)
+            execution_context = self._build_execution_context(execution, workflow)
             
-            definition = workflow.definition
-            if not definition or 'nodes' not in definition:
-                raise ValueError("Invalid workflow definition - no nodes found")
+            if self.execution_mode == 'parallel':
+                success = self._execute_nodes_parallel(
+                    execution,
+                    execution_graph,
+                    execution_context,
+                    node_results,
+                    run_state
+                )
+            else:
+                success = self._execute_nodes(
+                    execution, 
+                    execution_graph, 
+                    execution_context,
+                    node_results,
+                    run_state
+                )
             
-            nodes = definition['nodes']
-            connections = definition.get('connections', [])
+            if success and run_state['park_seconds'] is not None:
+                self._park_execution(execution, execution_graph, node_results, run_state)
+                return True
             
-            if not nodes:
-                raise ValueError("Workflow has no nodes to execute")
+            if not success:
+                # Keep the completed nodes so a resume only reruns the failed tail
+                self._save_checkpoint(execution, execution_graph, node_results, run_state)
             
-            execution_graph = self._build_execution_graph(nodes, connections)
+            self._finish_execution(execution, success, node_results)
+            return success
             
-            node_results = {}
-            execution_context = {
-                'workflow_id': str(workflow.id),
-                'execution_id': str(execution.id),
-                'input_data': execution.input_data,
-                'variables': self._load_workflow_variables(workflow),
-                'test_mode': execution.execution_context.get('test_mode', False)
-            }
+        except Exception as e:
+            self._fail_execution(execution_id, e, traceback.format_exc())
+            return False
+    
+    def _start_execution(self, execution_id: str, resume: bool = False) -> Optional[WorkflowExecution]:
+        """
+        Load an execution, mark it as running and set up its record buffer
+        
+        Args:
+            execution_id: UUID of the WorkflowExecution to run
+            resume: Whether the execution is being resumed from its checkpoint
             
-            success = self._execute_nodes(
-                execution, 
-                execution_graph, 
-                execution_context,
-                node_results
-            )
+        Returns:
+            WorkflowExecution with its workflow loaded, or None if a resumed
+            execution is not queued or parked (e.g. cancelled, finished, or
+            already resumed by another task)
+        """
+        execution = WorkflowExecution.objects.select_related('workflow').get(id=execution_id)
+        
+        if resume:
+            # Claim the execution, so only one of several resumes of the same
+            # checkpoint runs the nodes after it
+            claimed = WorkflowExecution.objects.filter(
+                id=execution_id,
+                status__in=('queued', 'waiting')
+            ).update(status='running', finished_at=None, error_message='', error_details={})
+            
+            if not claimed:
+                logger.info(f"Not resuming execution {execution_id} with status '{execution.status}'")
+                return None
             
-            execution.status = 'success' if success else 'failed'
+            logger.info(f"Resuming execution of workflow '{execution.workflow.name}' (ID: {execution_id})")
+            execution.status = 'running'
+            execution.finished_at = None
+            execution.error_message = ''
+            execution.error_details = {}
+        else:
+            logger.info(f"Starting execution of workflow '{execution.workflow.name}' (ID: {execution_id})")
+            execution.status = 'running'
+            execution.save()
+        
+        if self.node_persistence == 'buffered':
+            self._record_buffers[str(execution.id)] = NodeExecutionBuffer(
+                batch_size=getattr(settings, 'WORKFLOW_NODE_BUFFER_SIZE', 100),
+                flush_interval=getattr(settings, 'WORKFLOW_NODE_BUFFER_FLUSH_SECONDS', 10)
+            )
+        
+        return execution
+    
+    def _build_execution_context(self, execution: WorkflowExecution, workflow) -> Dict:
+        """Build the context shared by every node of an execution"""
+        return {
+            'workflow_id': str(workflow.id),
+            'execution_id': str(execution.id),
+            'input_data': execution.input_data,
+            'variables': self._load_workflow_variables(workflow),
+            'test_mode': execution.execution_context.get('test_mode', False)
+        }
+    
+    def _finish_execution(self, execution: WorkflowExecution, success: bool, node_results: Dict):
+        """Persist the final status and output of an execution"""
+        self._flush_node_records(execution.id)
+        
+        if success:
+            execution.execution_context.pop('checkpoint', None)
+            if not execution.execution_context.get('test_mode', False):
+                commit_watermarks(str(execution.workflow_id), str(execution.id), node_results)
+        
+        execution.status = 'success' if success else 'failed'
+        execution.finished_at = timezone.now()
+        execution.calculate_duration()
+        execution.output_data = self._sanitize_data_for_storage(node_results)
+        execution.save()
+        
+        logger.info(f"Workflow execution completed with status: {execution.status}")
+    
+    def _fail_execution(self, execution_id: str, error: Exception, error_traceback: str):
+        """
+        Mark an execution as failed after an unexpected error
+        
+        Args:
+            execution_id: UUID of the WorkflowExecution
+            error: The exception that stopped the execution
+            error_traceback: Formatted traceback of the error
+        """
+        logger.error(f"Workflow execution failed: {str(error)}")
+        logger.error(error_traceback)
+        
+        self._flush_node_records(execution_id)
+        
+        try:
+            execution = WorkflowExecution.objects.get(id=execution_id)
+            execution.status = 'failed'
             execution.finished_at = timezone.now()
-            execution.calculate_duration()
-            execution.output_data = self._sanitize_data_for_storage(node_results)
+            execution.error_message = str(error)
+            execution.error_details = { 'error_type': type(error).__name__, 'traceback': error_traceback }
             execution.save()
+        except WorkflowExecution.DoesNotExist:
+            pass
+
+    def _new_run_state(self) -> Dict:
+        """
+        Create the mutable state the node executors share with the engine
+        
+        completed holds nodes whose downstream nodes may run, nodes_to_skip the
+        nodes cut off by branching, and park_seconds is set when a node asks
+        for the execution to be parked.
+        """
+        return {
+            'completed': set(),
+            'nodes_to_skip': set(),
+            'position': 0,
+            'park_seconds': None
+        }
+    
+    def _load_run_state(self, execution: WorkflowExecution, resume: bool = False) -> Tuple[Dict, Dict]:
+        """
+        Restore node results and run state from the execution's checkpoint
+        
+        Args:
+            execution: WorkflowExecution instance
+            resume: Whether to use the checkpoint at all
             
-            logger.info(f"Workflow execution completed with status: {execution.status}")
-            return success
-            
-        except Exception as e:
-            logger.error(f"Workflow execution failed: {str(e)}")
-            logger.error(traceback.format_exc())
-            
-            try:
-                execution = WorkflowExecution.objects.get(id=execution_id)
-                execution.status = 'failed'
-                execution.finished_at = timezone.now()
-                execution.error_message = str(e)
-                execution.error_details = { 'error_type': type(e).__name__, 'traceback': traceback.format_exc() }
-                execution.save()
-            except WorkflowExecution.DoesNotExist:
-                pass
+        Returns:
+            Tuple of (node results, run state)
+        """
+        run_state = self._new_run_state()
+        checkpoint = execution.execution_context.get('checkpoint') if resume else None
+        
+        if not checkpoint:
+            if resume:
+                logger.warning(f"Execution {execution.id} has no checkpoint, running it from the start")
+            return {}, run_state
+        
+        if checkpoint.get('workflow_version') != execution.workflow.version:
+            raise ValueError("Workflow definition changed since the execution checkpoint was taken")
+        
+        run_state['completed'] = set(checkpoint.get('completed', []))
+        run_state['nodes_to_skip'] = set(checkpoint.get('nodes_to_skip', []))
+        run_state['position'] = checkpoint.get('position', 0)
+        
+        return dict(checkpoint.get('results', {})), run_state
+    
+    def _save_checkpoint(
+        self,
+        execution: WorkflowExecution,
+        graph: Dict,
+        results: Dict,
+        run_state: Dict,
+        **extra
+    ):
+        """
+        Store node results and run state in execution_context['checkpoint']
+        
+        Unlike node records, results are stored in full so downstream nodes
+        get the same input after a resume.
+        
+        Args:
+            execution: WorkflowExecution instance
+            graph: Execution graph
+            results: Results of the nodes run so far
+            run_state: Run state from the node executor
+            **extra: Additional checkpoint fields
+        """
+        completed = set(run_state['completed'])
+        checkpoint_results = {}
+        
+        for node_id, result in results.items():
+            if isinstance(result, dict) and is_stream(result.get('data')):
+                consumers = graph['outgoing'].get(node_id, [])
+                if consumers and consumers[0]['target'] in completed:
+                    # The only consumer has read the stream already
+                    result = {**result, 'data': []}
+                else:
+                    # A stream cannot be stored, run its producer again on resume
+                    completed.discard(node_id)
+                    continue
+            checkpoint_results[node_id] = result
+        
+        position = next(
+            (index for index, node_id in enumerate(graph['execution_order']) if node_id not in completed),
+            len(graph['execution_order'])
+        )
+        
+        execution.execution_context['checkpoint'] = {
+            'workflow_version': execution.workflow.version,
+            'results': json.loads(json.dumps(checkpoint_results, default=str)),
+            'completed': sorted(completed),
+            'nodes_to_skip': sorted(run_state['nodes_to_skip']),
+            'position': position,
+            'saved_at': timezone.now().isoformat(),
+            **extra
+        }
+    
+    def _park_execution(self, execution: WorkflowExecution, graph: Dict, results: Dict, run_state: Dict):
+        """
+        Checkpoint a parked execution and schedule its continuation
+        
+        The worker is released right away; execute_workflow_task resumes the
+        execution from the checkpoint once the park delay has passed.
+        
+        Args:
+            execution: WorkflowExecution instance
+            graph: Execution graph
+            results: Results of the nodes run so far
+            run_state: Run state with park_seconds set
+        """
+        from .tasks import execute_workflow_task
+        
+        self._flush_node_records(execution.id)
+        
+        park_seconds = max(0, run_state['park_seconds'])
+        resume_at = timezone.now() + timedelta(seconds=park_seconds)
+        
+        self._save_checkpoint(execution, graph, results, run_state, resume_at=resume_at.isoformat())
+        execution.status = 'waiting'
+        execution.save()
+        
+        execute_workflow_task.apply_async(
+            args=[str(execution.id)],
+            kwargs={'resume': True},
+            countdown=park_seconds
+        )
+        
+        logger.info(f"Execution {execution.id} parked until {resume_at.isoformat()}")
+    
+    def _get_execution_plan(self, workflow) -> ExecutionPlan:
+        """
+        Get the compiled execution plan for a workflow, building it on a cache miss
+        
+        Args:
+            workflow: Workflow instance
             
-            return False
-
+        Returns:
+            ExecutionPlan for the workflow's current version
+        """
+        plan = plan_cache.get(workflow)
+        if plan is not None:
+            return plan
+        
+        definition = workflow.definition
+        if not definition or 'nodes' not in definition:
+            raise ValueError("Invalid workflow definition - no nodes found")
+        
+        nodes = definition['nodes']
+        connections = definition.get('connections', [])
+        
+        if not nodes:
+            raise ValueError("Workflow has no nodes to execute")
+        
+        plan = ExecutionPlan(
+            ExecutionPlan.get_version_key(workflow),
+            self._build_execution_graph(nodes, connections)
+        )
+        plan_cache.set(workflow, plan)
+        
+        return plan
+    
     def _execute_nodes(
         self, 
         execution: WorkflowExecution,
         graph: Dict,
         context: Dict,
-        results: Dict
+        results: Dict,
+        run_state: Optional[Dict] = None
     ) -> bool:
         """
         Execute nodes in the correct order, handling conditional branching.
+        
+        Execution starts at run_state['position'] and stops after a node that
+        asks to be parked (its result carries park_seconds).
         """
         execution_order = graph['execution_order']
         node_lookup = graph['nodes']
         
-        nodes_to_skip = set()
+        run_state = run_state if run_state is not None else self._new_run_state()
+        nodes_to_skip = run_state['nodes_to_skip']
+        completed = run_state['completed']
 
-        for order_index, node_id in enumerate(execution_order):
+        for order_index in range(run_state['position'], len(execution_order)):
+            node_id = execution_order[order_index]
+            if node_id in completed:
+                continue
+            
             if node_id in nodes_to_skip:
                 self._create_node_execution_record(
                     execution, node_lookup[node_id], {}, {}, order_index, 'skipped'
                 )
+                completed.add(node_id)
                 continue
 
             node_def = node_lookup[node_id]
@@ -128,7 +393,7 @@ class WorkflowEngine:
                 )
                 
                 node_result = self._execute_single_node(
-                    execution, node_def, node_input, context, order_index
+                    execution, node_def, node_input, context, order_index, graph
                 )
                 
                 results[node_id] = node_result
@@ -142,6 +407,21 @@ class WorkflowEngine:
                         nodes_to_skip
                     )
                 
+                completed.add(node_id)
+                
+                # A split node runs its batch body and merge node right away
+                if node_id in graph.get('batch_scopes', {}) and 'batches' in node_result:
+                    scope = graph['batch_scopes'][node_id]
+                    batch_success = self._execute_batches(execution, graph, node_id, context, results)
+                    completed.update(scope['body'])
+                    completed.add(scope['merge'])
+                    if not batch_success:
+                        return False
+                
+                if 'park_seconds' in node_result:
+                    run_state['park_seconds'] = node_result['park_seconds']
+                    return True
+                
             except Exception as e:
                 logger.error(f"Node {node_id} ({node_def.get('name', '')}) execution failed: {str(e)}")
                 
@@ -159,9 +439,406 @@ class WorkflowEngine:
                 # Stop execution if configured to do so.
                 if not node_def.get('config', {}).get('continue_on_error', False):
                     return False
+                
+                completed.add(node_id)
+        
+        return True
+        
+    def _execute_nodes_parallel(
+        self,
+        execution: WorkflowExecution,
+        graph: Dict,
+        context: Dict,
+        results: Dict,
+        run_state: Optional[Dict] = None
+    ) -> bool:
+        """
+        Execute nodes concurrently, starting each node as soon as all of its
+        incoming connections have completed.
+        
+        Skipped branches and continue_on_error behave as in _execute_nodes:
+        a failed node stops scheduling new nodes (running ones are allowed to
+        finish) unless it is configured to continue on error. A parked node
+        stops scheduling the same way, without failing the execution.
+        """
+        node_lookup = graph['nodes']
+        order_lookup = {node_id: index for index, node_id in enumerate(graph['execution_order'])}
+        
+        run_state = run_state if run_state is not None else self._new_run_state()
+        nodes_to_skip = run_state['nodes_to_skip']
+        completed = run_state['completed']
+        pending_inputs, ready = self._initial_ready_nodes(graph, completed)
+        
+        running = {}
+        batch_runs = set()
+        success = True
+        
+        def mark_complete(node_id: str):
+            completed.add(node_id)
+            for connection in graph['outgoing'].get(node_id, []):
+                target = connection['target']
+                pending_inputs[target] -= 1
+                if pending_inputs[target] == 0:
+                    ready.append(target)
+        
+        def can_schedule() -> bool:
+            return success and run_state['park_seconds'] is None
+        
+        with ThreadPoolExecutor(max_workers=self.max_parallel_nodes, thread_name_prefix='workflow-node') as pool:
+            while running or (ready and can_schedule()):
+                while ready and can_schedule():
+                    node_id = ready.popleft()
+                    node_def = node_lookup[node_id]
+                    order_index = order_lookup[node_id]
+                    
+                    if node_id in nodes_to_skip:
+                        self._create_node_execution_record(
+                            execution, node_def, {}, {}, order_index, 'skipped'
+                        )
+                        mark_complete(node_id)
+                        continue
+                    
+                    try:
+                        node_input = self._prepare_node_input(
+                            node_id, node_def, graph['incoming'], results, context
+                        )
+                    except Exception as e:
+                        logger.error(f"Node {node_id} ({node_def.get('name', '')}) execution failed: {str(e)}")
+                        self._create_node_execution_record(
+                            execution, node_def, {}, {}, order_index, 'failed', str(e)
+                        )
+                        if not node_def.get('config', {}).get('continue_on_error', False):
+                            success = False
+                        else:
+                            mark_complete(node_id)
+                        continue
+                    
+                    future = pool.submit(
+                        self._execute_single_node_threaded,
+                        execution, node_def, node_input, context, order_index, graph
+                    )
+                    running[future] = (node_id, node_input)
+                
+                if not running:
+                    continue
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    node_id, node_input = running.pop(future)
+                    node_def = node_lookup[node_id]
+                    
+                    if future in batch_runs:
+                        batch_runs.discard(future)
+                        if self._finish_batch_run(node_id, future, graph, completed):
+                            mark_complete(graph['batch_scopes'][node_id]['merge'])
+                        else:
+                            success = False
+                        continue
+                    
+                    try:
+                        node_result = future.result()
+                    except Exception as e:
+                        logger.error(f"Node {node_id} ({node_def.get('name', '')}) execution failed: {str(e)}")
+                        
+                        # Create failed node execution record
+                        self._create_node_execution_record(
+                            execution,
+                            node_def,
+                            node_input,
+                            {},
+                            order_lookup[node_id],
+                            'failed',
+                            str(e)
+                        )
+                        
+                        if not node_def.get('config', {}).get('continue_on_error', False):
+                            success = False
+                        else:
+                            mark_complete(node_id)
+                        continue
+                    
+                    results[node_id] = node_result
+                    
+                    # Descendants of this node cannot be ready yet, so the skip
+                    # set is always complete before they are scheduled
+                    if 'branch_condition' in node_result:
+                        self._handle_conditional_branching(
+                            node_id,
+                            node_result,
+                            graph,
+                            nodes_to_skip
+                        )
+                    
+                    if 'park_seconds' in node_result:
+                        # Successors become ready when the execution is resumed
+                        completed.add(node_id)
+                        run_state['park_seconds'] = max(run_state['park_seconds'] or 0, node_result['park_seconds'])
+                        continue
+                    
+                    if node_id in graph.get('batch_scopes', {}) and 'batches' in node_result:
+                        # The body nodes never become ready, the batch run covers them
+                        completed.add(node_id)
+                        future = pool.submit(
+                            self._execute_batches_threaded,
+                            execution, graph, node_id, context, results
+                        )
+                        running[future] = (node_id, None)
+                        batch_runs.add(future)
+                        continue
+                    
+                    mark_complete(node_id)
+        
+        return success
+    
+    def _initial_ready_nodes(self, graph: Dict, completed: set) -> Tuple[Dict[str, int], deque]:
+        """
+        Count the unfinished inputs of every node not yet completed
+        
+        Args:
+            graph: Execution graph
+            completed: Nodes already completed (from a checkpoint)
+            
+        Returns:
+            Tuple of (pending input count per node, deque of nodes ready to run)
+        """
+        pending_inputs = {
+            node_id: sum(
+                1 for connection in graph['incoming'].get(node_id, [])
+                if connection['source'] not in completed
+            )
+            for node_id in graph['execution_order']
+            if node_id not in completed
+        }
+        ready = deque(
+            node_id for node_id in graph['execution_order']
+            if node_id in pending_inputs and pending_inputs[node_id] == 0
+        )
+        return pending_inputs, ready
+    
+    def _execute_single_node_threaded(
+        self,
+        execution: WorkflowExecution,
+        node_def: Dict,
+        node_input: Dict,
+        context: Dict,
+        execution_order: int,
+        graph: Optional[Dict] = None
+    ) -> Dict:
+        """Run _execute_single_node on a pool thread and release its DB connections"""
+        try:
+            return self._execute_single_node(
+                execution, node_def, node_input, context, execution_order, graph
+            )
+        finally:
+            connections.close_all()
+    
+    def _execute_batches(
+        self,
+        execution: WorkflowExecution,
+        graph: Dict,
+        split_id: str,
+        context: Dict,
+        results: Dict
+    ) -> bool:
+        """
+        Run the body of a split_in_batches node once per chunk and then its merge node
+        
+        Chunks run on a thread pool of the split node's parallelism; each
+        chunk runs the body nodes in execution order with the chunk as the
+        split node's data. Only the first WORKFLOW_BATCH_RECORDED_CHUNKS
+        chunks create NodeExecution records, so the records of a batch stay
+        bounded however many chunks it has. The merge node gets the chunk
+        results as a list in chunk order. A failed chunk stops new chunks
+        from starting and fails the merge node.
+        
+        Args:
+            execution: WorkflowExecution instance
+            graph: Execution graph
+            split_id: ID of the split node, whose result holds the chunks
+            context: Execution context
+            results: Results of the nodes run so far; receives the merge result
+            
+        Returns:
+            False if the batch failed and the merge node does not continue on error
+        """
+        scope = graph['batch_scopes'][split_id]
+        merge_id = scope['merge']
+        merge_def = graph['nodes'][merge_id]
+        merge_order = graph['execution_order'].index(merge_id)
+        
+        # The chunks are only needed here, keep them out of checkpoints
+        split_result = dict(results[split_id])
+        batches = split_result.pop('batches')
+        results[split_id] = split_result
+        
+        parallelism = max(1, min(int(split_result.get('parallelism') or 1), len(batches) or 1))
+        recorded_chunks = getattr(settings, 'WORKFLOW_BATCH_RECORDED_CHUNKS', 3)
+        chunk_results = [None] * len(batches)
+        errors = []
+        start_time = time.time()
+        
+        with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix='workflow-batch') as pool:
+            running = {}
+            next_index = 0
+            while running or (next_index < len(batches) and not errors):
+                while next_index < len(batches) and len(running) < parallelism and not errors:
+                    future = pool.submit(
+                        self._run_batch_chunk_threaded,
+                        execution, graph, split_id, batches[next_index], next_index, len(batches),
+                        context, next_index < recorded_chunks
+                    )
+                    running[future] = next_index
+                    next_index += 1
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        chunk_results[index] = future.result()
+                    except Exception as e:
+                        errors.append((index, str(e)))
+        
+        duration_ms = (time.time() - start_time) * 1000
+        logger.info(
+            f"Batch node {split_id} ran {next_index} of {len(batches)} chunks "
+            f"({parallelism} at a time) in {duration_ms:.2f}ms"
+        )
+        
+        merge_input = {
+            'context': context,
+            'workflow_input': context['input_data'],
+            'data': chunk_results
+        }
+        
+        if errors:
+            index, error = min(errors)
+            error_msg = f"{len(errors)} of {len(batches)} batches failed; batch {index}: {error}"
+            logger.error(f"Node {merge_id} ({merge_def.get('name', '')}) execution failed: {error_msg}")
+            self._create_node_execution_record(
+                execution,
+                merge_def,
+                {'batches': len(batches), 'failed': sorted(i for i, _ in errors)},
+                {},
+                merge_order,
+                'failed',
+                error_msg,
+                duration_ms
+            )
+            return merge_def.get('config', {}).get('continue_on_error', False)
+        
+        try:
+            results[merge_id] = self._execute_single_node(
+                execution, merge_def, merge_input, context, merge_order, graph
+            )
+        except Exception:
+            return merge_def.get('config', {}).get('continue_on_error', False)
         
         return True
+    
+    def _execute_batches_threaded(self, *args) -> bool:
+        """Run _execute_batches on a pool thread and release its DB connections"""
+        try:
+            return self._execute_batches(*args)
+        finally:
+            connections.close_all()
+    
+    def _finish_batch_run(self, split_id: str, future, graph: Dict, completed: set) -> bool:
+        """
+        Complete the body of a batch run by a node executor
+        
+        Args:
+            split_id: ID of the split node
+            future: Finished future of _execute_batches
+            graph: Execution graph
+            completed: Completed nodes of the run state
+            
+        Returns:
+            True if the merge node's successors may run
+        """
+        completed.update(graph['batch_scopes'][split_id]['body'])
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Batch of node {split_id} failed: {str(e)}")
+            return False
+    
+    def _run_batch_chunk(
+        self,
+        execution: WorkflowExecution,
+        graph: Dict,
+        split_id: str,
+        chunk: List,
+        index: int,
+        count: int,
+        context: Dict,
+        record: bool
+    ) -> Any:
+        """
+        Run the body of a split node for one chunk
+        
+        Args:
+            execution: WorkflowExecution instance
+            graph: Execution graph
+            split_id: ID of the split node
+            chunk: Items of this chunk
+            index: Position of the chunk
+            count: Number of chunks
+            context: Execution context
+            record: Whether the body nodes create NodeExecution records
+            
+        Returns:
+            Input data of the merge node for this chunk
+        """
+        scope = graph['batch_scopes'][split_id]
+        body = set(scope['body'])
+        order_lookup = {node_id: position for position, node_id in enumerate(graph['execution_order'])}
+        
+        # Templates can refer to {{context.batch.index}}
+        chunk_context = {**context, 'batch': {'index': index, 'count': count, 'size': len(chunk)}}
+        chunk_results = {split_id: {'data': chunk, 'success': True}}
+        nodes_to_skip = set()
         
+        for node_id in scope['body']:
+            if node_id in nodes_to_skip:
+                continue
+            
+            node_def = graph['nodes'][node_id]
+            node_input = self._prepare_node_input(
+                node_id, node_def, graph['incoming'], chunk_results, chunk_context
+            )
+            
+            try:
+                node_result = self._execute_single_node(
+                    execution, node_def, node_input, chunk_context, order_lookup[node_id], graph, record
+                )
+            except Exception:
+                if node_def.get('config', {}).get('continue_on_error', False):
+                    continue
+                raise
+            
+            if 'park_seconds' in node_result:
+                raise ValueError(f"Node {node_id} cannot park the execution inside a batch")
+            
+            chunk_results[node_id] = node_result
+            
+            if 'branch_condition' in node_result:
+                branch_skips = set()
+                self._handle_conditional_branching(node_id, node_result, graph, branch_skips)
+                nodes_to_skip.update(branch_skips & body)
+        
+        merge_id = scope['merge']
+        return self._prepare_node_input(
+            merge_id, graph['nodes'][merge_id], graph['incoming'], chunk_results, chunk_context
+        )['data']
+    
+    def _run_batch_chunk_threaded(self, *args) -> Any:
+        """Run _run_batch_chunk on a pool thread and release its DB connections"""
+        try:
+            return self._run_batch_chunk(*args)
+        finally:
+            connections.close_all()
+    
     def _handle_conditional_branching(
         self,
         node_id: str,
@@ -178,6 +855,11 @@ class WorkflowEngine:
         # Determine which output path was NOT taken
         path_to_skip = 'true_path' if not condition_met else 'false_path'
         
+        # Compiled plans carry the skip set for each branch output
+        if 'branch_skip_sets' in graph:
+            nodes_to_skip.update(graph['branch_skip_sets'].get(node_id, {}).get(path_to_skip, ()))
+            return
+        
         # Find the connection for the path that should be skipped
         for connection in outgoing_connections:
             # Assumes your connection definition includes which output it comes from
@@ -250,9 +932,71 @@ class WorkflowEngine:
             'incoming': dict(incoming),
             'outgoing': dict(outgoing),
             'trigger_nodes': trigger_nodes,
-            'execution_order': execution_order
+            'execution_order': execution_order,
+            'batch_scopes': self._build_batch_scopes(node_lookup, incoming, outgoing, execution_order)
         }
     
+    def _build_batch_scopes(
+        self,
+        node_lookup: Dict[str, Dict],
+        incoming: Dict,
+        outgoing: Dict,
+        execution_order: List[str]
+    ) -> Dict[str, Dict]:
+        """
+        Find the sub-graph each split_in_batches node runs once per chunk
+        
+        The body of a split node is every node reachable from it up to its
+        merge_batches node. The body may only be fed by the split node and
+        other body nodes, and may only lead to other body nodes or the merge.
+        
+        Args:
+            node_lookup: Node definitions by ID
+            incoming: Incoming connections for each node
+            outgoing: Outgoing connections for each node
+            execution_order: Node IDs in execution order
+            
+        Returns:
+            Dict of split node ID -> {'body': body node IDs in execution order, 'merge': merge node ID}
+        """
+        scopes = {}
+        
+        for split_id, split_def in node_lookup.items():
+            if split_def['type'] != 'split_in_batches':
+                continue
+            
+            body = set()
+            merges = set()
+            nodes_to_traverse = deque([split_id])
+            while nodes_to_traverse:
+                current_node_id = nodes_to_traverse.popleft()
+                for connection in outgoing.get(current_node_id, []):
+                    target = connection['target']
+                    if node_lookup[target]['type'] == 'merge_batches':
+                        merges.add(target)
+                    elif target not in body:
+                        if node_lookup[target]['type'] == 'split_in_batches':
+                            raise ValueError(f"Batch node {split_id} contains another split_in_batches node ({target})")
+                        body.add(target)
+                        nodes_to_traverse.append(target)
+            
+            if len(merges) != 1:
+                raise ValueError(f"Batch node {split_id} must lead to exactly one merge_batches node, found {len(merges)}")
+            merge_id = merges.pop()
+            
+            inside = body | {split_id}
+            for node_id in body | {merge_id}:
+                outside = [c['source'] for c in incoming.get(node_id, []) if c['source'] not in inside]
+                if outside:
+                    raise ValueError(f"Node {node_id} in the batch of {split_id} has inputs from outside the batch: {outside}")
+            
+            scopes[split_id] = {
+                'body': [node_id for node_id in execution_order if node_id in body],
+                'merge': merge_id
+            }
+        
+        return scopes
+    
     def _topological_sort(self, nodes: List[Dict], incoming: Dict, outgoing: Dict) -> List[str]:
         """
         Perform topological sort to determine execution order
@@ -335,13 +1079,13 @@ class WorkflowEngine:
                 # Apply input mapping if defined
                 input_mapping = node_def.get('input_mapping', {})
                 if input_mapping:
-                    mapped_data = self._apply_data_mapping(source_result.get('data', {}), input_mapping)
+                    mapped_data = self._apply_data_mapping(as_records(source_result.get('data', {})), input_mapping)
                     node_input['data'] = mapped_data
                 else:
-                if source_output == 'main' or source_output not in source_result:
-                    node_input['data'] = source_result.get('data', {})
-                else:
-                    node_input['data'] = source_result.get(source_output, {})
+                    if source_output == 'main' or source_output not in source_result:
+                        node_input['data'] = source_result.get('data', {})
+                    else:
+                        node_input['data'] = source_result.get(source_output, {})
             else:
                 node_input['data'] = {}
         else:
@@ -359,6 +1103,9 @@ class WorkflowEngine:
                     else:
                         source_data = source_result.get(source_output, {})
                     
+                    # Merging works on records
+                    source_data = as_records(source_data)
+                    
                     if target_input == 'main':
                         if isinstance(merged_data, dict) and isinstance(source_data, dict):
                             merged_data.update(source_data)
@@ -429,7 +1176,9 @@ class WorkflowEngine:
         node_def: Dict,
         node_input: Dict,
         context: Dict,
-        execution_order: int
+        execution_order: int,
+        graph: Optional[Dict] = None,
+        record: bool = True
     ) -> Dict:
         """
         Execute a single node
@@ -440,6 +1189,8 @@ class WorkflowEngine:
             node_input: Prepared input data
             context: Execution context
             execution_order: Order in execution sequence
+            graph: Execution graph, used for the plan's handler classes and templates
+            record: Whether to create a NodeExecution record for the run
             
         Returns:
             Dict containing node execution result
@@ -453,44 +1204,39 @@ class WorkflowEngine:
         start_time = time.time()
         
         try:
-            # Get node handler
-            handler = get_node_handler(node_type)
-            if not handler:
-                raise ValueError(f"No handler found for node type: {node_type}")
+            handler, node_config = self._prepare_node_handler(node_def, node_input, context, graph)
             
-            # Resolve variables in node configuration
-            node_config = self._resolve_node_config(
-                node_def.get('config', {}),
-                context,
-                node_input
-            )
-            
-            # Add input/output mapping to config
-            node_config['input_mapping'] = node_def.get('input_mapping', {})
-            node_config['output_mapping'] = node_def.get('output_mapping', {})
-            
-            # Execute the node
-            result = handler.execute(node_config, node_input, context)
+            cache_key, result = self._get_cached_result(node_def, node_config, node_input)
+            cache_hit = result is not None
             
-            # Ensure result is a dictionary
-            if not isinstance(result, dict):
-                result = {'data': result}
+            if not cache_hit:
+                # Execute the node
+                result = handler.execute(node_config, node_input, context)
+                
+                # Ensure result is a dictionary
+                if not isinstance(result, dict):
+                    result = {'data': result}
+                
+                self._route_stream(node_id, result, graph)
+                self._cache_result(cache_key, node_config, result)
             
             execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
             
             # Create successful node execution record
-            self._create_node_execution_record(
-                execution,
-                node_def,
-                node_input,
-                result,
-                execution_order,
-                'success',
-                None,
-                execution_time
-            )
+            if record:
+                self._create_node_execution_record(
+                    execution,
+                    node_def,
+                    node_input,
+                    result,
+                    execution_order,
+                    'success',
+                    None,
+                    execution_time,
+                    cache_hit
+                )
             
-            logger.info(f"Node {node_name} executed successfully in {execution_time:.2f}ms")
+            logger.info(f"Node {node_name} executed successfully in {execution_time:.2f}ms" + (" (cached)" if cache_hit else ""))
             return result
             
         except Exception as e:
@@ -500,19 +1246,163 @@ class WorkflowEngine:
             logger.error(f"Node {node_name} failed: {error_msg}")
             
             # Create failed node execution record
-            self._create_node_execution_record(
-                execution,
-                node_def,
-                node_input,
-                {},
-                execution_order,
-                'failed',
-                error_msg,
-                execution_time
-            )
+            if record:
+                self._create_node_execution_record(
+                    execution,
+                    node_def,
+                    node_input,
+                    {},
+                    execution_order,
+                    'failed',
+                    error_msg,
+                    execution_time
+                )
             
             raise
     
+    def _prepare_node_handler(
+        self,
+        node_def: Dict,
+        node_input: Dict,
+        context: Dict,
+        graph: Optional[Dict] = None
+    ) -> Tuple[Any, Dict]:
+        """
+        Instantiate the handler for a node and resolve its configuration
+        
+        Columnar input data is converted in node_input for handlers without
+        supports_columnar.
+        
+        Args:
+            node_def: Node definition
+            node_input: Prepared input data
+            context: Execution context
+            graph: Execution graph, used for the plan's handler classes and templates
+            
+        Returns:
+            Tuple of (handler instance, resolved node config)
+        """
+        node_id = node_def['id']
+        node_type = node_def['type']
+        graph = graph or {}
+        
+        # Get node handler
+        handler_class = graph.get('handler_classes', {}).get(node_id)
+        handler = handler_class() if handler_class else get_node_handler(node_type)
+        if not handler:
+            raise ValueError(f"No handler found for node type: {node_type}")
+        
+        # Columnar input becomes a list of dicts for handlers (and config
+        # templates) that do not read it directly
+        if not handler.supports_columnar and is_table(node_input.get('data')):
+            node_input['data'] = to_records(node_input['data'])
+        
+        # Resolve variables in node configuration
+        compiled_configs = graph.get('compiled_configs')
+        if compiled_configs is not None and node_id not in compiled_configs:
+            # Nothing to resolve, the plan found no templates in this config
+            node_config = dict(node_def.get('config', {}))
+        elif compiled_configs is not None:
+            node_config = self.variable_resolver.render_config(
+                compiled_configs[node_id],
+                context,
+                node_input
+            )
+        else:
+            node_config = self._resolve_node_config(
+                node_def.get('config', {}),
+                context,
+                node_input
+            )
+        
+        # Keys the handler renders itself keep their templates
+        raw_config = node_def.get('config', {})
+        for key in handler.deferred_config_keys(raw_config):
+            if key in raw_config:
+                node_config[key] = raw_config[key]
+        
+        # Add input/output mapping to config
+        node_config['input_mapping'] = node_def.get('input_mapping', {})
+        node_config['output_mapping'] = node_def.get('output_mapping', {})
+        
+        return handler, node_config
+    
+    def _get_cached_result(self, node_def: Dict, node_config: Dict, node_input: Dict) -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        Look up a memoized result for nodes configured with cache_ttl
+        
+        Args:
+            node_def: Node definition
+            node_config: Resolved node configuration
+            node_input: Prepared input data
+            
+        Returns:
+            Tuple of (cache key or None if the node is not cached, cached result or None)
+        """
+        try:
+            cache_ttl = float(node_config.get('cache_ttl') or 0)
+        except (ValueError, TypeError):
+            cache_ttl = 0
+        
+        if cache_ttl <= 0 or is_stream(node_input.get('data')):
+            return None, None
+        
+        cache_key = result_cache.make_key(node_def['type'], node_config, node_input)
+        if cache_key is None:
+            return None, None
+        
+        return cache_key, result_cache.get(cache_key)
+    
+    def _cache_result(self, cache_key: Optional[str], node_config: Dict, result: Dict):
+        """Store a successful node result under the key from _get_cached_result"""
+        if cache_key is None or result.get('success') is False or 'park_seconds' in result:
+            return
+        
+        if is_stream(result.get('data')):
+            return
+        
+        result_cache.set(cache_key, result, float(node_config['cache_ttl']))
+    
+    def _route_stream(self, node_id: str, result: Dict, graph: Optional[Dict] = None):
+        """
+        Materialize a streamed result unless its consumer can read it lazily
+        
+        A RecordStream can be read only once, so it is kept only when the
+        node feeds exactly one node, through its main output, and that node
+        has no other inputs, no input_mapping and a handler with
+        supports_streaming (and supports_columnar, for a stream of tables).
+        Otherwise result['data'] becomes a list, or a single table.
+        
+        Args:
+            node_id: ID of the node that produced the result
+            result: Node result, updated in place
+            graph: Execution graph
+        """
+        stream = result.get('data')
+        if not is_stream(stream) or self._can_stream_to_consumer(node_id, stream, graph or {}):
+            return
+        
+        logger.debug(f"Materializing streamed output of node {node_id}")
+        result['data'] = stream.materialize()
+        if result.get('count', 0) is None:
+            result['count'] = stream.record_count
+    
+    def _can_stream_to_consumer(self, node_id: str, stream, graph: Dict) -> bool:
+        """Whether a node's output can be handed to its consumer as a RecordStream"""
+        connections = graph.get('outgoing', {}).get(node_id, [])
+        if len(connections) != 1 or connections[0].get('source_output') != 'main':
+            return False
+        
+        target_id = connections[0]['target']
+        target_def = graph['nodes'][target_id]
+        if len(graph['incoming'].get(target_id, [])) != 1 or target_def.get('input_mapping'):
+            return False
+        
+        handler_class = graph.get('handler_classes', {}).get(target_id) or NODE_HANDLERS.get(target_def['type'])
+        if not handler_class or not handler_class.supports_streaming:
+            return False
+        return handler_class.supports_columnar or not stream.tables
+    
     def _resolve_node_config(self, config: Dict, context: Dict, node_input: Dict) -> Dict:
         """
         Resolve variables and expressions in node configuration
@@ -528,7 +1418,9 @@ class WorkflowEngine:
         resolved_config = {}
         
         for key, value in config.items():
-            if isinstance(value, str):
+            if isinstance(value, str) and '{{' not in value:
+                resolved_config[key] = value
+            elif isinstance(value, str):
                 # Resolve variables and expressions
                 resolved_value = self.variable_resolver.resolve(
                     value, 
@@ -559,7 +1451,8 @@ class WorkflowEngine:
         execution_order: int,
         status: str,
         error_message: Optional[str] = None,
-        duration_ms: Optional[float] = None
+        duration_ms: Optional[float] = None,
+        cache_hit: bool = False
     ):
         """
         Create a NodeExecution record
@@ -573,25 +1466,54 @@ class WorkflowEngine:
             status: Execution status
             error_message: Error message if failed
             duration_ms: Execution duration in milliseconds
+            cache_hit: Whether the result came from the node result cache
+            
+        Returns:
+            The created NodeExecution, or None when the record was buffered
         """
+        record_fields = {
+            'workflow_execution': execution,
+            'node_id': node_def['id'],
+            'node_type': node_def['type'],
+            'node_name': node_def.get('name', node_def['type']),
+            'status': status,
+            'execution_order': execution_order,
+            'started_at': timezone.now(),
+            'finished_at': timezone.now(),
+            'duration_ms': duration_ms,
+            'error_message': error_message or '',
+            'node_config': node_def.get('config', {}),
+            'cache_hit': cache_hit
+        }
+        
+        buffer = self._record_buffers.get(str(execution.id))
+        if buffer is not None:
+            # Serialize now so the record reflects the data at this point of the
+            # run; decoding is deferred to the bulk flush
+            record_fields['input_data'] = self._serialize_for_storage(input_data)
+            record_fields['output_data'] = self._serialize_for_storage(output_data)
+            buffer.add(record_fields)
+            return None
+        
         node_execution = NodeExecution.objects.create(
-            workflow_execution=execution,
-            node_id=node_def['id'],
-            node_type=node_def['type'],
-            node_name=node_def.get('name', node_def['type']),
-            status=status,
-            execution_order=execution_order,
-            started_at=timezone.now(),
-            finished_at=timezone.now(),
-            duration_ms=duration_ms,
             input_data=self._sanitize_data_for_storage(input_data),
             output_data=self._sanitize_data_for_storage(output_data),
-            error_message=error_message or '',
-            node_config=node_def.get('config', {})
+            **record_fields
         )
         
         return node_execution
     
+    def _flush_node_records(self, execution_id):
+        """
+        Flush and release the record buffer of an execution (no-op when unbuffered)
+        
+        Args:
+            execution_id: ID of the WorkflowExecution
+        """
+        buffer = self._record_buffers.pop(str(execution_id), None)
+        if buffer is not None:
+            buffer.close()
+    
     def _sanitize_data_for_storage(self, data: Any) -> Dict:
         """
         Sanitize data for database storage (remove sensitive info, limit size)
@@ -602,20 +1524,31 @@ class WorkflowEngine:
         Returns:
             Sanitized data safe for storage
         """
+        return json.loads(self._serialize_for_storage(data))
+    
+    def _serialize_for_storage(self, data: Any) -> str:
+        """
+        Serialize data to the JSON string stored for it (size limited)
+        
+        Args:
+            data: Data to serialize
+            
+        Returns:
+            JSON string safe for storage
+        """
         if not isinstance(data, (dict, list)):
-            return {'value': str(data)[:1000]}  # Limit string length
+            return json.dumps({'value': str(data)[:1000]})  # Limit string length
         
         try:
-            # Convert to JSON and back to ensure serializability
             json_str = json.dumps(data, default=str)
             
             # Limit size to prevent database issues
             if len(json_str) > 10000:  # 10KB limit
-                return {'_truncated': True, '_size': len(json_str), 'preview': json_str[:1000]}
+                return json.dumps({'_truncated': True, '_size': len(json_str), 'preview': json_str[:1000]})
             
-            return json.loads(json_str)
+            return json_str
         except:
-            return {'_error': 'Could not serialize data', 'type': str(type(data))}
+            return json.dumps({'_error': 'Could not serialize data', 'type': str(type(data))})
     
     def _load_workflow_variables(self, workflow) -> Dict:
         """
@@ -646,6 +1579,111 @@ class WorkflowEngine:
         
         return variables
 
+class NodeExecutionBuffer:
+    """
+    Write-behind buffer for the NodeExecution records of one workflow execution.
+    
+    Records are written with bulk_create when the buffer reaches batch_size,
+    when flush_interval seconds have passed since the last flush, and when the
+    execution finishes or fails. Open buffers are also flushed at interpreter
+    exit so a worker shutting down mid-execution does not lose them.
+    """
+    
+    JSON_FIELDS = ('input_data', 'output_data')
+    
+    _open_buffers = weakref.WeakSet()
+    
+    def __init__(self, batch_size: int = 100, flush_interval: Optional[float] = 10):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._open_buffers.add(self)
+    
+    def add(self, record_fields: Dict[str, Any]):
+        """
+        Queue a record, flushing if the batch size or interval is reached
+        
+        Args:
+            record_fields: NodeExecution field values, JSON fields as serialized strings
+        """
+        with self._lock:
+            self._pending.append(record_fields)
+            flush_due = (
+                len(self._pending) >= self.batch_size or
+                (self.flush_interval and time.monotonic() - self._last_flush >= self.flush_interval)
+            )
+        
+        if flush_due:
+            self.flush()
+    
+    # bulk_create attempts before falling back to one INSERT per record
+    BULK_ATTEMPTS = 2
+    
+    def flush(self) -> int:
+        """
+        Write all queued records
+        
+        The batch is inserted atomically, so a failed attempt writes nothing
+        and can be retried. When every attempt fails, the records are
+        inserted one by one and only the ones that still fail are lost
+        (and logged).
+        
+        Returns:
+            Number of records written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        
+        if not pending:
+            return 0
+        
+        records = []
+        for record_fields in pending:
+            fields = dict(record_fields)
+            for field in self.JSON_FIELDS:
+                fields[field] = json.loads(fields[field])
+            records.append(NodeExecution(**fields))
+        
+        for attempt in range(1, self.BULK_ATTEMPTS + 1):
+            try:
+                with transaction.atomic():
+                    NodeExecution.objects.bulk_create(records, batch_size=self.batch_size)
+                return len(records)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to write {len(records)} buffered node execution records "
+                    f"(attempt {attempt} of {self.BULK_ATTEMPTS}): {str(e)}"
+                )
+        
+        written = 0
+        for record in records:
+            try:
+                record.save(force_insert=True)
+                written += 1
+            except Exception as e:
+                logger.error(
+                    f"Failed to write node execution record for node {record.node_id} "
+                    f"of execution {record.workflow_execution_id}: {str(e)}"
+                )
+        
+        return written
+    
+    def close(self):
+        """Flush remaining records and stop tracking the buffer"""
+        self.flush()
+        self._open_buffers.discard(self)
+    
+    @classmethod
+    def flush_all(cls):
+        """Flush every open buffer (used at interpreter exit)"""
+        for buffer in list(cls._open_buffers):
+            buffer.flush()
+
+atexit.register(NodeExecutionBuffer.flush_all)
+
 class ExecutionTimeout:
     """Context manager for execution timeouts"""
     
@@ -0,0 +1,149 @@
+"""
+Compiled execution plans - precomputed graph structures reused across executions
+"""
+import logging
+from typing import Dict, Optional, Tuple
+from collections import deque
+from django.conf import settings
+
+from .handlers import NODE_HANDLERS
+from .utils import LRUCache, VariableResolver
+
+logger = logging.getLogger(__name__)
+
+class ExecutionPlan:
+    """
+    Everything the engine derives from a workflow definition before running it.
+
+    A plan is built once per workflow version and shared between executions
+    (and threads), so it must be treated as read-only.
+    """
+
+    BRANCH_OUTPUTS = ('true_path', 'false_path')
+
+    def __init__(self, version_key: Tuple, graph: Dict):
+        self.version_key = version_key
+        self.branch_skip_sets = self._build_branch_skip_sets(graph)
+        self.compiled_configs = self._compile_configs(graph['nodes'])
+        self.handler_classes = {
+            node_id: NODE_HANDLERS.get(node_def['type'])
+            for node_id, node_def in graph['nodes'].items()
+        }
+
+        # The engine passes the graph dict around, so expose the precomputed
+        # structures through it as well
+        self.graph = {
+            **graph,
+            'branch_skip_sets': self.branch_skip_sets,
+            'compiled_configs': self.compiled_configs,
+            'handler_classes': self.handler_classes
+        }
+
+    @staticmethod
+    def get_version_key(workflow) -> Tuple:
+        """Key identifying the workflow definition a plan was built from"""
+        updated_at = workflow.updated_at.isoformat() if workflow.updated_at else ''
+        return (str(workflow.id), workflow.version, updated_at)
+
+    def _build_branch_skip_sets(self, graph: Dict) -> Dict[str, Dict[str, frozenset]]:
+        """
+        Precompute, for every branching node, the nodes to skip when each
+        output path is not taken
+
+        Args:
+            graph: Execution graph from WorkflowEngine._build_execution_graph
+
+        Returns:
+            Dict of node_id -> {source_output: frozenset of downstream node IDs}
+        """
+        outgoing = graph['outgoing']
+        skip_sets = {}
+
+        for node_id, connections in outgoing.items():
+            for output in self.BRANCH_OUTPUTS:
+                to_skip = set()
+                for connection in connections:
+                    if connection.get('source_output') != output:
+                        continue
+
+                    nodes_to_traverse = deque([connection['target']])
+                    to_skip.add(connection['target'])
+
+                    while nodes_to_traverse:
+                        current_node_id = nodes_to_traverse.popleft()
+                        for downstream_conn in outgoing.get(current_node_id, []):
+                            downstream_node_id = downstream_conn['target']
+                            if downstream_node_id not in to_skip:
+                                to_skip.add(downstream_node_id)
+                                nodes_to_traverse.append(downstream_node_id)
+
+                if to_skip:
+                    skip_sets.setdefault(node_id, {})[output] = frozenset(to_skip)
+
+        return skip_sets
+
+    def _compile_configs(self, node_lookup: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        Compile the {{ ... }} templates in each node configuration
+
+        Nodes without any template are left out, so the engine can skip
+        variable resolution for them entirely.
+
+        Args:
+            node_lookup: Node definitions by ID
+
+        Returns:
+            Dict of node_id -> config with templates replaced by CompiledTemplate
+        """
+        resolver = VariableResolver()
+        compiled_configs = {}
+
+        for node_id, node_def in node_lookup.items():
+            compiled_config = resolver.compile_config(node_def.get('config', {}))
+            if compiled_config is not None:
+                compiled_configs[node_id] = compiled_config
+
+        return compiled_configs
+
+class ExecutionPlanCache:
+    """
+    Process-wide LRU cache of execution plans, one entry per workflow.
+
+    Entries are validated against the workflow's id/version/updated_at on
+    every lookup, so a plan built before an edit in another process is never
+    reused. The workflow_saved signal drops entries eagerly in this process.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._plans = LRUCache(max_size or getattr(settings, 'WORKFLOW_PLAN_CACHE_SIZE', 256))
+
+    def get(self, workflow) -> Optional[ExecutionPlan]:
+        """Return the cached plan for the workflow's current version, if any"""
+        plan = self._plans.get(str(workflow.id))
+        if plan is not None and plan.version_key == ExecutionPlan.get_version_key(workflow):
+            return plan
+        return None
+
+    def set(self, workflow, plan: ExecutionPlan):
+        """Cache a plan for the workflow"""
+        self._plans.set(str(workflow.id), plan)
+
+    def invalidate(self, workflow_id):
+        """Drop the cached plan for a workflow"""
+        self._plans.delete(str(workflow_id))
+
+    def clear(self):
+        """Drop all cached plans"""
+        self._plans.clear()
+
+plan_cache = ExecutionPlanCache()
+
+def invalidate_execution_plan(workflow_id):
+    """
+    Invalidate the cached execution plan for a workflow
+
+    Args:
+        workflow_id: ID of the workflow whose definition changed
+    """
+    plan_cache.invalidate(workflow_id)
+    logger.debug(f"Invalidated execution plan for workflow {workflow_id}")
@@ -7,6 +7,7 @@ from .trigger_handlers import WebhookTriggerHandler, ScheduleTriggerHandler, Man
 from .data_handlers import DatabaseQueryHandler, HttpRequestHandler, GRMDataHandler, QueryBuilderHandler
 from .transform_handlers import DataTransformHandler, JsonParserHandler
 from .condition_handlers import ConditionHandler, SwitchHandler
+from .batch_handlers import SplitInBatchesHandler, MergeBatchesHandler
 from .action_handlers import EmailSendHandler, SlackNotificationHandler, DelayHandler, WebhookSendHandler, FileWriteHandler, LogHandler
 from .output_handlers import DatabaseSaveHandler, FileExportHandler, ResponseHandler
 from .command_handlers import CommandExecutionHandler, FileOperationHandler
@@ -33,6 +34,10 @@ NODE_HANDLERS = {
     'condition': ConditionHandler,
     'switch': SwitchHandler,
     
+    # Batch handlers
+    'split_in_batches': SplitInBatchesHandler,
+    'merge_batches': MergeBatchesHandler,
+    
     # Action handlers
     'email_send': EmailSendHandler,
     'slack_notification': SlackNotificationHandler,
@@ -3,18 +3,40 @@ Action node handlers for performing operations
 """
 import smtplib
 import requests
+import asyncio
 import time
 import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
 from django.conf import settings
+from django.core.mail import EmailMessage
 from .base import BaseNodeHandler
+from ..http_pool import http_request
+from ..smtp_pool import pooled_email_connection, record_sent
+from ..streams import _is_enabled
 
 class EmailSendHandler(BaseNodeHandler):
-    """Handler for sending emails"""
+    """
+    Handler for sending emails
+    
+    Emails are sent over pooled mail connections. With batch enabled one
+    email is sent per recipient: the recipients setting (a list or
+    comma-separated addresses) or the input list (addresses, or dicts with
+    the address in recipient_field and optional subject/body overrides).
+    Subject and body are then rendered per recipient, with {{input.field}}
+    referring to the recipient's item, and the emails are spread over a
+    few connections.
+    """
+    
+    def deferred_config_keys(self, config: Dict[str, Any]) -> list:
+        if _is_enabled(config.get('batch', False)):
+            return ['subject', 'body']
+        return []
     
     def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        if _is_enabled(config.get('batch', False)):
+            return self._execute_batch(config, input_data, context)
+        
         to_email = config.get('to', '')
         subject = config.get('subject', '')
         body = config.get('body', '')
@@ -23,40 +45,122 @@ class EmailSendHandler(BaseNodeHandler):
         if not to_email:
             raise ValueError("Recipient email is required")
         
-        try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add body
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Send email (using Django's email backend)
-            from django.core.mail import send_mail
-            
-            send_mail(
-                subject=subject,
-                message=body,
-                from_email=from_email,
-                recipient_list=[to_email],
-                fail_silently=False
-            )
-            
-            return {
-                'data': {
-                    'to': to_email,
-                    'subject': subject,
-                    'sent_at': context.get('execution_time', 'now')
-                },
-                'success': True,
-                'message': f'Email sent successfully to {to_email}'
-            }
+        error = self._send_messages([EmailMessage(subject, body, from_email, [to_email])])[0]
+        if error:
+            self.log_execution(f"Email sending failed: {error}", 'error')
+            raise ValueError(f"Failed to send email: {error}")
+        
+        return {
+            'data': {
+                'to': to_email,
+                'subject': subject,
+                'sent_at': context.get('execution_time', 'now')
+            },
+            'success': True,
+            'message': f'Email sent successfully to {to_email}'
+        }
+    
+    def _execute_batch(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send one email per recipient and report each recipient's result
+        
+        Returns:
+            Dict with a per-recipient list of {index, to, success, error}
+        """
+        from_email = config.get('from_email', getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com'))
+        recipient_field = config.get('recipient_field') or 'to'
+        
+        recipients = config.get('recipients')
+        if isinstance(recipients, str):
+            recipients = [address.strip() for address in recipients.split(',') if address.strip()]
+        if not recipients:
+            recipients = input_data.get('data', [])
+            if not isinstance(recipients, list):
+                recipients = [recipients]
+        
+        results = []
+        messages = []
+        for index, item in enumerate(recipients):
+            to_email = item.get(recipient_field) if isinstance(item, dict) else item
+            results.append({'index': index, 'to': to_email or '', 'success': False, 'error': ''})
+            if not to_email or not isinstance(to_email, str):
+                results[-1]['error'] = 'Recipient email is required'
+                continue
             
-        except Exception as e:
-            self.log_execution(f"Email sending failed: {str(e)}", 'error')
-            raise ValueError(f"Failed to send email: {str(e)}")
+            item_input = {'data': item}
+            overrides = item if isinstance(item, dict) else {}
+            subject = overrides.get('subject') or self.render_deferred(config.get('subject', ''), context, item_input)
+            body = overrides.get('body') or self.render_deferred(config.get('body', ''), context, item_input)
+            messages.append((index, EmailMessage(subject, body, from_email, [to_email])))
+        
+        try:
+            connections = max(1, int(config.get('connections') or getattr(settings, 'WORKFLOW_EMAIL_BATCH_CONNECTIONS', 3)))
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid connections: {config.get('connections')}")
+        connections = min(connections, len(messages)) or 1
+        
+        # Every connection sends its share of the messages back to back
+        shares = [messages[offset::connections] for offset in range(connections)]
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            errors = executor.map(lambda share: self._send_messages([message for _, message in share]), shares)
+            for share, share_errors in zip(shares, errors):
+                for (index, _), error in zip(share, share_errors):
+                    results[index]['success'] = not error
+                    results[index]['error'] = error
+        
+        failed = sum(1 for entry in results if not entry['success'])
+        if failed:
+            self.log_execution(f"{failed} of {len(results)} emails failed", 'warning')
+        
+        return {
+            'data': results,
+            'count': len(results),
+            'sent': len(results) - failed,
+            'failed': failed,
+            'success': failed == 0,
+            'message': f"Emails sent to {len(results) - failed} of {len(results)} recipients"
+        }
+    
+    def _send_messages(self, messages: List[EmailMessage]) -> List[str]:
+        """
+        Send messages one after another over pooled connections
+        
+        A message interrupted by a dropped connection is retried once on a
+        new one; other failures (refused recipients...) only fail that message.
+        
+        Returns:
+            Error text per message, '' for a message that was sent
+        """
+        errors = [''] * len(messages)
+        index = 0
+        retried = False
+        
+        while index < len(messages):
+            try:
+                with pooled_email_connection() as pooled:
+                    while index < len(messages) and not pooled.exhausted:
+                        try:
+                            pooled.backend.send_messages([messages[index]])
+                        except smtplib.SMTPServerDisconnected:
+                            raise
+                        except Exception as e:
+                            errors[index] = str(e) or type(e).__name__
+                        else:
+                            record_sent(pooled)
+                        index += 1
+                        retried = False
+            except smtplib.SMTPServerDisconnected as e:
+                if retried:
+                    errors[index] = str(e) or 'Connection unexpectedly closed'
+                    index += 1
+                retried = not retried
+            except Exception as e:
+                # No connection could be opened, so none of the rest can be sent
+                for position in range(index, len(messages)):
+                    errors[position] = str(e) or type(e).__name__
+                break
+        
+        return errors
 
 class SlackNotificationHandler(BaseNodeHandler):
     """Handler for sending Slack notifications"""
@@ -82,7 +186,8 @@ class SlackNotificationHandler(BaseNodeHandler):
             if channel:
                 payload['channel'] = channel
             
-            response = requests.post(
+            response = http_request(
+                'POST',
                 webhook_url,
                 json=payload,
                 timeout=30
@@ -132,9 +237,9 @@ class WebhookSendHandler(BaseNodeHandler):
         try:
             self.log_execution(f"Sending {method} webhook to {url}")
             
-            response = requests.request(
-                method=method,
-                url=url,
+            response = http_request(
+                method,
+                url,
                 json=payload,
                 headers=headers,
                 timeout=timeout
@@ -167,9 +272,42 @@ class WebhookSendHandler(BaseNodeHandler):
             raise ValueError(f"Webhook request failed: {str(e)}")
 
 class DelayHandler(BaseNodeHandler):
-    """Handler for adding delays in workflow execution"""
+    """
+    Handler for adding delays in workflow execution
+    
+    With delay_mode 'park' the handler does not wait itself: its result
+    carries park_seconds and the engine checkpoints the execution and
+    schedules its continuation, so no worker is held during the delay.
+    """
+    
+    supports_async = True
     
     def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        delay_seconds = self._get_delay_seconds(config)
+        
+        if config.get('delay_mode', 'sleep') == 'park':
+            return self._park(delay_seconds, config, input_data)
+        
+        self.log_execution(f"Delaying execution for {delay_seconds} seconds")
+        
+        time.sleep(delay_seconds)
+        
+        return self._build_result(delay_seconds, config, input_data)
+    
+    async def aexecute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        delay_seconds = self._get_delay_seconds(config)
+        
+        if config.get('delay_mode', 'sleep') == 'park':
+            return self._park(delay_seconds, config, input_data)
+        
+        self.log_execution(f"Delaying execution for {delay_seconds} seconds")
+        
+        await asyncio.sleep(delay_seconds)
+        
+        return self._build_result(delay_seconds, config, input_data)
+    
+    def _get_delay_seconds(self, config: Dict[str, Any]) -> float:
+        """Work out the delay from the fixed or random delay settings"""
         delay_seconds = config.get('delay_seconds', 1)
         delay_type = config.get('delay_type', 'fixed')
         
@@ -184,10 +322,19 @@ class DelayHandler(BaseNodeHandler):
             max_delay = config.get('max_delay', 5)
             delay_seconds = random.uniform(float(min_delay), float(max_delay))
         
-        self.log_execution(f"Delaying execution for {delay_seconds} seconds")
+        return delay_seconds
+    
+    def _park(self, delay_seconds: float, config: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Ask the engine to park the execution instead of sleeping"""
+        self.log_execution(f"Parking execution for {delay_seconds} seconds")
         
-        import time
-        time.sleep(delay_seconds)
+        result = self._build_result(delay_seconds, config, input_data)
+        result['park_seconds'] = delay_seconds
+        return result
+    
+    def _build_result(self, delay_seconds: float, config: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the node result after the delay has elapsed"""
+        delay_type = config.get('delay_type', 'fixed')
         
         return {
             'data': {
@@ -3,7 +3,10 @@ Base node handler class
 """
 from abc import ABC, abstractmethod
 from typing import Dict, Any
+import asyncio
+import functools
 import logging
+from ..utils import VariableResolver
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +15,23 @@ class BaseNodeHandler(ABC):
     Base class for all node handlers
     """
     
+    # Set by handlers that override aexecute() with a non-blocking implementation.
+    # AsyncWorkflowEngine awaits those directly and runs execute() of all other
+    # handlers in a thread pool.
+    supports_async = False
+    
+    # Set by handlers that accept a RecordStream as input data and read it
+    # batch by batch. The engine materializes streams into lists for every
+    # other handler.
+    supports_streaming = False
+    
+    # Set by handlers that read columnar input data (tables.make_table)
+    # directly. The engine converts it to a list of dicts for all others.
+    supports_columnar = False
+    
+    # Renders configuration values returned by deferred_config_keys()
+    variable_resolver = VariableResolver()
+    
     def __init__(self):
         self.logger = logger
     
@@ -30,6 +50,27 @@ class BaseNodeHandler(ABC):
         """
         pass
     
+    async def aexecute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Asynchronous variant of execute()
+        
+        The default implementation runs execute() in the event loop's default
+        executor. Handlers that can wait on I/O without blocking override this
+        and set supports_async = True.
+        
+        Args:
+            config: Node configuration (resolved variables)
+            input_data: Input data from previous nodes
+            context: Execution context
+            
+        Returns:
+            Dict containing execution result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.execute, config, input_data, context)
+        )
+    
     def validate_config(self, config: Dict[str, Any]) -> bool:
         """
         Validate node configuration
@@ -42,6 +83,38 @@ class BaseNodeHandler(ABC):
         """
         return True
     
+    def deferred_config_keys(self, config: Dict[str, Any]) -> list:
+        """
+        Get configuration keys the engine passes on with their templates unresolved
+        
+        For handlers that render those templates themselves, e.g. once per
+        input item.
+        
+        Args:
+            config: Raw node configuration
+            
+        Returns:
+            List of top-level configuration keys
+        """
+        return []
+    
+    def render_deferred(self, value: Any, context: Dict[str, Any], input_data: Dict[str, Any]) -> Any:
+        """
+        Resolve the templates of a deferred configuration value
+        
+        Args:
+            value: Raw configuration value (string, dict or list)
+            context: Execution context
+            input_data: Input data to resolve {{input.*}} against, e.g. {'data': item}
+            
+        Returns:
+            Value with its templates resolved
+        """
+        compiled = self.variable_resolver.compile_config(value)
+        if compiled is None:
+            return value
+        return self.variable_resolver.render_config(compiled, context, input_data)
+    
     def get_required_fields(self) -> list:
         """
         Get list of required configuration fields
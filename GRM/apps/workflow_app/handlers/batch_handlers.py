@@ -0,0 +1,113 @@
+"""
+Batch node handlers - split a list into chunks for a per-chunk sub-graph and merge the results
+"""
+from typing import Dict, Any, List
+from django.conf import settings
+from .base import BaseNodeHandler
+
+class SplitInBatchesHandler(BaseNodeHandler):
+    """
+    Handler for split_in_batches nodes
+    
+    Splits the input list into chunks of batch_size items. The engine then
+    runs the nodes between this node and its merge_batches node once per
+    chunk, up to parallelism chunks at a time, and hands the chunk results
+    to the merge node in chunk order.
+    """
+    
+    def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        items = input_data.get('data', [])
+        field = config.get('field')
+        if field:
+            items = self._get_nested_value(items, field)
+        
+        if items is None:
+            items = []
+        elif isinstance(items, dict):
+            items = [items]
+        elif not isinstance(items, list):
+            raise ValueError(f"Input to split must be a list, got {type(items).__name__}")
+        
+        batch_size = self._positive_int(config, 'batch_size', getattr(settings, 'WORKFLOW_BATCH_SIZE', 100))
+        parallelism = self._positive_int(config, 'parallelism', getattr(settings, 'WORKFLOW_BATCH_PARALLELISM', 4))
+        
+        batches = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+        
+        self.log_execution(f"Split {len(items)} items into {len(batches)} batches of up to {batch_size}")
+        
+        return {
+            'data': {
+                'items': len(items),
+                'batches': len(batches),
+                'batch_size': batch_size,
+                'parallelism': parallelism
+            },
+            'success': True,
+            'message': f"Split {len(items)} items into {len(batches)} batches",
+            'batches': batches,  # Used by execution engine to run the batch sub-graph
+            'parallelism': parallelism
+        }
+    
+    def _positive_int(self, config: Dict[str, Any], key: str, default: int) -> int:
+        """Integer config value of at least 1"""
+        value = config.get(key) or default
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid {key}: {value}")
+        if value < 1:
+            raise ValueError(f"{key} must be at least 1, got {value}")
+        return value
+    
+    def _get_nested_value(self, data: Any, path: str) -> Any:
+        """Get nested value using dot notation"""
+        current = data
+        for part in path.split('.'):
+            if isinstance(current, dict) and part in current:
+                current = current[part]
+            else:
+                return None
+        return current
+
+class MergeBatchesHandler(BaseNodeHandler):
+    """
+    Handler for merge_batches nodes
+    
+    Receives the results of every chunk of the matching split_in_batches
+    node as a list, in chunk order. 'concat' mode joins list results into
+    one list (other results are appended as items), 'list' mode keeps one
+    entry per chunk.
+    """
+    
+    def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        chunk_results = input_data.get('data', [])
+        if not isinstance(chunk_results, list):
+            chunk_results = [chunk_results]
+        
+        mode = config.get('mode', 'concat')
+        if mode == 'concat':
+            merged = self._concat(chunk_results)
+        elif mode == 'list':
+            merged = chunk_results
+        else:
+            raise ValueError(f"Unsupported merge mode: {mode}")
+        
+        self.log_execution(f"Merged {len(chunk_results)} batch results into {len(merged)} items")
+        
+        return {
+            'data': merged,
+            'success': True,
+            'message': f"Merged {len(chunk_results)} batch results",
+            'batch_count': len(chunk_results)
+        }
+    
+    def _concat(self, chunk_results: List[Any]) -> List[Any]:
+        """Join list results, appending any other non-empty result as one item"""
+        merged = []
+        for result in chunk_results:
+            if isinstance(result, list):
+                merged.extend(result)
+            elif result not in (None, {}):
+                merged.append(result)
+        return merged
+    
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+Columnar helpers for transform nodes - vectorized operations on record lists
+"""
+from typing import Dict, Any, List, Callable, Hashable
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, transform nodes fall back to row-by-row processing
+    np = None
+
+def is_available() -> bool:
+    """Whether the columnar path can be used (numpy is installed)"""
+    return np is not None
+
+class ColumnarFrame:
+    """
+    Column-oriented view of a list of records.
+
+    Each field is extracted from the records once and cached, then filters
+    and aggregations run on NumPy arrays. Operations reproduce the row-based
+    semantics of DataTransformHandler (None handling, float(value or 0)
+    coercion, min/max of the original values).
+    """
+
+    def __init__(self, records: List[Any], get_value: Callable[[Any, str], Any]):
+        """
+        Args:
+            records: Records to operate on
+            get_value: Dot-path accessor used for nested fields
+        """
+        self.records = records
+        self._get_value = get_value
+        self._columns = {}
+        self._native = {}
+        self._numeric = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, path: str) -> List[Any]:
+        """Values of a field for every record (None where missing)"""
+        if path not in self._columns:
+            get_value = self._get_value
+            if path and '.' not in path:
+                self._columns[path] = [
+                    record.get(path) if type(record) is dict else get_value(record, path)
+                    for record in self.records
+                ]
+            else:
+                self._columns[path] = [get_value(record, path) for record in self.records]
+        return self._columns[path]
+
+    def objects(self, path: str):
+        """Field values as a 1-d object array"""
+        column = self.column(path)
+        return np.fromiter(column, dtype=object, count=len(column))
+
+    def native(self, path: str):
+        """Field values as a typed array, or None if they are not all numbers or all strings"""
+        if path not in self._native:
+            column = self.column(path)
+            try:
+                array = np.asarray(column)
+            except (ValueError, TypeError, OverflowError):
+                array = None
+
+            if array is not None and (array.ndim != 1 or array.dtype.kind not in 'biufU'):
+                array = None
+            elif array is not None and array.dtype.kind == 'U' and not all(type(value) is str for value in column):
+                # numpy turns mixed numbers and strings into strings
+                array = None
+
+            self._native[path] = array
+        return self._native[path]
+
+    def numeric(self, path: str):
+        """Field values coerced as float(value or 0)"""
+        if path not in self._numeric:
+            array = self.native(path)
+            if array is not None and array.dtype.kind in 'biuf':
+                self._numeric[path] = array.astype(float)
+            else:
+                column = self.column(path)
+                self._numeric[path] = np.fromiter(
+                    (float(value or 0) for value in column), dtype=float, count=len(column)
+                )
+        return self._numeric[path]
+
+    def mask(self, path: str, operator: str, expected: Any):
+        """
+        Boolean mask of the records matching a filter condition
+
+        Args:
+            path: Field to test
+            operator: equals, not_equals, contains, greater_than or less_than
+            expected: Value to compare with
+
+        Returns:
+            Boolean array, one entry per record
+        """
+        if operator in ('equals', 'not_equals'):
+            values = None
+            native = self.native(path)
+            if native is not None:
+                if native.dtype.kind == 'U' and isinstance(expected, str):
+                    values = native
+                elif native.dtype.kind in 'biuf' and isinstance(expected, (int, float)) and not isinstance(expected, bool):
+                    values = native
+            if values is None:
+                if not isinstance(expected, (str, int, float, bool, type(None))):
+                    return self._row_mask(path, lambda value: (value == expected) == (operator == 'equals'))
+                values = self.objects(path)
+
+            matches = np.asarray(values == expected, dtype=bool)
+            return matches if operator == 'equals' else ~matches
+
+        if operator == 'contains':
+            needle = str(expected).lower()
+            return self._row_mask(path, lambda value: needle in str(value).lower())
+
+        if operator == 'greater_than':
+            return self.numeric(path) > float(expected or 0)
+
+        if operator == 'less_than':
+            return self.numeric(path) < float(expected or 0)
+
+        return np.zeros(len(self.records), dtype=bool)
+
+    def take(self, mask) -> List[Any]:
+        """Records where the mask is set"""
+        records = self.records
+        return [records[index] for index in np.flatnonzero(mask)]
+
+    def aggregate(self, agg_type: str, path: str) -> Any:
+        """
+        Aggregate a field over all records
+
+        Args:
+            agg_type: count, sum, avg, min or max
+            path: Field to aggregate
+
+        Returns:
+            Aggregated value (same types as the row-based aggregation)
+        """
+        if agg_type == 'sum' and path:
+            return float(self.numeric(path).sum())
+        elif agg_type == 'avg' and path:
+            return float(self.numeric(path).mean()) if len(self.records) else 0
+        elif agg_type in ('min', 'max') and path:
+            native = self.native(path)
+            if native is not None and native.dtype.kind in 'biuf':
+                # Return the original value, like min()/max() on the records would
+                index = native.argmin() if agg_type == 'min' else native.argmax()
+                return self.column(path)[int(index)]
+            values = [value for value in self.column(path) if value is not None]
+            if not values:
+                return None
+            return min(values) if agg_type == 'min' else max(values)
+        return len(self.records)
+
+    def group_aggregate(self, group_path: str, agg_type: str, path: str) -> Dict[Any, Any]:
+        """
+        Aggregate a field per distinct value of another field
+
+        Args:
+            group_path: Field to group by
+            agg_type: count, sum, avg, min or max
+            path: Field to aggregate
+
+        Returns:
+            Dict of group key -> aggregated value, in order of first appearance
+        """
+        codes, keys = self._factorize(group_path)
+        group_count = len(keys)
+        counts = np.bincount(codes, minlength=group_count)
+
+        if agg_type in ('sum', 'avg') and path:
+            sums = np.bincount(codes, weights=self.numeric(path), minlength=group_count)
+            values = sums / counts if agg_type == 'avg' else sums
+            return dict(zip(keys, values.tolist()))
+
+        if agg_type in ('min', 'max') and path:
+            native = self.native(path)
+            if native is not None and native.dtype.kind in 'biuf':
+                # Sort by group, then value (descending for max), then position;
+                # the first record of each group holds the result
+                ranks = np.unique(native, return_inverse=True)[1].ravel()
+                value_order = ranks if agg_type == 'min' else -ranks
+                order = np.lexsort((np.arange(len(codes)), value_order, codes))
+                starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+                column = self.column(path)
+                return {key: column[index] for key, index in zip(keys, order[starts].tolist())}
+
+            pick = min if agg_type == 'min' else max
+            grouped = [[] for _ in keys]
+            for code, value in zip(codes.tolist(), self.column(path)):
+                if value is not None:
+                    grouped[code].append(value)
+            return {key: (pick(values) if values else None) for key, values in zip(keys, grouped)}
+
+        return dict(zip(keys, counts.tolist()))
+
+    def _factorize(self, path: str):
+        """
+        Map each record to the index of its group
+
+        Returns:
+            Tuple of (int array of group codes, list of group keys in order of first appearance)
+        """
+        native = self.native(path)
+        if native is not None:
+            first_index, inverse = np.unique(native, return_index=True, return_inverse=True)[1:]
+            order = np.argsort(first_index)
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            column = self.column(path)
+            return rank[np.ravel(inverse)], [column[index] for index in first_index[order].tolist()]
+
+        index = {}
+        keys = []
+        codes = np.empty(len(self.records), dtype=np.intp)
+        for position, key in enumerate(self.column(path)):
+            key = group_key(key)
+            code = index.get(key)
+            if code is None:
+                code = index[key] = len(keys)
+                keys.append(key)
+            codes[position] = code
+        return codes, keys
+
+    def _row_mask(self, path: str, predicate: Callable[[Any], bool]):
+        """Boolean mask built by testing each value in Python"""
+        column = self.column(path)
+        return np.fromiter((bool(predicate(value)) for value in column), dtype=bool, count=len(column))
+
+def group_key(value: Any) -> Hashable:
+    """Group key for a field value (unhashable values are grouped by their string form)"""
+    return value if isinstance(value, Hashable) else str(value)
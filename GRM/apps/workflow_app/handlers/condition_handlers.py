@@ -5,10 +5,14 @@ import json
 from typing import Dict, Any, List
 from .base import BaseNodeHandler
 from ..utils import ExpressionEvaluator
+from ..tables import is_table, record_at
 
 class ConditionHandler(BaseNodeHandler):
     """Handler for condition nodes that branch workflow execution"""
     
+    # Paths such as '0.status' address rows of columnar data like records
+    supports_columnar = True
+    
     def __init__(self):
         super().__init__()
         self.expression_evaluator = ExpressionEvaluator()
@@ -120,6 +124,8 @@ class ConditionHandler(BaseNodeHandler):
         for part in path.split('.'):
             if isinstance(current, dict) and part in current:
                 current = current[part]
+            elif is_table(current) and part.isdigit():
+                current = record_at(current, int(part))
             elif isinstance(current, list) and part.isdigit():
                 index = int(part)
                 if 0 <= index < len(current):
@@ -175,6 +181,10 @@ class ConditionHandler(BaseNodeHandler):
         """
         operator = operator.lower()
         
+        if is_table(actual) and operator in ('is_empty', 'is_not_empty'):
+            # Columnar data is empty when it has no rows
+            actual = actual['rows']
+        
         if operator == 'equals' or operator == '==':
             return actual == expected
         elif operator == 'not_equals' or operator == '!=':
@@ -205,6 +215,8 @@ class ConditionHandler(BaseNodeHandler):
 class SwitchHandler(BaseNodeHandler):
     """Handler for switch nodes that route to different paths based on value"""
     
+    supports_columnar = True
+    
     def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         switch_field = config.get('switch_field', '')
         cases = config.get('cases', {})
@@ -273,6 +285,8 @@ class SwitchHandler(BaseNodeHandler):
         for part in path.split('.'):
             if isinstance(current, dict) and part in current:
                 current = current[part]
+            elif is_table(current) and part.isdigit():
+                current = record_at(current, int(part))
             elif isinstance(current, list) and part.isdigit():
                 index = int(part)
                 if 0 <= index < len(current):
@@ -3,9 +3,18 @@ Data source node handlers with GRM database integration
 """
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
-from django.db import connection
+from django.conf import settings
 from .base import BaseNodeHandler
+from ..db_pool import pooled_cursor
+from ..http_cache import http_cache
+from ..http_pool import RateLimiter, http_request
+from ..query_cache import query_cache, invalidate_tables
+from ..replicas import read_alias
+from ..streams import query_stream, stream_batch_size, chunked_fetch_size, _is_enabled
+from ..tables import format_rows, from_records, wants_table
+from ..watermarks import read_incremental
 from django.apps import apps
 
 class DatabaseQueryHandler(BaseNodeHandler):
@@ -89,18 +98,38 @@ class DatabaseQueryHandler(BaseNodeHandler):
         else:
             raise ValueError(f"Unsupported query type: {query_type}")
         
+        # Reads may go to the read replica, writes always go to the primary
+        using = read_alias(config) if query_type == 'SELECT' else 'default'
+        
+        # chunked_fetch streams as well, as row tuples read through a server-side cursor
+        fetch_size = chunked_fetch_size(config)
+        batch_size = stream_batch_size(config) or fetch_size
+        if query_type == 'SELECT' and batch_size and not config.get('output_mapping'):
+            # Rows are read when the downstream node iterates the stream
+            return {
+                'data': query_stream(
+                    query, params, batch_size, using=using,
+                    server_side=fetch_size is not None,
+                    tables=fetch_size is not None or wants_table(config)
+                ),
+                'count': None,
+                'success': True,
+                'message': f"Streaming records in batches of {batch_size}"
+            }
+        
         try:
-            with connection.cursor() as cursor:
+            with pooled_cursor(using) as cursor:
                 if query_type == 'SELECT':
                     cursor.execute(query, params)
                     columns = [col[0] for col in cursor.description]
-                    results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                    rows = cursor.fetchall()
+                    results = format_rows(columns, rows, config)
                     
                     output_data = {
                         'data': results,
-                        'count': len(results),
+                        'count': len(rows),
                         'success': True,
-                        'message': f"Retrieved {len(results)} records"
+                        'message': f"Retrieved {len(rows)} records"
                     }
                 elif query_type == 'INSERT' and isinstance(input_data.get('data'), list):
                     cursor.executemany(query, params)
@@ -127,6 +156,10 @@ class DatabaseQueryHandler(BaseNodeHandler):
         except Exception as e:
             self.log_execution(f"Database query failed: {str(e)}", 'error')
             raise ValueError(f"Database query failed: {str(e)}")
+        finally:
+            if query_type != 'SELECT':
+                # Cached query results that read this table may be stale now
+                invalidate_tables(table_name)
     
     def _apply_input_mapping(self, input_data: Dict[str, Any], mapping: Dict[str, Any]) -> Dict[str, Any]:
         """Apply input data mapping"""
@@ -212,50 +245,37 @@ class DatabaseQueryHandler(BaseNodeHandler):
         return current
 
 class HttpRequestHandler(BaseNodeHandler):
-    """Handler for HTTP request nodes"""
+    """
+    Handler for HTTP request nodes
+    
+    With for_each enabled and a list as input data, one request is sent
+    per item, up to concurrency at a time and at most rate_limit per
+    second. The url, headers and body templates are then rendered for each
+    item, with {{input.field}} referring to the item's fields.
+    """
+    
+    def deferred_config_keys(self, config: Dict[str, Any]) -> list:
+        if _is_enabled(config.get('for_each', False)):
+            return ['url', 'headers', 'body']
+        return []
     
     def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        if _is_enabled(config.get('for_each', False)):
+            return self._execute_for_each(config, input_data, context)
+        
         method = config.get('method', 'GET').upper()
         url = config.get('url', '')
-        headers = config.get('headers', {})
-        body = config.get('body', '')
         timeout = config.get('timeout', 30)
         
         if not url:
             raise ValueError("URL is required")
         
-        # Parse headers if string
-        if isinstance(headers, str):
-            try:
-                headers = json.loads(headers) if headers else {}
-            except json.JSONDecodeError:
-                headers = {}
-        
-        # Parse body if string
-        request_body = None
-        if body:
-            if isinstance(body, str):
-                try:
-                    request_body = json.loads(body)
-                except json.JSONDecodeError:
-                    request_body = body
-            else:
-                request_body = body
-        elif method in ['POST', 'PUT', 'PATCH']:
-            # Use input data as body if not specified
-            request_body = input_data.get('data', {})
+        headers, request_body = self._request_parts(config.get('headers', {}), config.get('body', ''), method, input_data.get('data', {}))
         
         try:
             self.log_execution(f"Making {method} request to {url}")
             
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=request_body if isinstance(request_body, (dict, list)) else None,
-                data=request_body if isinstance(request_body, str) else None,
-                timeout=timeout
-            )
+            response, cache_info = self._send(config, method, url, headers, request_body, timeout)
             
             # Try to parse JSON response
             try:
@@ -263,6 +283,10 @@ class HttpRequestHandler(BaseNodeHandler):
             except:
                 response_data = response.text
             
+            if wants_table(config):
+                # Only a JSON array of objects is converted
+                response_data = from_records(response_data)
+            
             result = {
                 'data': response_data,
                 'status_code': response.status_code,
@@ -270,6 +294,8 @@ class HttpRequestHandler(BaseNodeHandler):
                 'success': response.status_code < 400,
                 'message': f"HTTP {method} request completed with status {response.status_code}"
             }
+            if cache_info is not None:
+                result['cache'] = cache_info
             
             if not result['success']:
                 self.log_execution(f"HTTP request failed with status {response.status_code}", 'warning')
@@ -280,6 +306,131 @@ class HttpRequestHandler(BaseNodeHandler):
             raise ValueError(f"HTTP request timed out after {timeout} seconds")
         except requests.exceptions.RequestException as e:
             raise ValueError(f"HTTP request failed: {str(e)}")
+    
+    def _execute_for_each(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send one request per input item and collect the responses in input order
+        
+        A failed item does not stop the others; its entry carries the error.
+        
+        Returns:
+            Dict with a per-item list of {index, status_code, success, data, error}
+        """
+        method = config.get('method', 'GET').upper()
+        timeout = config.get('timeout', 30)
+        
+        if not config.get('url'):
+            raise ValueError("URL is required")
+        
+        items = input_data.get('data', [])
+        if isinstance(items, dict):
+            items = [items]
+        if not isinstance(items, list):
+            raise ValueError("For-each mode requires a list of items as input data")
+        
+        try:
+            concurrency = max(1, int(config.get('concurrency') or getattr(settings, 'WORKFLOW_HTTP_FOR_EACH_CONCURRENCY', 8)))
+            rate_limit = float(config.get('rate_limit') or 0)
+        except (TypeError, ValueError):
+            raise ValueError("concurrency and rate_limit must be numbers")
+        limiter = RateLimiter(rate_limit) if rate_limit > 0 else None
+        
+        def send(index: int, item: Any) -> Dict[str, Any]:
+            item_input = {'data': item}
+            entry = {'index': index, 'status_code': None, 'success': False, 'data': None, 'error': ''}
+            try:
+                url = self.render_deferred(config.get('url', ''), context, item_input)
+                headers, request_body = self._request_parts(
+                    self.render_deferred(config.get('headers', {}), context, item_input),
+                    self.render_deferred(config.get('body', ''), context, item_input),
+                    method,
+                    item
+                )
+                if limiter is not None:
+                    limiter.acquire()
+                
+                response, cache_info = self._send(config, method, url, headers, request_body, timeout)
+                if cache_info is not None:
+                    entry['cache'] = cache_info['status']
+                try:
+                    entry['data'] = response.json()
+                except ValueError:
+                    entry['data'] = response.text
+                entry['status_code'] = response.status_code
+                entry['success'] = response.status_code < 400
+            except requests.exceptions.Timeout:
+                entry['error'] = f"HTTP request timed out after {timeout} seconds"
+            except requests.exceptions.RequestException as e:
+                entry['error'] = f"HTTP request failed: {str(e)}"
+            return entry
+        
+        self.log_execution(f"Making {len(items)} {method} requests, {concurrency} at a time")
+        
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(items)) or 1) as executor:
+            results = list(executor.map(send, range(len(items)), items))
+        
+        failed = sum(1 for entry in results if not entry['success'])
+        if failed:
+            self.log_execution(f"{failed} of {len(results)} HTTP requests failed", 'warning')
+        
+        return {
+            'data': results,
+            'count': len(results),
+            'succeeded': len(results) - failed,
+            'failed': failed,
+            'success': failed == 0,
+            'message': f"HTTP {method} requests completed: {len(results) - failed} succeeded, {failed} failed"
+        }
+    
+    def _send(self, config: Dict[str, Any], method: str, url: str, headers: Dict[str, Any], request_body: Any, timeout: Any):
+        """
+        Send a request, through the HTTP response cache for GET requests of nodes with http_cache
+        
+        Returns:
+            Tuple of (response, cache info or None when the cache was not used)
+        """
+        if method == 'GET' and request_body is None and _is_enabled(config.get('http_cache', False)):
+            return http_cache.request(url, headers=headers, timeout=timeout)
+        
+        response = http_request(
+            method,
+            url,
+            headers=headers,
+            json=request_body if isinstance(request_body, (dict, list)) else None,
+            data=request_body if isinstance(request_body, str) else None,
+            timeout=timeout
+        )
+        return response, None
+    
+    def _request_parts(self, headers: Any, body: Any, method: str, default_body: Any):
+        """
+        Parse the headers and body of a request
+        
+        Returns:
+            Tuple of (headers dict, body: dict/list for JSON, str for raw data, or None)
+        """
+        # Parse headers if string
+        if isinstance(headers, str):
+            try:
+                headers = json.loads(headers) if headers else {}
+            except json.JSONDecodeError:
+                headers = {}
+        
+        # Parse body if string
+        request_body = None
+        if body:
+            if isinstance(body, str):
+                try:
+                    request_body = json.loads(body)
+                except json.JSONDecodeError:
+                    request_body = body
+            else:
+                request_body = body
+        elif method in ['POST', 'PUT', 'PATCH']:
+            # Use input data as body if not specified
+            request_body = default_body
+        
+        return headers, request_body
 
 class GRMDataHandler(BaseNodeHandler):
     """Handler for GRM specific data operations"""
@@ -288,7 +439,7 @@ class GRMDataHandler(BaseNodeHandler):
         operation = config.get('operation', 'get_requests')
         
         if operation == 'get_requests':
-            return self._get_request_data(config, input_data)
+            return self._get_request_data(config, input_data, context)
         elif operation == 'get_passengers':
             return self._get_passenger_data(config, input_data)
         elif operation == 'get_transactions':
@@ -298,7 +449,7 @@ class GRMDataHandler(BaseNodeHandler):
         else:
             raise ValueError(f"Unsupported GRM operation: {operation}")
     
-    def _get_request_data(self, config: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_request_data(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """Get request master data"""
         filters = config.get('filters', {})
         limit = config.get('limit', 100)
@@ -329,23 +480,44 @@ class GRMDataHandler(BaseNodeHandler):
             query += " AND rm.requested_date >= %s"
             params.append(filters['date_from'])
         
+        if _is_enabled(config.get('incremental', False)):
+            return self._get_new_request_data(config, context, query, params)
+        
         query += f" ORDER BY rm.requested_date DESC LIMIT {limit}"
         
         try:
-            with connection.cursor() as cursor:
+            with pooled_cursor(read_alias(config)) as cursor:
                 cursor.execute(query, params)
                 columns = [col[0] for col in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                rows = cursor.fetchall()
+                results = format_rows(columns, rows, config)
                 
                 return {
                     'data': results,
-                    'count': len(results),
+                    'count': len(rows),
                     'success': True,
-                    'message': f"Retrieved {len(results)} requests"
+                    'message': f"Retrieved {len(rows)} requests"
                 }
         except Exception as e:
             raise ValueError(f"Failed to get request data: {str(e)}")
     
+    def _get_new_request_data(self, config: Dict[str, Any], context: Dict[str, Any], query: str, params: list) -> Dict[str, Any]:
+        """Get the request master rows added since the workflow's last successful execution"""
+        try:
+            with pooled_cursor(read_alias(config)) as cursor:
+                columns, rows, watermark, pages = read_incremental(cursor, config, context, query, params, 'rm')
+            results = format_rows(columns, rows, config)
+            
+            return {
+                'data': results,
+                'count': len(rows),
+                'watermark': watermark,
+                'success': True,
+                'message': f"Retrieved {len(rows)} new requests in {pages} pages"
+            }
+        except Exception as e:
+            raise ValueError(f"Failed to get new request data: {str(e)}")
+    
     def _get_passenger_data(self, config: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Get passenger details"""
         request_master_id = input_data.get('data', {}).get('request_master_id')
@@ -364,16 +536,17 @@ class GRMDataHandler(BaseNodeHandler):
         """
         
         try:
-            with connection.cursor() as cursor:
+            with pooled_cursor(read_alias(config)) as cursor:
                 cursor.execute(query, [request_master_id])
                 columns = [col[0] for col in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                rows = cursor.fetchall()
+                results = format_rows(columns, rows, config)
                 
                 return {
                     'data': results,
-                    'count': len(results),
+                    'count': len(rows),
                     'success': True,
-                    'message': f"Retrieved {len(results)} passengers"
+                    'message': f"Retrieved {len(rows)} passengers"
                 }
         except Exception as e:
             raise ValueError(f"Failed to get passenger data: {str(e)}")
@@ -395,16 +568,17 @@ class GRMDataHandler(BaseNodeHandler):
         """
         
         try:
-            with connection.cursor() as cursor:
+            with pooled_cursor(read_alias(config)) as cursor:
                 cursor.execute(query, [airlines_request_id])
                 columns = [col[0] for col in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                rows = cursor.fetchall()
+                results = format_rows(columns, rows, config)
                 
                 return {
                     'data': results,
-                    'count': len(results),
+                    'count': len(rows),
                     'success': True,
-                    'message': f"Retrieved {len(results)} transactions"
+                    'message': f"Retrieved {len(rows)} transactions"
                 }
         except Exception as e:
             raise ValueError(f"Failed to get transaction data: {str(e)}")
@@ -424,7 +598,7 @@ class GRMDataHandler(BaseNodeHandler):
         """
         
         try:
-            with connection.cursor() as cursor:
+            with pooled_cursor() as cursor:
                 cursor.execute(query, [new_status, pnr])
                 affected_rows = cursor.rowcount
                 
@@ -435,6 +609,8 @@ class GRMDataHandler(BaseNodeHandler):
                 }
         except Exception as e:
             raise ValueError(f"Failed to update PNR status: {str(e)}")
+        finally:
+            invalidate_tables('series_request_details')
 
 class QueryBuilderHandler(BaseNodeHandler):
     """Handler for advanced query builder nodes"""
@@ -508,24 +684,70 @@ class QueryBuilderHandler(BaseNodeHandler):
             
             # Execute query
             final_query = ' '.join(query_parts)
+            using = read_alias(config)
             
-            with connection.cursor() as cursor:
-                cursor.execute(final_query, params)
-                columns = [col[0] for col in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            # chunked_fetch streams as well, as row tuples read through a server-side cursor
+            fetch_size = chunked_fetch_size(config)
+            batch_size = stream_batch_size(config) or fetch_size
+            if batch_size:
+                # Rows are read when the downstream node iterates the stream
+                return {
+                    'data': query_stream(
+                        final_query, params, batch_size, using=using,
+                        server_side=fetch_size is not None,
+                        tables=fetch_size is not None or wants_table(config)
+                    ),
+                    'count': None,
+                    'query': final_query,
+                    'success': True,
+                    'message': f'Query streaming in batches of {batch_size} rows'
+                }
+            
+            # Results are cached under the SQL, its parameters and the versions of the tables read
+            cache_key = None
+            cache_ttl = 0
+            cached = None
+            if _is_enabled(config.get('query_cache')):
+                read_tables = self._read_tables(tables, joins)
+                cache_ttl = query_cache.ttl_for(read_tables)
+                if cache_ttl > 0:
+                    cache_key = query_cache.make_key(final_query, params, read_tables)
+                    cached = query_cache.get(cache_key) if cache_key else None
+            
+            if cached is not None:
+                columns, rows = cached
+            else:
+                with pooled_cursor(using) as cursor:
+                    cursor.execute(final_query, params)
+                    columns = [col[0] for col in cursor.description]
+                    rows = cursor.fetchall()
+            
+            if cache_key and cached is None:
+                query_cache.set(cache_key, columns, rows, cache_ttl)
+            
+            results = format_rows(columns, rows, config)
             
             return {
                 'data': results,
-                'count': len(results),
+                'count': len(rows),
                 'query': final_query,
+                'cached': cached is not None,
                 'success': True,
-                'message': f'Query executed successfully, returned {len(results)} rows'
+                'message': f'Query executed successfully, returned {len(rows)} rows'
             }
             
         except Exception as e:
             self.log_execution(f"Query builder execution failed: {str(e)}", 'error')
             raise ValueError(f"Query execution failed: {str(e)}")
     
+    def _read_tables(self, tables, joins) -> list:
+        """Tables a built query reads: the FROM and JOIN tables"""
+        read_tables = [table for table in tables if isinstance(table, str)]
+        for join in joins or []:
+            if isinstance(join, dict):
+                read_tables.extend(join.get(key, '') for key in ('left_table', 'right_table'))
+        return read_tables
+    
     def _parse_json_field(self, value):
         """Parse JSON field value"""
         if isinstance(value, str):
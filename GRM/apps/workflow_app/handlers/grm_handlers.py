@@ -2,26 +2,56 @@
 GRM specific handlers for workflow operations
 """
 import json
-from typing import Dict, Any
+from collections import defaultdict
+from typing import Dict, Any, List, Tuple
 from django.db import connection
 from .base import BaseNodeHandler
+from ..db_pool import pooled_cursor
+from ..payment_lookup import lookup_enabled, stored_payment_types
+from ..replicas import read_alias
+from ..streams import _is_enabled
+from ..tables import format_rows
+from ..watermarks import read_incremental
 
 class GRMPaymentCheckHandler(BaseNodeHandler):
-    """Handler for GRM payment percentage check functionality"""
+    """
+    Handler for GRM payment percentage check functionality
+    
+    Given a list of PNRs (config 'pnrs', or a list as input data to a node
+    without a configured 'pnr') the check runs in batch mode: each lookup
+    is one IN (...) query per LOOKUP_CHUNK_SIZE keys instead of one query
+    per PNR.
+    
+    With WORKFLOW_GRM_PAYMENT_LOOKUP on, results precomputed in the PNR
+    payment lookup table are used when available; other PNRs are checked
+    with the live queries.
+    """
+    
+    # Keys per IN (...) list in batch mode
+    LOOKUP_CHUNK_SIZE = 1000
     
     def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
-        pnr = config.get('pnr') or input_data.get('data', {}).get('pnr')
         transaction_master_id = config.get('transaction_master_id', 0)
         series_group_id = config.get('series_group_id', 1)
         pnr_blocking_id = config.get('pnr_blocking_id', '')
         
+        pnrs = self._get_batch_pnrs(config, input_data)
+        if pnrs is not None:
+            return self._execute_batch(pnrs, transaction_master_id, series_group_id, pnr_blocking_id)
+        
+        pnr = config.get('pnr') or input_data.get('data', {}).get('pnr')
+        
         if not pnr:
             raise ValueError("PNR is required for payment check")
         
         try:
-            payment_in_percent = self._check_payment_type_in_percentage(
-                pnr, transaction_master_id, series_group_id, pnr_blocking_id
-            )
+            stored = self._stored_payment_types([pnr], transaction_master_id, series_group_id, pnr_blocking_id)
+            if pnr in stored:
+                payment_in_percent = stored[pnr]
+            else:
+                payment_in_percent = self._check_payment_type_in_percentage(
+                    pnr, transaction_master_id, series_group_id, pnr_blocking_id
+                )
             
             return {
                 'data': {
@@ -104,17 +134,255 @@ class GRMPaymentCheckHandler(BaseNodeHandler):
                 timeline_results = cursor.fetchall()
                 
                 if timeline_results:
-                    percentage_value = timeline_results[0][0]
-                    absolute_amount = timeline_results[0][1]
-                    
-                    # If percentage values > 0 and amount is 0, then payment percent is yes
-                    if percentage_value > 0 and absolute_amount == 0:
-                        payment_in_percent = 'Y'
-                    # If absolute amount > 0, then payment percent is No
-                    elif absolute_amount != 0:
-                        payment_in_percent = 'N'
+                    payment_in_percent = self._payment_in_percent(
+                        timeline_results[0][0], timeline_results[0][1], payment_in_percent
+                    )
         
         return payment_in_percent
+    
+    def _payment_in_percent(self, percentage_value, absolute_amount, default: str = 'Y') -> str:
+        """Payment type from the first PAYMENT timeline row"""
+        # If percentage values > 0 and amount is 0, then payment percent is yes
+        if percentage_value > 0 and absolute_amount == 0:
+            return 'Y'
+        # If absolute amount > 0, then payment percent is No
+        elif absolute_amount != 0:
+            return 'N'
+        return default
+    
+    def _get_batch_pnrs(self, config: Dict[str, Any], input_data: Dict[str, Any]):
+        """
+        PNRs to check in batch mode
+        
+        A configured 'pnr' takes precedence over list input data, as in the
+        single-PNR check.
+        
+        Returns:
+            List of PNRs from config 'pnrs' (list or comma-separated text) or,
+            when no 'pnr' is configured, from list input data (PNR strings or
+            records with a 'pnr' field); None for a single-PNR check
+        """
+        pnrs = config.get('pnrs')
+        if isinstance(pnrs, str):
+            pnrs = [pnr.strip() for pnr in pnrs.split(',')]
+        
+        if not pnrs or not any(pnrs):
+            if config.get('pnr'):
+                return None
+            pnrs = input_data.get('data')
+            if not isinstance(pnrs, list):
+                return None
+            pnrs = [item.get('pnr') if isinstance(item, dict) else item for item in pnrs]
+        
+        # Drop empty entries and duplicates, keeping the input order
+        return list(dict.fromkeys(pnr for pnr in pnrs if pnr))
+    
+    def _execute_batch(self, pnrs: List[str], transaction_master_id, series_group_id, pnr_blocking_id) -> Dict[str, Any]:
+        """Run the payment check for many PNRs"""
+        if not pnrs:
+            raise ValueError("PNR is required for payment check")
+        
+        try:
+            stored = self._stored_payment_types(pnrs, transaction_master_id, series_group_id, pnr_blocking_id)
+            missing = [pnr for pnr in pnrs if pnr not in stored]
+            if missing:
+                stored.update(self._check_payment_type_in_percentage_batch(
+                    missing, transaction_master_id, series_group_id, pnr_blocking_id
+                ))
+            payment_in_percent = {pnr: stored[pnr] for pnr in pnrs}
+            
+            return {
+                'data': {
+                    'pnrs': pnrs,
+                    'payment_in_percent': payment_in_percent,
+                    'transaction_master_id': transaction_master_id,
+                    'series_group_id': series_group_id
+                },
+                'count': len(pnrs),
+                'success': True,
+                'message': f'Payment check completed for {len(pnrs)} PNRs'
+            }
+            
+        except Exception as e:
+            self.log_execution(f"Payment check failed: {str(e)}", 'error')
+            raise ValueError(f"Payment check failed: {str(e)}")
+    
+    def _check_payment_type_in_percentage_batch(self, pnrs: List[str], transaction_master_id=0, series_group_id=1, pnr_blocking_id='') -> Dict[str, str]:
+        """
+        Batch form of _check_payment_type_in_percentage
+        
+        Runs the same three lookups for all PNRs at once and takes, per PNR,
+        the same first row as the single-PNR queries (same filters and
+        ORDER BY), so every PNR gets the result the single check would give.
+        
+        Args:
+            pnrs: Distinct PNRs
+            transaction_master_id: Transaction to use for every PNR (0 to look it up)
+            series_group_id: Series group to use with transaction_master_id
+            pnr_blocking_id: Restrict the timeline lookup to this PNR blocking
+            
+        Returns:
+            Dict of PNR -> 'Y' or 'N'
+        """
+        resolved = self._resolve_payment_types(pnrs, transaction_master_id, series_group_id, pnr_blocking_id)
+        return {pnr: payment_in_percent for pnr, (_, _, payment_in_percent) in resolved.items()}
+    
+    def _resolve_payment_types(self, pnrs: List[str], transaction_master_id=0, series_group_id=1, pnr_blocking_id='') -> Dict[str, Tuple[Any, Any, str]]:
+        """
+        Batch payment check, with the transaction each result was taken from
+        
+        Returns:
+            Dict of PNR -> (transaction_master_id, series_group_id, 'Y' or 'N'),
+            with 0 ids for PNRs whose transaction could not be resolved
+        """
+        if transaction_master_id and series_group_id and transaction_master_id > 0 and series_group_id > 0:
+            transaction_ids = {pnr: (transaction_master_id, series_group_id) for pnr in pnrs}
+        else:
+            transaction_ids = self._lookup_transaction_ids(pnrs)
+        
+        timelines = self._lookup_payment_timelines(set(transaction_ids.values()), pnr_blocking_id)
+        
+        results = {}
+        for pnr in pnrs:
+            key = transaction_ids.get(pnr)
+            timeline = timelines.get(key) if key else None
+            payment_in_percent = self._payment_in_percent(timeline[0], timeline[1]) if timeline else 'Y'
+            results[pnr] = (*(key or (0, 0)), payment_in_percent)
+        
+        return results
+    
+    def _stored_payment_types(self, pnrs: List[str], transaction_master_id=0, series_group_id=1, pnr_blocking_id='') -> Dict[str, str]:
+        """
+        Results precomputed in the PNR payment lookup table
+        
+        Only the default check (transaction resolved from the PNR, no
+        pnr_blocking_id filter) is precomputed, so any other check gets an
+        empty result.
+        
+        Returns:
+            Dict of PNR -> 'Y' or 'N' for the PNRs found in the table
+        """
+        explicit_ids = transaction_master_id and series_group_id and transaction_master_id > 0 and series_group_id > 0
+        if explicit_ids or pnr_blocking_id or not lookup_enabled():
+            return {}
+        
+        pnrs_by_key = self._pnrs_by_key(pnrs)
+        results = {}
+        for stored_pnr, payment_in_percent in stored_payment_types(pnrs).items():
+            for pnr in pnrs_by_key.get(self._pnr_key(stored_pnr), []):
+                results[pnr] = payment_in_percent
+        
+        return results
+    
+    def _pnr_key(self, pnr) -> str:
+        """Key for matching PNRs the way the database compares them (case-insensitively)"""
+        return str(pnr).strip().lower()
+    
+    def _pnrs_by_key(self, pnrs: List[str]) -> Dict[str, List[str]]:
+        """Group PNRs by _pnr_key"""
+        pnrs_by_key = defaultdict(list)
+        for pnr in pnrs:
+            pnrs_by_key[self._pnr_key(pnr)].append(pnr)
+        return pnrs_by_key
+    
+    def _lookup_transaction_ids(self, pnrs: List[str]) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Resolve (transaction_master_id, series_group_id) for many PNRs
+        
+        Returns:
+            Dict of PNR -> ids, for PNRs where both ids are positive
+        """
+        pnrs_by_key = self._pnrs_by_key(pnrs)
+        
+        # First request_approved_flight_id of each PNR
+        flight_ids = {}
+        for chunk, placeholders in self._in_chunks(pnrs):
+            rows = self._fetch(f"""
+                SELECT pnr, request_approved_flight_id
+                FROM pnr_blocking_details
+                WHERE pnr IN ({placeholders})
+            """, chunk)
+            for row_pnr, request_approved_flight_id in rows:
+                for pnr in pnrs_by_key.get(self._pnr_key(row_pnr), []):
+                    flight_ids.setdefault(pnr, request_approved_flight_id)
+        
+        # Transaction and series group with the highest transaction_master_id per flight
+        flight_details = {}
+        distinct_flight_ids = list(dict.fromkeys(flight_id for flight_id in flight_ids.values() if flight_id is not None))
+        for chunk, placeholders in self._in_chunks(distinct_flight_ids):
+            rows = self._fetch(f"""
+                SELECT rafd.request_approved_flight_id, rafd.transaction_master_id, rafd.series_request_id, srd.series_group_id
+                FROM request_approved_flight_details as rafd,
+                     series_request_details as srd
+                WHERE rafd.request_approved_flight_id IN ({placeholders})
+                AND rafd.series_request_id = srd.series_request_id
+                ORDER BY transaction_master_id DESC
+            """, chunk)
+            for request_approved_flight_id, i_transaction_master_id, _, i_series_group_id in rows:
+                flight_details.setdefault(request_approved_flight_id, (i_transaction_master_id, i_series_group_id))
+        
+        transaction_ids = {}
+        for pnr, request_approved_flight_id in flight_ids.items():
+            i_transaction_master_id, i_series_group_id = flight_details.get(request_approved_flight_id, (0, 0))
+            if i_transaction_master_id and i_series_group_id and i_transaction_master_id > 0 and i_series_group_id > 0:
+                transaction_ids[pnr] = (i_transaction_master_id, i_series_group_id)
+        
+        return transaction_ids
+    
+    def _lookup_payment_timelines(self, keys: set, pnr_blocking_id='') -> Dict[Tuple[Any, Any], Tuple[Any, Any]]:
+        """
+        First PAYMENT timeline row for many (transaction_master_id, series_group_id) pairs
+        
+        Like the single check, rows are filtered by pnr_blocking_id when it
+        is set and by the pair's series group otherwise.
+        
+        Returns:
+            Dict of (transaction_master_id, series_group_id) -> (percentage_value, absolute_amount)
+        """
+        timelines = {}
+        keys = list(keys)
+        
+        for chunk, placeholders in self._in_chunks(keys):
+            if pnr_blocking_id:
+                condition = f"transaction_id IN ({placeholders}) AND pnr_blocking_id = %s"
+                params = [transaction_id for transaction_id, _ in chunk] + [pnr_blocking_id]
+            else:
+                pair_placeholders = ', '.join(['(%s, %s)'] * len(chunk))
+                condition = f"(transaction_id, series_group_id) IN ({pair_placeholders})"
+                params = [value for key in chunk for value in key]
+            
+            rows = self._fetch(f"""
+                SELECT transaction_id, series_group_id, percentage_value, absolute_amount
+                FROM request_timeline_details
+                WHERE {condition}
+                AND timeline_type = 'PAYMENT' 
+                AND status != 'TIMELINEEXTEND'
+                ORDER BY transaction_id ASC
+            """, params)
+            
+            first_rows = {}
+            for transaction_id, row_series_group_id, percentage_value, absolute_amount in rows:
+                key = transaction_id if pnr_blocking_id else (transaction_id, row_series_group_id)
+                first_rows.setdefault(key, (percentage_value, absolute_amount))
+            
+            for key in chunk:
+                row = first_rows.get(key[0] if pnr_blocking_id else key)
+                if row is not None:
+                    timelines[key] = row
+        
+        return timelines
+    
+    def _in_chunks(self, values: List[Any]):
+        """Yield (chunk, placeholders) for IN (...) lists of at most LOOKUP_CHUNK_SIZE values"""
+        for start in range(0, len(values), self.LOOKUP_CHUNK_SIZE):
+            chunk = values[start:start + self.LOOKUP_CHUNK_SIZE]
+            yield chunk, ', '.join(['%s'] * len(chunk))
+    
+    def _fetch(self, query: str, params: List[Any]) -> List[tuple]:
+        """Run a query and return all rows"""
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            return cursor.fetchall()
 
 class GRMRequestDataHandler(BaseNodeHandler):
     """Handler for GRM request data operations"""
@@ -123,7 +391,7 @@ class GRMRequestDataHandler(BaseNodeHandler):
         operation = config.get('operation', 'get_requests')
         
         if operation == 'get_requests':
-            return self._get_request_data(config, input_data)
+            return self._get_request_data(config, input_data, context)
         elif operation == 'get_passengers':
             return self._get_passenger_data(config, input_data)
         elif operation == 'get_transactions':
@@ -135,7 +403,7 @@ class GRMRequestDataHandler(BaseNodeHandler):
         else:
             raise ValueError(f"Unsupported GRM operation: {operation}")
     
-    def _get_request_data(self, config: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_request_data(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """Get request master data with filters"""
         filters = config.get('filters', {})
         limit = config.get('limit', 100)
@@ -172,23 +440,44 @@ class GRMRequestDataHandler(BaseNodeHandler):
             query += " AND rm.requested_date >= %s"
             params.append(filters['date_from'])
         
+        if _is_enabled(config.get('incremental', False)):
+            return self._get_new_request_data(config, context, query, params)
+        
         query += f" ORDER BY rm.requested_date DESC LIMIT {limit}"
         
         try:
-            with connection.cursor() as cursor:
+            with pooled_cursor(read_alias(config)) as cursor:
                 cursor.execute(query, params)
                 columns = [col[0] for col in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                rows = cursor.fetchall()
+                results = format_rows(columns, rows, config)
                 
                 return {
                     'data': results,
-                    'count': len(results),
+                    'count': len(rows),
                     'success': True,
-                    'message': f"Retrieved {len(results)} requests"
+                    'message': f"Retrieved {len(rows)} requests"
                 }
         except Exception as e:
             raise ValueError(f"Failed to get request data: {str(e)}")
     
+    def _get_new_request_data(self, config: Dict[str, Any], context: Dict[str, Any], query: str, params: list) -> Dict[str, Any]:
+        """Get the request master rows added since the workflow's last successful execution"""
+        try:
+            with pooled_cursor(read_alias(config)) as cursor:
+                columns, rows, watermark, pages = read_incremental(cursor, config, context, query, params, 'rm')
+            results = format_rows(columns, rows, config)
+            
+            return {
+                'data': results,
+                'count': len(rows),
+                'watermark': watermark,
+                'success': True,
+                'message': f"Retrieved {len(rows)} new requests in {pages} pages"
+            }
+        except Exception as e:
+            raise ValueError(f"Failed to get new request data: {str(e)}")
+    
     def _get_passenger_data(self, config: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Get passenger details for a request"""
         request_master_id = input_data.get('data', {}).get('request_master_id')
@@ -207,16 +496,17 @@ class GRMRequestDataHandler(BaseNodeHandler):
         """
         
         try:
-            with connection.cursor() as cursor:
+            with pooled_cursor(read_alias(config)) as cursor:
                 cursor.execute(query, [request_master_id])
                 columns = [col[0] for col in cursor.description]
-                results = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                rows = cursor.fetchall()
+                results = format_rows(columns, rows, config)
                 
                 return {
                     'data': results,
-                    'count': len(results),
+                    'count': len(rows),
                     'success': True,
-                    'message': f"Retrieved {len(results)} passengers"
+                    'message': f"Retrieved {len(rows)} passengers"
                 }
         except Exception as e:
             raise ValueError(f"Failed to get passenger data: {str(e)}")
@@ -4,12 +4,33 @@ Output node handlers for saving and exporting data
 import json
 import csv
 import io
-from typing import Dict, Any
-from django.db import connection
+import time
+import itertools
+from typing import Dict, Any, List, Optional, Sequence
+from django.conf import settings
 from .base import BaseNodeHandler
+from ..db_pool import pooled_cursor
+from ..query_cache import invalidate_tables
+from ..streams import RecordStream, is_stream
+from ..tables import is_table, iter_records, as_records
 
 class DatabaseSaveHandler(BaseNodeHandler):
-    """Handler for saving data to database"""
+    """
+    Handler for saving data to database
+    
+    Lists of records, record streams and columnar data are inserted (or
+    upserted) with multi-row INSERT statements, each holding at most
+    chunk_size rows (WORKFLOW_SAVE_CHUNK_ROWS) and roughly
+    WORKFLOW_SAVE_MAX_STATEMENT_BYTES of values. Streams are written one
+    batch at a time. Upserts of lists use ON DUPLICATE KEY UPDATE, so
+    unique_columns must be covered by a unique key of the table.
+    """
+    
+    supports_streaming = True
+    supports_columnar = True
+    
+    # MySQL limit on placeholders in one statement
+    MAX_STATEMENT_PARAMS = 65535
     
     def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         table_name = config.get('table_name', '')
@@ -19,12 +40,20 @@ class DatabaseSaveHandler(BaseNodeHandler):
         if not table_name:
             raise ValueError("Table name is required")
         
+        bulk = operation in ('insert', 'upsert')
+        if is_stream(data) and not bulk:
+            data = data.materialize()
+        if is_table(data) and not bulk:
+            data = as_records(data)
+        
         if not data:
             raise ValueError("No data to save")
         
         try:
-            with connection.cursor() as cursor:
-                if operation == 'insert':
+            with pooled_cursor() as cursor:
+                if bulk and (isinstance(data, list) or is_stream(data) or is_table(data)):
+                    return self._bulk_save(cursor, table_name, data, config, operation == 'upsert')
+                elif operation == 'insert':
                     return self._insert_data(cursor, table_name, data)
                 elif operation == 'update':
                     return self._update_data(cursor, table_name, data, config)
@@ -36,39 +65,21 @@ class DatabaseSaveHandler(BaseNodeHandler):
         except Exception as e:
             self.log_execution(f"Database save failed: {str(e)}", 'error')
             raise ValueError(f"Database operation failed: {str(e)}")
+        finally:
+            # Cached query results that read this table may be stale now
+            invalidate_tables(table_name)
     
-    def _insert_data(self, cursor, table_name: str, data: Any) -> Dict[str, Any]:
-        """Insert data into table"""
-        if isinstance(data, list):
-            # Bulk insert
-            if not data:
-                return {'data': {'affected_rows': 0}, 'success': True, 'message': 'No data to insert'}
-            
-            # Use first item to determine columns
-            columns = list(data[0].keys())
-            placeholders = ', '.join(['%s'] * len(columns))
-            columns_str = ', '.join(columns)
-            
-            query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
-            
-            values = []
-            for item in data:
-                values.append([item.get(col) for col in columns])
-            
-            cursor.executemany(query, values)
-            affected_rows = cursor.rowcount
-            
-        else:
-            # Single insert
-            columns = list(data.keys())
-            placeholders = ', '.join(['%s'] * len(columns))
-            columns_str = ', '.join(columns)
-            
-            query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
-            values = [data[col] for col in columns]
-            
-            cursor.execute(query, values)
-            affected_rows = cursor.rowcount
+    def _insert_data(self, cursor, table_name: str, data: Dict) -> Dict[str, Any]:
+        """Insert a single record into table"""
+        columns = list(data.keys())
+        placeholders = ', '.join(['%s'] * len(columns))
+        columns_str = ', '.join(columns)
+        
+        query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
+        values = [data[col] for col in columns]
+        
+        cursor.execute(query, values)
+        affected_rows = cursor.rowcount
         
         return {
             'data': {'affected_rows': affected_rows},
@@ -76,6 +87,150 @@ class DatabaseSaveHandler(BaseNodeHandler):
             'message': f'Inserted {affected_rows} rows into {table_name}'
         }
     
+    def _bulk_save(self, cursor, table_name: str, data: Any, config: Dict, upsert: bool = False) -> Dict[str, Any]:
+        """
+        Insert or upsert many records with chunked multi-row INSERT statements
+        
+        Args:
+            cursor: Database cursor
+            table_name: Target table
+            data: List of records, RecordStream or columnar data
+            config: Node configuration (chunk_size, unique_columns)
+            upsert: Update rows whose unique key already exists
+            
+        Returns:
+            Result with the affected rows and per-chunk row counts and timings
+        """
+        unique_columns = self._unique_columns(config)
+        
+        try:
+            chunk_size = int(config.get('chunk_size') or 0)
+        except (ValueError, TypeError):
+            chunk_size = 0
+        if chunk_size <= 0:
+            chunk_size = getattr(settings, 'WORKFLOW_SAVE_CHUNK_ROWS', 1000)
+        
+        chunks = []
+        for columns, rows in self._row_batches(data):
+            # Without unique columns an upsert falls back to insert, as for single records
+            update_columns = [col for col in columns if col not in unique_columns] if upsert and unique_columns else None
+            self._write_chunks(cursor, table_name, columns, rows, chunk_size, update_columns, chunks)
+        
+        if not chunks:
+            return {'data': {'affected_rows': 0}, 'success': True, 'message': 'No data to insert'}
+        
+        affected_rows = sum(chunk['affected_rows'] for chunk in chunks)
+        row_count = sum(chunk['rows'] for chunk in chunks)
+        duration_ms = sum(chunk['duration_ms'] for chunk in chunks)
+        
+        self.log_execution(f"Wrote {row_count} rows to {table_name} in {len(chunks)} chunks ({duration_ms:.2f}ms)")
+        
+        if upsert and unique_columns:
+            message = f'Upserted {row_count} rows into {table_name} ({affected_rows} affected, {len(chunks)} chunks)'
+        else:
+            message = f'Inserted {affected_rows} rows into {table_name} ({len(chunks)} chunks)'
+        
+        return {
+            'data': {
+                'affected_rows': affected_rows,
+                'rows': row_count,
+                'duration_ms': round(duration_ms, 2),
+                'chunks': chunks
+            },
+            'success': True,
+            'message': message
+        }
+    
+    def _unique_columns(self, config: Dict) -> List[str]:
+        """unique_columns from the node configuration (a list, or comma-separated text from the editor)"""
+        unique_columns = config.get('unique_columns') or []
+        if isinstance(unique_columns, str):
+            return [col.strip() for col in unique_columns.split(',') if col.strip()]
+        return list(unique_columns)
+    
+    def _row_batches(self, data: Any):
+        """Yield (columns, rows) for a list of records, a RecordStream or columnar data"""
+        if is_table(data):
+            yield data['columns'], data['rows']
+            return
+        
+        columns = None
+        for batch in (data.batches() if is_stream(data) else [data]):
+            if is_table(batch):
+                yield batch['columns'], batch['rows']
+                continue
+            if columns is None:
+                # Use first item to determine columns
+                columns = list(batch[0].keys())
+            yield columns, [[item.get(col) for col in columns] for item in batch]
+    
+    def _write_chunks(
+        self,
+        cursor,
+        table_name: str,
+        columns: List[str],
+        rows: Sequence[Sequence[Any]],
+        chunk_size: int,
+        update_columns: Optional[List[str]] = None,
+        chunks: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Write rows with one multi-row INSERT statement per chunk
+        
+        Args:
+            cursor: Database cursor
+            table_name: Target table
+            columns: Column names
+            rows: Row values in column order
+            chunk_size: Maximum rows per statement
+            update_columns: Columns set by ON DUPLICATE KEY UPDATE, or None for a plain insert
+            chunks: Stats of earlier chunks to append to
+            
+        Returns:
+            Per-chunk stats (chunk number, rows, affected_rows, duration_ms)
+        """
+        chunks = chunks if chunks is not None else []
+        if not rows:
+            return chunks
+        
+        row_placeholders = f"({', '.join(['%s'] * len(columns))})"
+        prefix = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES "
+        suffix = ''
+        if update_columns is not None:
+            # A no-op assignment keeps duplicates unchanged when every column is part of the key
+            assignments = [f"{col} = VALUES({col})" for col in update_columns] or [f"{columns[0]} = {columns[0]}"]
+            suffix = f" ON DUPLICATE KEY UPDATE {', '.join(assignments)}"
+        
+        rows_per_chunk = self._rows_per_chunk(rows, len(columns), chunk_size)
+        
+        for start in range(0, len(rows), rows_per_chunk):
+            chunk = rows[start:start + rows_per_chunk]
+            started = time.time()
+            
+            cursor.execute(
+                prefix + ', '.join([row_placeholders] * len(chunk)) + suffix,
+                [value for row in chunk for value in row]
+            )
+            
+            chunks.append({
+                'chunk': len(chunks) + 1,
+                'rows': len(chunk),
+                'affected_rows': cursor.rowcount,
+                'duration_ms': round((time.time() - started) * 1000, 2)
+            })
+        
+        return chunks
+    
+    def _rows_per_chunk(self, rows: Sequence[Sequence[Any]], width: int, chunk_size: int) -> int:
+        """Rows per statement, reduced from chunk_size to keep statements within the size and placeholder limits"""
+        max_bytes = getattr(settings, 'WORKFLOW_SAVE_MAX_STATEMENT_BYTES', 1000000)
+        
+        # Rough size of the escaped values, sampled from the first rows
+        sample = rows[:100]
+        row_bytes = sum(len(str(value)) + 4 for row in sample for value in row) // len(sample)
+        
+        return max(1, min(chunk_size, max_bytes // max(1, row_bytes), self.MAX_STATEMENT_PARAMS // max(1, width)))
+    
     def _update_data(self, cursor, table_name: str, data: Dict, config: Dict) -> Dict[str, Any]:
         """Update data in table"""
         where_conditions = config.get('where_conditions', {})
@@ -106,7 +261,7 @@ class DatabaseSaveHandler(BaseNodeHandler):
     
     def _upsert_data(self, cursor, table_name: str, data: Dict, config: Dict) -> Dict[str, Any]:
         """Insert or update data (upsert)"""
-        unique_columns = config.get('unique_columns', [])
+        unique_columns = self._unique_columns(config)
         
         if not unique_columns:
             # Fallback to insert
@@ -129,7 +284,17 @@ class DatabaseSaveHandler(BaseNodeHandler):
             return self._insert_data(cursor, table_name, data)
 
 class FileExportHandler(BaseNodeHandler):
-    """Handler for exporting data to files"""
+    """
+    Handler for exporting data to files
+    
+    Streamed input is written batch by batch. The file content is the same
+    as for a list, except that CSV columns are taken from the first batch.
+    Columnar input is written from its rows, with the same file content as
+    for the equivalent list of dicts.
+    """
+    
+    supports_streaming = True
+    supports_columnar = True
     
     def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         file_path = config.get('file_path', '')
@@ -140,7 +305,11 @@ class FileExportHandler(BaseNodeHandler):
             raise ValueError("File path is required")
         
         try:
-            if file_format == 'json':
+            if is_stream(data) and file_format in ('json', 'csv', 'txt'):
+                return self._export_stream(file_path, file_format, data)
+            elif is_table(data) and file_format in ('json', 'csv', 'txt'):
+                return self._export_table(file_path, file_format, data)
+            elif file_format == 'json':
                 return self._export_json(file_path, data)
             elif file_format == 'csv':
                 return self._export_csv(file_path, data)
@@ -153,6 +322,130 @@ class FileExportHandler(BaseNodeHandler):
             self.log_execution(f"File export failed: {str(e)}", 'error')
             raise ValueError(f"File export failed: {str(e)}")
     
+    def _export_stream(self, file_path: str, file_format: str, stream: RecordStream) -> Dict[str, Any]:
+        """Export a RecordStream one batch at a time"""
+        import os
+        
+        # Ensure directory exists
+        directory = os.path.dirname(file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        if file_format == 'csv':
+            self._write_csv_stream(file_path, stream)
+        else:
+            # Text exports of lists are JSON as well
+            with open(file_path, 'w', encoding='utf-8') as f:
+                self._write_json_records(f, stream)
+        
+        file_size = os.path.getsize(file_path)
+        
+        return {
+            'data': {
+                'file_path': file_path,
+                'format': 'text' if file_format == 'txt' else file_format,
+                'file_size': file_size,
+                'rows_exported': stream.record_count
+            },
+            'success': True,
+            'message': f'Data exported to {file_format.upper()} file: {file_path} ({stream.record_count} rows)'
+        }
+    
+    def _export_table(self, file_path: str, file_format: str, table: Dict[str, Any]) -> Dict[str, Any]:
+        """Export columnar data without building a list of dicts"""
+        import os
+        
+        # Ensure directory exists
+        directory = os.path.dirname(file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        rows = table['rows']
+        
+        if file_format == 'csv':
+            if not rows:
+                raise ValueError("No data to export")
+            
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                self._write_table_csv(f, table['columns'], [rows])
+        else:
+            # Text exports of lists are JSON as well
+            with open(file_path, 'w', encoding='utf-8') as f:
+                self._write_json_records(f, iter_records(table))
+        
+        file_size = os.path.getsize(file_path)
+        
+        return {
+            'data': {
+                'file_path': file_path,
+                'format': 'text' if file_format == 'txt' else file_format,
+                'file_size': file_size,
+                'rows_exported': len(rows)
+            },
+            'success': True,
+            'message': f'Data exported to {file_format.upper()} file: {file_path} ({len(rows)} rows)'
+        }
+    
+    def _write_json_records(self, f, records) -> int:
+        """
+        Write records one at a time as a JSON array, formatted like
+        json.dump(list(records), f, indent=2, ensure_ascii=False)
+        
+        Returns:
+            Number of records written
+        """
+        count = 0
+        for record in records:
+            f.write(',\n  ' if count else '[\n  ')
+            f.write(json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+            count += 1
+        
+        f.write('\n]' if count else '[]')
+        return count
+    
+    def _write_table_csv(self, f, columns: List[str], row_batches):
+        """Write batches of row values as CSV, in the column order of the records export"""
+        order = sorted(range(len(columns)), key=columns.__getitem__)
+        
+        writer = csv.writer(f)
+        writer.writerow([columns[index] for index in order])
+        for rows in row_batches:
+            for row in rows:
+                writer.writerow([row[index] for index in order])
+    
+    def _write_csv_stream(self, file_path: str, stream: RecordStream):
+        """Write a RecordStream as CSV, with the columns found in its first batch"""
+        batches = stream.batches()
+        first_batch = next(batches, None)
+        if first_batch is None:
+            raise ValueError("No data to export")
+        
+        if is_table(first_batch):
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                self._write_table_csv(
+                    f,
+                    first_batch['columns'],
+                    (batch['rows'] for batch in itertools.chain([first_batch], batches))
+                )
+            return
+        
+        fieldnames = set()
+        for item in first_batch:
+            if isinstance(item, dict):
+                fieldnames.update(item.keys())
+        
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=sorted(fieldnames))
+            writer.writeheader()
+            
+            for batch in itertools.chain([first_batch], batches):
+                for item in batch:
+                    if isinstance(item, dict):
+                        writer.writerow(item)
+                    else:
+                        # Convert non-dict items to dict
+                        writer.writerow({'value': str(item)})
+    
     def _export_json(self, file_path: str, data: Any) -> Dict[str, Any]:
         """Export data as JSON"""
         import os
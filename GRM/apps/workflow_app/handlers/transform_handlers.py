@@ -4,10 +4,31 @@ Transform node handlers for data manipulation
 import json
 import re
 from typing import Dict, Any, List
+from django.conf import settings
 from .base import BaseNodeHandler
+from .columnar import ColumnarFrame, group_key, is_available as columnar_available
+from ..streams import is_stream
+from ..tables import is_table, make_table, to_records, column_getter
 
 class DataTransformHandler(BaseNodeHandler):
-    """Handler for data transformation nodes"""
+    """
+    Handler for data transformation nodes
+    
+    Large record lists go through a columnar path (NumPy, when installed):
+    each field is extracted once and filters/aggregations run vectorized.
+    The config key 'columnar' can force it on (true) or off (false); by
+    default it is used from WORKFLOW_COLUMNAR_MIN_ROWS records.
+    
+    Streamed input (RecordStream) is processed batch by batch: map and
+    filter return a new lazy stream, aggregate reads the stream once and
+    keeps only running totals.
+    
+    Columnar input (tables.make_table) stays columnar through map and
+    filter.
+    """
+    
+    supports_streaming = True
+    supports_columnar = True
     
     def execute(self, config: Dict[str, Any], input_data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         transform_type = config.get('transform_type', 'map')
@@ -17,8 +38,12 @@ class DataTransformHandler(BaseNodeHandler):
         mapped_input = self._apply_input_mapping(input_data, config.get('input_mapping', {}))
         data = mapped_input.get('data', {})
         
-        if transform_type == 'map':
-            result = self._map_fields(data, field_mappings)
+        if is_stream(data):
+            result = self._transform_stream(data, transform_type, field_mappings, config)
+        elif is_table(data):
+            result = self._transform_table(data, transform_type, field_mappings, config)
+        elif transform_type == 'map':
+            result = self._map_fields(data, field_mappings, config)
         elif transform_type == 'filter':
             result = self._filter_data(data, config)
         elif transform_type == 'aggregate':
@@ -29,7 +54,93 @@ class DataTransformHandler(BaseNodeHandler):
         # Apply output mapping
         return self._apply_output_mapping(result, config.get('output_mapping', {}))
     
-    def _map_fields(self, data: Any, mappings: List[Dict]) -> Dict[str, Any]:
+    def _transform_stream(self, stream, transform_type: str, field_mappings: Any, config: Dict) -> Dict[str, Any]:
+        """Apply a transformation to a RecordStream (of records or of tables)"""
+        if transform_type == 'map':
+            # Nested targets turn table batches into records (see _transform_table)
+            nested = any('.' in target_field for _, target_field in self._field_pairs(field_mappings))
+            return {
+                'data': stream.map_batches(
+                    lambda batch: self._transform_batch(batch, transform_type, field_mappings, config),
+                    tables=stream.tables and not nested
+                ),
+                'success': True,
+                'message': 'Mapping records as a stream'
+            }
+        elif transform_type == 'filter':
+            return {
+                'data': stream.map_batches(
+                    lambda batch: self._transform_batch(batch, transform_type, field_mappings, config),
+                    tables=stream.tables,
+                    keep_columns=True
+                ),
+                'success': True,
+                'message': 'Filtering records as a stream'
+            }
+        elif transform_type == 'aggregate':
+            return self._aggregate_stream(stream, config)
+        else:
+            raise ValueError(f"Unsupported transform type: {transform_type}")
+    
+    def _transform_batch(self, batch: Any, transform_type: str, field_mappings: Any, config: Dict) -> Any:
+        """Map or filter one batch of a stream"""
+        if is_table(batch):
+            return self._transform_table(batch, transform_type, field_mappings, config)['data']
+        elif transform_type == 'map':
+            return self._map_fields(batch, field_mappings, config)['data']
+        else:
+            return self._filter_data(batch, config)['data']
+    
+    def _transform_table(self, table: Dict, transform_type: str, field_mappings: Any, config: Dict) -> Dict[str, Any]:
+        """Apply a transformation to columnar data"""
+        rows = list(table['rows'])
+        get_value = column_getter(table['columns'], self._get_nested_value)
+        
+        if transform_type == 'map':
+            field_pairs = self._field_pairs(field_mappings)
+            if any('.' in target_field for _, target_field in field_pairs):
+                # Nested targets need records
+                return self._map_fields(to_records(table), field_mappings, config)
+            
+            mapped_rows = [[get_value(row, source_field) for source_field, _ in field_pairs] for row in rows]
+            return {
+                'data': make_table([target_field for _, target_field in field_pairs], mapped_rows),
+                'success': True,
+                'message': f'Mapped {len(mapped_rows)} items'
+            }
+        elif transform_type == 'filter':
+            result = self._filter_data(rows, config, get_value)
+            result['data'] = make_table(table['columns'], result['data'])
+            return result
+        elif transform_type == 'aggregate':
+            return self._aggregate_data(rows, config, get_value)
+        else:
+            raise ValueError(f"Unsupported transform type: {transform_type}")
+    
+    def _field_pairs(self, mappings: Any) -> List[tuple]:
+        """(source, target) pairs from field mappings (a list, or its JSON string)"""
+        if isinstance(mappings, str):
+            try:
+                mappings = json.loads(mappings) if mappings else []
+            except json.JSONDecodeError:
+                mappings = []
+        
+        field_pairs = []
+        for mapping in mappings:
+            if isinstance(mapping, dict):
+                source_field = mapping.get('source')
+                target_field = mapping.get('target')
+            else:
+                # Handle simple string mappings
+                source_field = mapping
+                target_field = mapping
+            
+            if source_field and target_field:
+                field_pairs.append((source_field, target_field))
+        
+        return field_pairs
+    
+    def _map_fields(self, data: Any, mappings: List[Dict], config: Dict = None) -> Dict[str, Any]:
         """Map fields from input to output"""
         # Parse mappings if string
         if isinstance(mappings, str):
@@ -39,22 +150,22 @@ class DataTransformHandler(BaseNodeHandler):
                 mappings = []
         
         if isinstance(data, list):
-            result = []
-            for item in data:
-                mapped_item = {}
-                for mapping in mappings:
-                    if isinstance(mapping, dict):
-                        source_field = mapping.get('source')
-                        target_field = mapping.get('target')
-                    else:
-                        # Handle simple string mappings
-                        source_field = mapping
-                        target_field = mapping
-                    
-                    if source_field and target_field:
+            field_pairs = self._field_pairs(mappings)
+            
+            if (field_pairs and self._use_columnar(data, config or {}) and
+                    not any('.' in target_field for _, target_field in field_pairs)):
+                frame = ColumnarFrame(data, self._get_nested_value)
+                targets = [target_field for _, target_field in field_pairs]
+                columns = [frame.column(source_field) for source_field, _ in field_pairs]
+                result = [dict(zip(targets, values)) for values in zip(*columns)]
+            else:
+                result = []
+                for item in data:
+                    mapped_item = {}
+                    for source_field, target_field in field_pairs:
                         value = self._get_nested_value(item, source_field)
                         self._set_nested_value(mapped_item, target_field, value)
-                result.append(mapped_item)
+                    result.append(mapped_item)
             return {'data': result, 'success': True, 'message': f'Mapped {len(result)} items'}
         else:
             mapped_data = {}
@@ -100,8 +211,10 @@ class DataTransformHandler(BaseNodeHandler):
         result.update(mapped_data)
         return result
     
-    def _filter_data(self, data: Any, config: Dict) -> Dict[str, Any]:
-        """Filter data based on conditions"""
+    def _filter_data(self, data: Any, config: Dict, get_value=None) -> Dict[str, Any]:
+        """Filter data based on conditions (get_value reads a field of a record)"""
+        get_value = get_value or self._get_nested_value
+        
         if not isinstance(data, list):
             data = [data]
         
@@ -109,11 +222,15 @@ class DataTransformHandler(BaseNodeHandler):
         filter_operator = config.get('filter_operator', 'equals')
         filter_value = config.get('filter_value', '')
         
-        filtered_data = []
-        for item in data:
-            item_value = self._get_nested_value(item, filter_field)
-            if self._evaluate_condition(item_value, filter_operator, filter_value):
-                filtered_data.append(item)
+        if self._use_columnar(data, config):
+            frame = ColumnarFrame(data, get_value)
+            filtered_data = frame.take(frame.mask(filter_field, filter_operator, filter_value))
+        else:
+            filtered_data = []
+            for item in data:
+                item_value = get_value(item, filter_field)
+                if self._evaluate_condition(item_value, filter_operator, filter_value):
+                    filtered_data.append(item)
         
         return {
             'data': filtered_data,
@@ -121,36 +238,143 @@ class DataTransformHandler(BaseNodeHandler):
             'message': f'Filtered to {len(filtered_data)} items'
         }
     
-    def _aggregate_data(self, data: Any, config: Dict) -> Dict[str, Any]:
-        """Aggregate data"""
+    def _aggregate_data(self, data: Any, config: Dict, get_value=None) -> Dict[str, Any]:
+        """Aggregate data (get_value reads a field of a record)"""
+        get_value = get_value or self._get_nested_value
+        
         if not isinstance(data, list):
             return {'data': data, 'success': True, 'message': 'No aggregation needed for single item'}
         
         agg_type = config.get('aggregation_type', 'count')
         agg_field = config.get('aggregation_field', '')
+        group_by = config.get('group_by', '')
         
-        if agg_type == 'count':
-            result = len(data)
-        elif agg_type == 'sum' and agg_field:
-            result = sum(float(self._get_nested_value(item, agg_field) or 0) for item in data)
-        elif agg_type == 'avg' and agg_field:
-            values = [float(self._get_nested_value(item, agg_field) or 0) for item in data]
-            result = sum(values) / len(values) if values else 0
-        elif agg_type == 'min' and agg_field:
-            values = [self._get_nested_value(item, agg_field) for item in data if self._get_nested_value(item, agg_field) is not None]
-            result = min(values) if values else None
-        elif agg_type == 'max' and agg_field:
-            values = [self._get_nested_value(item, agg_field) for item in data if self._get_nested_value(item, agg_field) is not None]
-            result = max(values) if values else None
+        if self._use_columnar(data, config):
+            frame = ColumnarFrame(data, get_value)
+            if group_by:
+                result = frame.group_aggregate(group_by, agg_type, agg_field)
+            else:
+                result = frame.aggregate(agg_type, agg_field)
+        elif group_by:
+            groups = {}
+            for item in data:
+                key = group_key(get_value(item, group_by))
+                groups.setdefault(key, []).append(item)
+            result = {
+                key: self._aggregate_rows(items, agg_type, agg_field, get_value)
+                for key, items in groups.items()
+            }
         else:
-            result = len(data)
+            result = self._aggregate_rows(data, agg_type, agg_field, get_value)
+        
+        result_data = {'result': result, 'type': agg_type, 'field': agg_field}
+        if group_by:
+            result_data['group_by'] = group_by
         
         return {
-            'data': {'result': result, 'type': agg_type, 'field': agg_field},
+            'data': result_data,
             'success': True,
             'message': f'Aggregated {len(data)} items using {agg_type}'
         }
     
+    def _aggregate_stream(self, stream, config: Dict) -> Dict[str, Any]:
+        """
+        Aggregate a RecordStream in one pass, keeping running totals per group
+        
+        Values are accumulated in record order, so the results are the same
+        as _aggregate_rows on the materialized records.
+        """
+        agg_type = config.get('aggregation_type', 'count')
+        agg_field = config.get('aggregation_field', '')
+        group_by = config.get('group_by', '')
+        
+        totals = {}
+        for batch in stream.batches():
+            if is_table(batch):
+                get_value = column_getter(batch['columns'], self._get_nested_value)
+                batch = batch['rows']
+            else:
+                get_value = self._get_nested_value
+            
+            for item in batch:
+                key = group_key(get_value(item, group_by)) if group_by else None
+                total = totals.get(key)
+                if total is None:
+                    total = totals[key] = {'count': 0, 'sum': 0, 'min': None, 'max': None}
+                
+                total['count'] += 1
+                if not agg_field:
+                    continue
+                
+                value = get_value(item, agg_field)
+                if agg_type in ('sum', 'avg'):
+                    total['sum'] += float(value or 0)
+                elif agg_type in ('min', 'max') and value is not None:
+                    # Strict comparisons keep the first of equal values, like min()/max()
+                    current = total[agg_type]
+                    if current is None or (value < current if agg_type == 'min' else value > current):
+                        total[agg_type] = value
+        
+        if group_by:
+            result = {key: self._finish_aggregate(total, agg_type, agg_field) for key, total in totals.items()}
+        else:
+            total = totals.get(None, {'count': 0, 'sum': 0, 'min': None, 'max': None})
+            result = self._finish_aggregate(total, agg_type, agg_field)
+        
+        result_data = {'result': result, 'type': agg_type, 'field': agg_field}
+        if group_by:
+            result_data['group_by'] = group_by
+        
+        return {
+            'data': result_data,
+            'success': True,
+            'message': f'Aggregated {stream.record_count} items using {agg_type}'
+        }
+    
+    def _finish_aggregate(self, total: Dict[str, Any], agg_type: str, agg_field: str) -> Any:
+        """Turn running totals from _aggregate_stream into the aggregated value"""
+        if agg_type == 'sum' and agg_field:
+            return total['sum']
+        elif agg_type == 'avg' and agg_field:
+            return total['sum'] / total['count'] if total['count'] else 0
+        elif agg_type in ('min', 'max') and agg_field:
+            return total[agg_type]
+        else:
+            return total['count']
+    
+    def _aggregate_rows(self, data: List[Any], agg_type: str, agg_field: str, get_value=None) -> Any:
+        """Aggregate a list of records one record at a time"""
+        get_value = get_value or self._get_nested_value
+        
+        if agg_type == 'count':
+            return len(data)
+        elif agg_type == 'sum' and agg_field:
+            return sum(float(get_value(item, agg_field) or 0) for item in data)
+        elif agg_type == 'avg' and agg_field:
+            values = [float(get_value(item, agg_field) or 0) for item in data]
+            return sum(values) / len(values) if values else 0
+        elif agg_type in ('min', 'max') and agg_field:
+            values = [get_value(item, agg_field) for item in data]
+            values = [value for value in values if value is not None]
+            if not values:
+                return None
+            return min(values) if agg_type == 'min' else max(values)
+        else:
+            return len(data)
+    
+    def _use_columnar(self, data: Any, config: Dict) -> bool:
+        """Whether to process a record list with the columnar path"""
+        if not isinstance(data, list) or not data or not columnar_available():
+            return False
+        
+        mode = str(config.get('columnar', 'auto')).lower()
+        if mode in ('false', 'off', 'no', '0'):
+            return False
+        if mode in ('true', 'on', 'yes', '1'):
+            return True
+        
+        return len(data) >= getattr(settings, 'WORKFLOW_COLUMNAR_MIN_ROWS', 10000)
+    
     def _get_nested_value(self, data: Dict, path: str) -> Any:
         """Get nested value using dot notation"""
         if not path:
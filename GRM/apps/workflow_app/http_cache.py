@@ -0,0 +1,244 @@
+"""
+HTTP response cache - Cache-Control aware caching with ETag/Last-Modified revalidation for GET requests
+"""
+import json
+import pickle
+import hashlib
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .http_pool import http_request
+from .utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached body
+STORED_HEADERS = ('Content-Type', 'Content-Encoding', 'Content-Language', 'Cache-Control', 'ETag', 'Last-Modified', 'Expires', 'Date', 'Vary')
+
+class HttpResponseCache:
+    """
+    Two-tier cache of GET responses (process-local LRU, then a Django cache backend).
+
+    Freshness follows the response's Cache-Control (s-maxage, max-age,
+    no-cache, no-store, private) or Expires header. Responses with an ETag
+    or Last-Modified validator are kept for WORKFLOW_HTTP_CACHE_RETAIN_SECONDS
+    beyond their freshness; once stale they are revalidated with
+    If-None-Match/If-Modified-Since and a 304 serves the stored body.
+    Keys cover the URL and all request headers, so responses fetched with
+    different credentials are never shared.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, key_prefix: str = 'workflow_http_response'):
+        self.key_prefix = key_prefix
+        self._local = LRUCache(max_size or getattr(settings, 'WORKFLOW_HTTP_CACHE_SIZE', 256))
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'revalidated': 0,
+            'misses': 0,
+            'stores': 0,
+            'skipped_too_large': 0,
+            'bytes_saved': 0,
+            'latency_saved_ms': 0.0
+        }
+
+    @property
+    def backend(self):
+        return caches[getattr(settings, 'WORKFLOW_HTTP_CACHE_ALIAS', 'default')]
+
+    def request(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> Tuple[requests.Response, Dict[str, Any]]:
+        """
+        Send a GET request, answering it from the cache when possible
+
+        Args:
+            url: Request URL
+            headers: Request headers
+            **kwargs: Further arguments of http_request (timeout...)
+
+        Returns:
+            Tuple of (response, cache info with status hit/revalidated/miss,
+            age_seconds, bytes_saved and latency_saved_ms)
+        """
+        headers = dict(headers or {})
+        key = self.make_key(url, headers)
+        entry = self._get(key)
+        now = time.time()
+
+        if entry is not None and now < entry['fresh_until']:
+            return self._served(entry, 'hit', now)
+
+        request_headers = dict(headers)
+        if entry is not None:
+            if entry['etag']:
+                request_headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        response = http_request('GET', url, headers=request_headers, **kwargs)
+
+        if entry is not None and response.status_code == 304:
+            # The stored body is still valid; take the new freshness headers
+            for name in STORED_HEADERS:
+                if name in response.headers:
+                    entry['headers'][name] = response.headers[name]
+            entry['fresh_until'], retain = self._lifetime(entry['headers'])
+            entry['stored_at'] = now
+            self._set(key, entry, retain)
+            return self._served(entry, 'revalidated', now)
+
+        with self._lock:
+            self._stats['misses'] += 1
+        self._store(key, response)
+        return response, {'status': 'miss', 'age_seconds': 0, 'bytes_saved': 0, 'latency_saved_ms': 0}
+
+    def make_key(self, url: str, headers: Dict[str, str]) -> str:
+        """Key of a GET request: the URL and its headers (names case-insensitive)"""
+        payload = {
+            'url': url,
+            'headers': sorted((str(name).lower(), str(value)) for name, value in headers.items())
+        }
+        encoded = json.dumps(payload, separators=(',', ':'))
+        return f"{self.key_prefix}:{hashlib.sha256(encoded.encode('utf-8')).hexdigest()}"
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for this process"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['revalidated'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['revalidated']) / lookups, 3) if lookups else 0
+        stats['latency_saved_ms'] = round(stats['latency_saved_ms'], 1)
+        return stats
+
+    def clear(self):
+        """Drop the process-local entries"""
+        self._local.clear()
+
+    def _store(self, key: str, response: requests.Response):
+        """Cache a response if its status and Cache-Control allow it"""
+        if response.status_code != 200:
+            return
+
+        cache_control = _cache_control(response.headers)
+        if 'no-store' in cache_control or 'private' in cache_control or response.headers.get('Vary', '').strip() == '*':
+            return
+
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        fresh_until, retain = self._lifetime(headers)
+        if retain <= 0:
+            return
+
+        entry = {
+            'status_code': response.status_code,
+            'headers': headers,
+            'content': response.content,
+            'encoding': response.encoding,
+            'url': response.url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fresh_until': fresh_until,
+            'stored_at': time.time(),
+            'elapsed_ms': response.elapsed.total_seconds() * 1000
+        }
+        if len(entry['content']) > getattr(settings, 'WORKFLOW_HTTP_CACHE_MAX_BYTES', 1000000):
+            with self._lock:
+                self._stats['skipped_too_large'] += 1
+            return
+
+        self._set(key, entry, retain)
+        with self._lock:
+            self._stats['stores'] += 1
+
+    def _lifetime(self, headers: Dict[str, str]) -> Tuple[float, float]:
+        """
+        Freshness of a response and how long to keep it
+
+        Returns:
+            Tuple of (time it is fresh until, seconds to keep it; 0 means do not cache)
+        """
+        now = time.time()
+        cache_control = _cache_control(headers)
+        max_age = None
+
+        if 'no-cache' in cache_control:
+            max_age = 0
+        elif 's-maxage' in cache_control or 'max-age' in cache_control:
+            try:
+                max_age = max(0, int(cache_control.get('s-maxage', cache_control.get('max-age'))))
+            except (TypeError, ValueError):
+                max_age = 0
+        elif 'Expires' in headers:
+            try:
+                expires = parsedate_to_datetime(headers['Expires']).timestamp()
+                date = parsedate_to_datetime(headers['Date']).timestamp() if 'Date' in headers else now
+                max_age = max(0, expires - date)
+            except (TypeError, ValueError):
+                max_age = 0
+
+        has_validator = 'ETag' in headers or 'Last-Modified' in headers
+        retain = (max_age or 0) + (getattr(settings, 'WORKFLOW_HTTP_CACHE_RETAIN_SECONDS', 86400) if has_validator else 0)
+        return now + (max_age or 0), retain
+
+    def _served(self, entry: Dict[str, Any], status: str, now: float) -> Tuple[requests.Response, Dict[str, Any]]:
+        """Response rebuilt from an entry, with its cache info"""
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['content']
+        response.encoding = entry['encoding']
+        response.url = entry['url']
+
+        # A revalidation still costs a round trip, only the body is saved
+        latency_saved_ms = entry['elapsed_ms'] if status == 'hit' else 0
+        with self._lock:
+            self._stats['hits' if status == 'hit' else 'revalidated'] += 1
+            self._stats['bytes_saved'] += len(entry['content'])
+            self._stats['latency_saved_ms'] += latency_saved_ms
+
+        return response, {
+            'status': status,
+            'age_seconds': round(now - entry['stored_at'], 1) if status == 'hit' else 0,
+            'bytes_saved': len(entry['content']),
+            'latency_saved_ms': round(latency_saved_ms, 1)
+        }
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Entry from the local tier, else from the backend"""
+        encoded = self._local.get(key)
+        if encoded is None:
+            try:
+                encoded = self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"HTTP cache lookup failed: {str(e)}")
+                return None
+            if encoded is None:
+                return None
+            self._local.set(key, encoded, ttl=getattr(settings, 'WORKFLOW_HTTP_CACHE_LOCAL_TTL', 60))
+        return pickle.loads(encoded)
+
+    def _set(self, key: str, entry: Dict[str, Any], retain: float):
+        """Store an entry in both tiers"""
+        encoded = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        self._local.set(key, encoded, ttl=min(retain, getattr(settings, 'WORKFLOW_HTTP_CACHE_LOCAL_TTL', 60)))
+        try:
+            self.backend.set(key, encoded, timeout=retain)
+        except Exception as e:
+            logger.warning(f"HTTP cache store failed: {str(e)}")
+
+def _cache_control(headers) -> Dict[str, Optional[str]]:
+    """Cache-Control directives by lower-cased name"""
+    directives = {}
+    for part in (headers.get('Cache-Control') or '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+http_cache = HttpResponseCache()
@@ -0,0 +1,259 @@
+"""
+HTTP session pool - keep-alive sessions per target host for HTTP-based nodes
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+from django.conf import settings
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """Thread-safe token bucket: rate requests per second, in bursts of up to burst"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"Rate limit must be positive, got {rate}")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst or rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take a token, sleeping until one is available
+
+        Args:
+            timeout: Seconds to wait at most (None waits as long as needed)
+
+        Returns:
+            True if a token was taken, False if the timeout would be exceeded
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+class HostSession:
+    """A keep-alive session for one host with its limits and counters"""
+
+    def __init__(self, host: str, session: requests.Session, max_concurrency: int, limiter: Optional[RateLimiter] = None):
+        self.host = host
+        self.session = session
+        self.max_concurrency = max_concurrency
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.limiter = limiter
+        self.stats = {
+            'requests': 0,
+            'errors': 0,
+            'in_flight': 0,
+            'max_in_flight': 0,
+            'waits': 0,
+            'wait_ms': 0.0,
+            'timeouts': 0,
+            'throttled': 0,
+            'throttle_ms': 0.0
+        }
+
+class HttpSessionPool:
+    """
+    Process-wide pool of requests sessions, one per scheme, host and port.
+
+    Each session mounts an HTTPAdapter that keeps up to pool_maxsize
+    connections alive and retries connection failures and the configured
+    statuses (responses are only retried for idempotent methods, so a POST
+    that reached the server is not sent twice). A per-host semaphore caps
+    the requests in flight to one host across all threads, so parallel
+    branches cannot overload a partner endpoint, and hosts listed in
+    WORKFLOW_HTTP_RATE_LIMITS also get a requests-per-second limit. Sessions
+    never store cookies: they are shared by every workflow in the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = OrderedDict()
+        self._evicted = 0
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request on the session of the URL's host
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Arguments of requests.Session.request (timeout, json, headers...)
+
+        Returns:
+            The response, with its body read
+
+        Raises:
+            requests.exceptions.Timeout: If no request slot for the host became free in time
+            requests.exceptions.RequestException: As raised by requests
+        """
+        host = self._host_session(url)
+        acquire_timeout = kwargs.get('timeout') or getattr(settings, 'WORKFLOW_HTTP_ACQUIRE_TIMEOUT', 30)
+        if isinstance(acquire_timeout, tuple):
+            acquire_timeout = sum(t for t in acquire_timeout if t)
+
+        if host.limiter is not None:
+            throttle_start = time.monotonic()
+            allowed = host.limiter.acquire(timeout=acquire_timeout)
+            throttle_ms = (time.monotonic() - throttle_start) * 1000
+            with self._lock:
+                if throttle_ms >= 1:
+                    host.stats['throttled'] += 1
+                    host.stats['throttle_ms'] += throttle_ms
+                if not allowed:
+                    host.stats['timeouts'] += 1
+            if not allowed:
+                raise requests.exceptions.Timeout(
+                    f"Rate limit of {host.limiter.rate}/s for {host.host} not met within {acquire_timeout}s"
+                )
+
+        if not host.slots.acquire(blocking=False):
+            wait_start = time.monotonic()
+            acquired = host.slots.acquire(timeout=acquire_timeout)
+            with self._lock:
+                host.stats['waits'] += 1
+                host.stats['wait_ms'] += (time.monotonic() - wait_start) * 1000
+                if not acquired:
+                    host.stats['timeouts'] += 1
+            if not acquired:
+                raise requests.exceptions.Timeout(
+                    f"No request slot for {host.host} (max_concurrency={host.max_concurrency}) "
+                    f"after {acquire_timeout}s"
+                )
+
+        with self._lock:
+            host.stats['requests'] += 1
+            host.stats['in_flight'] += 1
+            host.stats['max_in_flight'] = max(host.stats['max_in_flight'], host.stats['in_flight'])
+
+        try:
+            return host.session.request(method=method, url=url, **kwargs)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                host.stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                host.stats['in_flight'] -= 1
+            host.slots.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-host counters of this process"""
+        with self._lock:
+            return {
+                'hosts': {name: dict(host.stats) for name, host in self._hosts.items()},
+                'evicted': self._evicted
+            }
+
+    def close_all(self):
+        """Close every session and its kept-alive connections"""
+        with self._lock:
+            hosts = list(self._hosts.values())
+            self._hosts.clear()
+
+        for host in hosts:
+            host.session.close()
+
+    def _host_session(self, url: str) -> HostSession:
+        """Session for the URL's host, created on first use"""
+        parts = urlsplit(url)
+        if not parts.scheme or not parts.hostname:
+            raise requests.exceptions.InvalidURL(f"Invalid URL: {url}")
+
+        port = parts.port or {'http': 80, 'https': 443}.get(parts.scheme.lower())
+        key = f"{parts.scheme.lower()}://{parts.hostname.lower()}:{port}"
+
+        evicted = []
+        with self._lock:
+            host = self._hosts.get(key)
+            if host is None:
+                rate = getattr(settings, 'WORKFLOW_HTTP_RATE_LIMITS', {}).get(parts.hostname.lower())
+                host = self._hosts[key] = HostSession(
+                    key,
+                    _new_session(),
+                    max(1, getattr(settings, 'WORKFLOW_HTTP_MAX_CONCURRENCY_PER_HOST', 10)),
+                    RateLimiter(rate) if rate else None
+                )
+                # Drop the least recently used idle hosts beyond the limit
+                max_hosts = getattr(settings, 'WORKFLOW_HTTP_MAX_HOSTS', 100)
+                for name in list(self._hosts):
+                    if len(self._hosts) <= max_hosts:
+                        break
+                    idle = self._hosts[name]
+                    if name != key and idle.stats['in_flight'] == 0:
+                        evicted.append(self._hosts.pop(name))
+                self._evicted += len(evicted)
+            self._hosts.move_to_end(key)
+
+        for idle in evicted:
+            idle.session.close()
+        return host
+
+def _new_session() -> requests.Session:
+    """Session with keep-alive and retries from the WORKFLOW_HTTP_* settings"""
+    retry = Retry(
+        total=getattr(settings, 'WORKFLOW_HTTP_RETRIES', 2),
+        backoff_factor=getattr(settings, 'WORKFLOW_HTTP_RETRY_BACKOFF', 0.5),
+        status_forcelist=getattr(settings, 'WORKFLOW_HTTP_RETRY_STATUSES', (502, 503, 504)),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=getattr(settings, 'WORKFLOW_HTTP_POOL_MAXSIZE', 10),
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+http_pool = HttpSessionPool()
+
+def http_request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send an HTTP request for a node
+
+    Goes through the shared session pool unless WORKFLOW_HTTP_POOL_ENABLED
+    is off, in which case every call opens its own connection.
+
+    Args:
+        method: HTTP method
+        url: Request URL
+        **kwargs: Arguments of requests.request
+    """
+    if not getattr(settings, 'WORKFLOW_HTTP_POOL_ENABLED', True):
+        return requests.request(method=method, url=url, **kwargs)
+    return http_pool.request(method, url, **kwargs)
+
+def http_pool_metrics() -> Dict[str, Any]:
+    """Metrics of the shared session pool"""
+    return {
+        'enabled': getattr(settings, 'WORKFLOW_HTTP_POOL_ENABLED', True),
+        **http_pool.metrics()
+    }
@@ -0,0 +1,26 @@
+"""
+Management command to refresh the GRM PNR payment lookup table
+"""
+from django.core.management.base import BaseCommand
+
+from apps.workflow_app.payment_lookup import refresh_payment_lookup
+
+class Command(BaseCommand):
+    help = 'Refresh precomputed GRM payment-percentage results (pnr_payment_lookup)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every recent PNR instead of only those affected by new source rows',
+        )
+    
+    def handle(self, *args, **options):
+        result = refresh_payment_lookup(full=options['full'])
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed {result['pnrs']} PNRs in {result['duration_ms']:.0f}ms "
+                f"(full={result['full']}, watermarks={result['watermarks']})"
+            )
+        )
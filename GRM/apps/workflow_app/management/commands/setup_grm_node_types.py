@@ -23,7 +23,13 @@ class Command(BaseCommand):
                             'type': 'text',
                             'placeholder': 'PNR or {{input.pnr}}',
                             'label': 'PNR',
-                            'required': True
+                            'required': False
+                        },
+                        {
+                            'name': 'pnrs',
+                            'type': 'text',
+                            'placeholder': 'PNR1,PNR2 (batch check; without a PNR, list input is also checked as a batch)',
+                            'label': 'PNRs'
                         },
                         {
                             'name': 'transaction_master_id',
@@ -73,6 +79,43 @@ class Command(BaseCommand):
                             'type': 'number',
                             'default': 100,
                             'label': 'Limit'
+                        },
+                        {
+                            'name': 'use_replica',
+                            'type': 'checkbox',
+                            'default': True,
+                            'label': 'Read from Replica (when configured)'
+                        },
+                        {
+                            'name': 'incremental',
+                            'type': 'checkbox',
+                            'default': False,
+                            'label': 'Only New Requests (since the last successful run)'
+                        },
+                        {
+                            'name': 'watermark_column',
+                            'type': 'select',
+                            'options': ['request_master_id', 'requested_date'],
+                            'default': 'request_master_id',
+                            'label': 'Watermark Column'
+                        },
+                        {
+                            'name': 'watermark_key',
+                            'type': 'text',
+                            'default': 'default',
+                            'label': 'Watermark Key (unique per incremental node in a workflow)'
+                        },
+                        {
+                            'name': 'batch_size',
+                            'type': 'number',
+                            'default': 1000,
+                            'label': 'Batch Size'
+                        },
+                        {
+                            'name': 'max_rows',
+                            'type': 'number',
+                            'default': 0,
+                            'label': 'Max New Rows per Run (0 = all)'
                         }
                     ]
                 },
@@ -117,6 +117,37 @@ class Command(BaseCommand):
                             'type': 'number',
                             'default': 30,
                             'label': 'Timeout (seconds)'
+                        },
+                        {
+                            'name': 'result_format',
+                            'type': 'select',
+                            'options': ['records', 'columnar'],
+                            'default': 'records',
+                            'label': 'Result Format (columnar: shared column list + rows)'
+                        },
+                        {
+                            'name': 'for_each',
+                            'type': 'checkbox',
+                            'default': False,
+                            'label': 'One Request per Input Item ({{input.field}} refers to the item)'
+                        },
+                        {
+                            'name': 'concurrency',
+                            'type': 'number',
+                            'default': 8,
+                            'label': 'Concurrent Requests (for each item)'
+                        },
+                        {
+                            'name': 'rate_limit',
+                            'type': 'number',
+                            'default': 0,
+                            'label': 'Max Requests per Second (0 = unlimited)'
+                        },
+                        {
+                            'name': 'http_cache',
+                            'type': 'checkbox',
+                            'default': False,
+                            'label': 'Cache GET Responses (Cache-Control, ETag/Last-Modified)'
                         }
                     ]
                 },
@@ -163,6 +194,37 @@ class Command(BaseCommand):
                             'type': 'number',
                             'default': 100,
                             'label': 'Limit'
+                        },
+                        {
+                            'name': 'stream',
+                            'type': 'checkbox',
+                            'default': False,
+                            'label': 'Stream Records in Batches'
+                        },
+                        {
+                            'name': 'use_replica',
+                            'type': 'checkbox',
+                            'default': True,
+                            'label': 'Read from Replica (when configured)'
+                        },
+                        {
+                            'name': 'chunked_fetch',
+                            'type': 'checkbox',
+                            'default': False,
+                            'label': 'Chunked Fetch (stream row tuples through a server-side cursor)'
+                        },
+                        {
+                            'name': 'batch_size',
+                            'type': 'number',
+                            'default': 1000,
+                            'label': 'Batch Size'
+                        },
+                        {
+                            'name': 'result_format',
+                            'type': 'select',
+                            'options': ['records', 'columnar'],
+                            'default': 'records',
+                            'label': 'Result Format (columnar: shared column list + rows)'
                         }
                     ]
                 },
@@ -207,6 +269,43 @@ class Command(BaseCommand):
                             'type': 'number',
                             'default': 100,
                             'label': 'Limit'
+                        },
+                        {
+                            'name': 'stream',
+                            'type': 'checkbox',
+                            'default': False,
+                            'label': 'Stream Records in Batches'
+                        },
+                        {
+                            'name': 'use_replica',
+                            'type': 'checkbox',
+                            'default': True,
+                            'label': 'Read from Replica (when configured)'
+                        },
+                        {
+                            'name': 'query_cache',
+                            'type': 'checkbox',
+                            'default': False,
+                            'label': 'Cache Results (until the tables are written or the TTL expires)'
+                        },
+                        {
+                            'name': 'chunked_fetch',
+                            'type': 'checkbox',
+                            'default': False,
+                            'label': 'Chunked Fetch (stream row tuples through a server-side cursor)'
+                        },
+                        {
+                            'name': 'batch_size',
+                            'type': 'number',
+                            'default': 1000,
+                            'label': 'Batch Size'
+                        },
+                        {
+                            'name': 'result_format',
+                            'type': 'select',
+                            'options': ['records', 'columnar'],
+                            'default': 'records',
+                            'label': 'Result Format (columnar: shared column list + rows)'
                         }
                     ]
                 },
@@ -342,6 +441,59 @@ class Command(BaseCommand):
                 'handler_class': 'apps.workflow_app.handlers.condition_handlers.SwitchHandler'
             },
             
+            # Batches
+            {
+                'name': 'split_in_batches',
+                'display_name': 'Split In Batches',
+                'category': 'transform',
+                'description': 'Run the nodes up to a Merge Batches node once per chunk of the input list',
+                'icon': 'fa-layer-group',
+                'color': '#8b5cf6',
+                'config_schema': {
+                    'fields': [
+                        {
+                            'name': 'field',
+                            'type': 'text',
+                            'placeholder': 'data.items',
+                            'label': 'List Field (empty for the whole input)'
+                        },
+                        {
+                            'name': 'batch_size',
+                            'type': 'number',
+                            'default': 100,
+                            'label': 'Batch Size'
+                        },
+                        {
+                            'name': 'parallelism',
+                            'type': 'number',
+                            'default': 4,
+                            'label': 'Batches Run At A Time'
+                        }
+                    ]
+                },
+                'handler_class': 'apps.workflow_app.handlers.batch_handlers.SplitInBatchesHandler'
+            },
+            {
+                'name': 'merge_batches',
+                'display_name': 'Merge Batches',
+                'category': 'transform',
+                'description': 'Gather the results of every batch of a Split In Batches node',
+                'icon': 'fa-compress-alt',
+                'color': '#8b5cf6',
+                'config_schema': {
+                    'fields': [
+                        {
+                            'name': 'mode',
+                            'type': 'select',
+                            'options': ['concat', 'list'],
+                            'default': 'concat',
+                            'label': 'Merge Mode'
+                        }
+                    ]
+                },
+                'handler_class': 'apps.workflow_app.handlers.batch_handlers.MergeBatchesHandler'
+            },
+            
             # Actions
             {
                 'name': 'email_send',
@@ -378,6 +530,30 @@ class Command(BaseCommand):
                             'type': 'text',
                             'placeholder': 'noreply@example.com',
                             'label': 'From Email'
+                        },
+                        {
+                            'name': 'batch',
+                            'type': 'checkbox',
+                            'default': False,
+                            'label': 'One Email per Recipient ({{input.field}} refers to the recipient)'
+                        },
+                        {
+                            'name': 'recipients',
+                            'type': 'textarea',
+                            'placeholder': 'a@example.com, b@example.com (empty: use the input list)',
+                            'label': 'Recipients (batch)'
+                        },
+                        {
+                            'name': 'recipient_field',
+                            'type': 'text',
+                            'default': 'to',
+                            'label': 'Recipient Address Field of Input Items (batch)'
+                        },
+                        {
+                            'name': 'connections',
+                            'type': 'number',
+                            'default': 3,
+                            'label': 'Mail Connections (batch)'
                         }
                     ]
                 },
@@ -446,6 +622,13 @@ class Command(BaseCommand):
                             'default': 'fixed',
                             'label': 'Delay Type'
                         },
+                        {
+                            'name': 'delay_mode',
+                            'type': 'select',
+                            'options': ['sleep', 'park'],
+                            'default': 'sleep',
+                            'label': 'Delay Mode (park frees the worker)'
+                        },
                         {
                             'name': 'min_delay',
                             'type': 'number',
@@ -498,6 +681,12 @@ class Command(BaseCommand):
                             'type': 'text',
                             'placeholder': 'id,email',
                             'label': 'Unique Columns (for upsert)'
+                        },
+                        {
+                            'name': 'chunk_size',
+                            'type': 'number',
+                            'default': 1000,
+                            'label': 'Rows per INSERT Statement'
                         }
                     ]
                 },
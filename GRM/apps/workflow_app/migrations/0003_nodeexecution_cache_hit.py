@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow_app', '0002_workflowexecution_waiting_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nodeexecution',
+            name='cache_hit',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,28 @@
+import uuid
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow_app', '0003_nodeexecution_cache_hit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowWatermark',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, primary_key=True, serialize=False)),
+                ('key', models.CharField(max_length=100)),
+                ('column', models.CharField(max_length=100)),
+                ('position', models.JSONField(default=list)),
+                ('execution_id', models.UUIDField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('workflow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='watermarks', to='workflow_app.workflow')),
+            ],
+            options={
+                'unique_together': {('workflow', 'key')},
+            },
+        ),
+    ]
@@ -101,6 +101,7 @@ class WorkflowExecution(models.Model):
     STATUS_CHOICES = [
         ('queued', 'Queued'),
         ('running', 'Running'),
+        ('waiting', 'Waiting'),
         ('success', 'Success'),
         ('failed', 'Failed'),
         ('cancelled', 'Cancelled'),
@@ -190,6 +191,9 @@ class NodeExecution(models.Model):
     # Configuration used during execution
     node_config = models.JSONField(default=dict, blank=True)
     
+    # Result served from the node result cache instead of running the node
+    cache_hit = models.BooleanField(default=False)
+    
     class Meta:
         ordering = ['execution_order', 'started_at']
         indexes = [
@@ -322,4 +326,26 @@ class WorkflowVariable(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.name} ({self.scope})"
\ No newline at end of file
+        return f"{self.name} ({self.scope})"
+
+class WorkflowWatermark(models.Model):
+    """High-water mark of an incremental fetch node, per workflow"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    workflow = models.ForeignKey(Workflow, on_delete=models.CASCADE, related_name='watermarks')
+    
+    # Watermark key from the node configuration
+    key = models.CharField(max_length=100)
+    
+    # Keyset column the mark is kept for and the last position read
+    column = models.CharField(max_length=100)
+    position = models.JSONField(default=list)
+    
+    # Execution that last advanced the mark
+    execution_id = models.UUIDField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = [['workflow', 'key']]
+    
+    def __str__(self):
+        return f"{self.workflow.name} - {self.key}: {self.position}"
@@ -0,0 +1,121 @@
+"""
+Node result cache - memoizes node results by node type, resolved config and input
+"""
+import json
+import hashlib
+import logging
+from typing import Dict, Any, Optional
+from django.conf import settings
+from django.core.cache import caches
+
+from .utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+class NodeResultCache:
+    """
+    Two-tier cache of node results.
+
+    Lookups go to a process-local LRU first and then to the Django cache
+    backend (shared between workers, Redis in production). Results are stored
+    as JSON strings so every hit hands out an independent copy.
+
+    Nodes opt in with a positive cache_ttl (seconds) in their config.
+    """
+
+    # Config keys that control caching itself and must not change the key
+    IGNORED_CONFIG_KEYS = ('cache_ttl',)
+
+    # Seconds a backend hit is kept in the process-local tier
+    LOCAL_TTL = 60
+
+    def __init__(self, max_size: Optional[int] = None, key_prefix: str = 'workflow_node_result'):
+        self.key_prefix = key_prefix
+        self._local = LRUCache(max_size or getattr(settings, 'WORKFLOW_NODE_CACHE_SIZE', 512))
+
+    @property
+    def backend(self):
+        return caches[getattr(settings, 'WORKFLOW_NODE_CACHE_ALIAS', 'default')]
+
+    def make_key(self, node_type: str, config: Dict[str, Any], node_input: Dict[str, Any]) -> Optional[str]:
+        """
+        Build a stable key for a node invocation
+
+        Only the node's data and the workflow input are hashed, not the
+        execution context, which is different for every execution.
+
+        Args:
+            node_type: Node type name
+            config: Resolved node configuration
+            node_input: Prepared node input
+
+        Returns:
+            Hex digest key, or None if the invocation cannot be serialized
+        """
+        payload = {
+            'type': node_type,
+            'config': {key: value for key, value in config.items() if key not in self.IGNORED_CONFIG_KEYS},
+            'data': node_input.get('data'),
+            'workflow_input': node_input.get('workflow_input')
+        }
+
+        try:
+            encoded = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+        except (TypeError, ValueError):
+            return None
+
+        return f"{self.key_prefix}:{hashlib.sha256(encoded.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached node result
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        encoded = self._local.get(key)
+
+        if encoded is None:
+            try:
+                encoded = self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"Node result cache lookup failed: {str(e)}")
+                return None
+
+            if encoded is None:
+                return None
+
+            # Backend entries carry their own expiry; keep the local copy short-lived
+            self._local.set(key, encoded, ttl=self.LOCAL_TTL)
+
+        return json.loads(encoded)
+
+    def set(self, key: str, result: Dict[str, Any], ttl: float):
+        """
+        Cache a node result
+
+        Args:
+            key: Key from make_key
+            result: Node result
+            ttl: Seconds to keep the result
+        """
+        try:
+            encoded = json.dumps(result, default=str)
+        except (TypeError, ValueError):
+            return
+
+        self._local.set(key, encoded, ttl=ttl)
+
+        try:
+            self.backend.set(key, encoded, timeout=ttl)
+        except Exception as e:
+            logger.warning(f"Node result cache store failed: {str(e)}")
+
+    def clear(self):
+        """Drop the process-local entries"""
+        self._local.clear()
+
+result_cache = NodeResultCache()
@@ -0,0 +1,175 @@
+"""
+GRM payment lookup - precomputed payment-percentage results per PNR
+"""
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Any
+from django.conf import settings
+from django.db import connection, transaction, DatabaseError
+from django.utils import timezone
+
+from apps.shared.models import PnrPaymentLookup, PaymentLookupWatermark
+
+logger = logging.getLogger(__name__)
+
+# Source tables the payment check reads: their auto-increment key, and the
+# PNRs affected by rows with a key in (last refreshed, current maximum]
+SOURCES = {
+    'pnr_blocking_details': ('pnr_blocking_id', """
+        SELECT DISTINCT pnr
+        FROM pnr_blocking_details
+        WHERE pnr_blocking_id > %s AND pnr_blocking_id <= %s
+    """),
+    'request_approved_flight_details': ('request_approved_flight_id', """
+        SELECT DISTINCT pbd.pnr
+        FROM request_approved_flight_details as rafd
+        JOIN pnr_blocking_details as pbd ON pbd.request_approved_flight_id = rafd.request_approved_flight_id
+        WHERE rafd.request_approved_flight_id > %s AND rafd.request_approved_flight_id <= %s
+    """),
+    'series_request_details': ('series_request_id', """
+        SELECT DISTINCT pbd.pnr
+        FROM series_request_details as srd
+        JOIN request_approved_flight_details as rafd ON rafd.series_request_id = srd.series_request_id
+        JOIN pnr_blocking_details as pbd ON pbd.request_approved_flight_id = rafd.request_approved_flight_id
+        WHERE srd.series_request_id > %s AND srd.series_request_id <= %s
+    """),
+    'request_timeline_details': ('request_timeline_id', """
+        SELECT DISTINCT pbd.pnr
+        FROM request_timeline_details as rtd
+        JOIN request_approved_flight_details as rafd ON rafd.transaction_master_id = rtd.transaction_id
+        JOIN pnr_blocking_details as pbd ON pbd.request_approved_flight_id = rafd.request_approved_flight_id
+        WHERE rtd.request_timeline_id > %s AND rtd.request_timeline_id <= %s
+    """),
+}
+
+def lookup_enabled() -> bool:
+    """Whether payment checks read the lookup table (WORKFLOW_GRM_PAYMENT_LOOKUP)"""
+    return getattr(settings, 'WORKFLOW_GRM_PAYMENT_LOOKUP', False)
+
+def lookup_max_age() -> int:
+    """Seconds a lookup row is used after its last refresh (WORKFLOW_GRM_PAYMENT_LOOKUP_MAX_AGE)"""
+    return getattr(settings, 'WORKFLOW_GRM_PAYMENT_LOOKUP_MAX_AGE', 7200)
+
+def full_refresh_days() -> int:
+    """Age in days of the PNRs a full refresh covers (WORKFLOW_GRM_PAYMENT_LOOKUP_FULL_REFRESH_DAYS)"""
+    return getattr(settings, 'WORKFLOW_GRM_PAYMENT_LOOKUP_FULL_REFRESH_DAYS', 30)
+
+def stored_payment_types(pnrs: List[str]) -> Dict[str, str]:
+    """
+    Read precomputed results from the lookup table
+
+    Rows not refreshed within lookup_max_age() are left out, so PNRs whose
+    source rows changed in place are checked live until a full refresh
+    catches up.
+
+    Args:
+        pnrs: PNRs to look up
+
+    Returns:
+        Dict of stored PNR -> 'Y' or 'N' for the PNRs in the table (empty if
+        the table cannot be read)
+    """
+    from .handlers.grm_handlers import GRMPaymentCheckHandler
+
+    chunk_size = GRMPaymentCheckHandler.LOOKUP_CHUNK_SIZE
+    fresh_since = timezone.now() - timedelta(seconds=lookup_max_age())
+    results = {}
+
+    try:
+        for start in range(0, len(pnrs), chunk_size):
+            results.update(
+                PnrPaymentLookup.objects.filter(
+                    pnr__in=pnrs[start:start + chunk_size], refreshed_at__gte=fresh_since
+                ).values_list('pnr', 'payment_in_percent')
+            )
+    except DatabaseError as e:
+        logger.warning(f"PNR payment lookup unavailable, using live queries: {str(e)}")
+        return {}
+
+    return results
+
+def refresh_payment_lookup(full: bool = False) -> Dict[str, Any]:
+    """
+    Bring the lookup table up to date with the GRM tables
+
+    An incremental refresh recomputes only the PNRs affected by source rows
+    added since the last refresh (ids above each table's watermark). A full
+    refresh recomputes the PNRs of pnr_blocking_details rows created within
+    full_refresh_days() and drops the rows of every other PNR. Rows changed
+    in place in the source tables are only picked up by a full refresh.
+
+    Args:
+        full: Recompute the recent PNRs instead of the affected ones
+
+    Returns:
+        Summary with the number of PNRs refreshed and the new watermarks
+    """
+    from .handlers.grm_handlers import GRMPaymentCheckHandler
+
+    start_time = time.time()
+    started_at = timezone.now()
+    handler = GRMPaymentCheckHandler()
+
+    # Rows added while the refresh runs are left for the next one
+    high_water_marks = {table: _max_id(table, key) for table, (key, _) in SOURCES.items()}
+
+    if full:
+        created_since = started_at - timedelta(days=full_refresh_days())
+        pnrs = _fetch_pnrs(
+            "SELECT DISTINCT pnr FROM pnr_blocking_details WHERE created_date >= %s",
+            [created_since]
+        )
+    else:
+        watermarks = dict(PaymentLookupWatermark.objects.values_list('source', 'last_id'))
+        pnrs = []
+        for table, (_, sql) in SOURCES.items():
+            last_id = watermarks.get(table, 0)
+            if high_water_marks[table] > last_id:
+                pnrs.extend(_fetch_pnrs(sql, [last_id, high_water_marks[table]]))
+        pnrs = list(dict.fromkeys(pnrs))
+
+    chunk_size = handler.LOOKUP_CHUNK_SIZE
+    for start in range(0, len(pnrs), chunk_size):
+        chunk = pnrs[start:start + chunk_size]
+        resolved = handler._resolve_payment_types(chunk)
+
+        with transaction.atomic():
+            PnrPaymentLookup.objects.filter(pnr__in=chunk).delete()
+            PnrPaymentLookup.objects.bulk_create([
+                PnrPaymentLookup(
+                    pnr=pnr,
+                    transaction_master_id=transaction_master_id,
+                    series_group_id=series_group_id,
+                    payment_in_percent=payment_in_percent
+                )
+                for pnr, (transaction_master_id, series_group_id, payment_in_percent) in resolved.items()
+            ])
+
+    with transaction.atomic():
+        if full:
+            PnrPaymentLookup.objects.filter(refreshed_at__lt=started_at).delete()
+        for table, last_id in high_water_marks.items():
+            PaymentLookupWatermark.objects.update_or_create(source=table, defaults={'last_id': last_id})
+
+    duration_ms = (time.time() - start_time) * 1000
+    logger.info(f"Refreshed {len(pnrs)} PNR payment lookup rows (full={full}) in {duration_ms:.0f}ms")
+
+    return {
+        'full': full,
+        'pnrs': len(pnrs),
+        'watermarks': high_water_marks,
+        'duration_ms': duration_ms
+    }
+
+def _max_id(table: str, key: str) -> int:
+    """Highest key currently in a source table"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT MAX({key}) FROM {table}")
+        return cursor.fetchone()[0] or 0
+
+def _fetch_pnrs(sql: str, params: List[Any]) -> List[str]:
+    """Non-empty PNRs returned by a query"""
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall() if row[0]]
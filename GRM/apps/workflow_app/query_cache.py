@@ -0,0 +1,231 @@
+"""
+Query result cache - memoizes read query results by normalized SQL and parameters
+"""
+import json
+import pickle
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
+
+from .utils import LRUCache
+
+logger = logging.getLogger(__name__)
+
+class QueryResultCache:
+    """
+    Two-tier cache of query results (column names and row tuples).
+
+    Like NodeResultCache, lookups go to a process-local LRU first and then
+    to the Django cache backend. Entries are pickled, which keeps row values
+    such as dates and decimals intact and gives every hit its own copy.
+
+    Every table has a version token in the backend and keys include the
+    tokens of the tables a query reads, so invalidating a table makes all
+    cached results that read it unreachable, in every worker sharing the
+    backend. A result computed while the table changed is stored under the
+    old token and never served.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, key_prefix: str = 'workflow_query_result'):
+        self.key_prefix = key_prefix
+        self._local = LRUCache(max_size or getattr(settings, 'WORKFLOW_QUERY_CACHE_SIZE', 256))
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'skipped_too_large': 0,
+            'invalidations': 0,
+            'bytes_stored': 0,
+            'bytes_served': 0
+        }
+
+    @property
+    def backend(self):
+        return caches[getattr(settings, 'WORKFLOW_QUERY_CACHE_ALIAS', 'default')]
+
+    def ttl_for(self, tables: Iterable[str]) -> float:
+        """
+        Seconds a result reading the given tables may be cached
+
+        The shortest per-table TTL wins (WORKFLOW_QUERY_CACHE_TABLE_TTLS,
+        falling back to WORKFLOW_QUERY_CACHE_DEFAULT_TTL); 0 disables caching.
+        """
+        table_ttls = getattr(settings, 'WORKFLOW_QUERY_CACHE_TABLE_TTLS', {})
+        default_ttl = getattr(settings, 'WORKFLOW_QUERY_CACHE_DEFAULT_TTL', 60)
+        ttls = [table_ttls.get(table, default_ttl) for table in normalize_tables(tables)]
+        return min(ttls) if ttls else 0
+
+    def make_key(self, sql: str, params: List[Any], tables: Iterable[str]) -> Optional[str]:
+        """
+        Build the key of a query result
+
+        Args:
+            sql: Final SQL (whitespace is normalized)
+            params: Bound parameters
+            tables: Tables the query reads
+
+        Returns:
+            Hex digest key, or None if the table versions cannot be read
+        """
+        versions = self._table_versions(normalize_tables(tables))
+        if versions is None:
+            return None
+
+        payload = {
+            'sql': ' '.join(sql.split()),
+            'params': params,
+            'versions': versions
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+        return f"{self.key_prefix}:{hashlib.sha256(encoded.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Tuple[List[str], List[tuple]]]:
+        """
+        Get a cached result
+
+        Args:
+            key: Key from make_key
+
+        Returns:
+            Tuple of (columns, rows), or None on a miss
+        """
+        encoded = self._local.get(key)
+        entry = None
+
+        if encoded is None:
+            try:
+                encoded = self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"Query result cache lookup failed: {str(e)}")
+                encoded = None
+
+            if encoded is not None:
+                # Keep the local copy until the backend entry expires
+                entry = pickle.loads(encoded)
+                remaining = entry[0] - time.time()
+                if remaining > 0:
+                    self._local.set(key, encoded, ttl=remaining)
+
+        with self._lock:
+            if encoded is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['hits'] += 1
+            self._stats['bytes_served'] += len(encoded)
+
+        _, columns, rows = entry or pickle.loads(encoded)
+        return columns, rows
+
+    def set(self, key: str, columns: List[str], rows: List[tuple], ttl: float):
+        """
+        Cache a result, unless it is larger than WORKFLOW_QUERY_CACHE_MAX_BYTES
+
+        Args:
+            key: Key from make_key
+            columns: Column names
+            rows: Row tuples
+            ttl: Seconds to keep the result
+        """
+        entry = (time.time() + ttl, list(columns), list(rows))
+        encoded = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+
+        if len(encoded) > getattr(settings, 'WORKFLOW_QUERY_CACHE_MAX_BYTES', 1000000):
+            with self._lock:
+                self._stats['skipped_too_large'] += 1
+            return
+
+        self._local.set(key, encoded, ttl=ttl)
+        try:
+            self.backend.set(key, encoded, timeout=ttl)
+        except Exception as e:
+            logger.warning(f"Query result cache store failed: {str(e)}")
+
+        with self._lock:
+            self._stats['stores'] += 1
+            self._stats['bytes_stored'] += len(encoded)
+
+    def invalidate(self, *tables: str):
+        """
+        Make every cached result that reads any of the tables unreachable
+
+        Args:
+            tables: Table names written to
+        """
+        tables = normalize_tables(tables)
+        if not tables:
+            return
+
+        try:
+            self.backend.set_many({self._version_key(table): uuid.uuid4().hex for table in tables}, timeout=None)
+        except Exception as e:
+            # Entries are dropped by their TTL; drop this process's copies now
+            logger.warning(f"Query result cache invalidation failed: {str(e)}")
+            self._local.clear()
+
+        with self._lock:
+            self._stats['invalidations'] += len(tables)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for this process"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0
+        return stats
+
+    def clear(self):
+        """Drop the process-local entries"""
+        self._local.clear()
+
+    def _version_key(self, table: str) -> str:
+        return f"{self.key_prefix}:version:{table}"
+
+    def _table_versions(self, tables: List[str]) -> Optional[Dict[str, str]]:
+        """
+        Current version token of each table
+
+        A table without a token gets a new random one, so a token evicted
+        from the backend never matches keys built with an older token.
+        """
+        keys = {table: self._version_key(table) for table in tables}
+        try:
+            found = self.backend.get_many(list(keys.values()))
+            versions = {}
+            for table, key in keys.items():
+                version = found.get(key)
+                if version is None:
+                    self.backend.add(key, uuid.uuid4().hex, timeout=None)
+                    version = self.backend.get(key)
+                if version is None:
+                    return None
+                versions[table] = version
+            return versions
+        except Exception as e:
+            logger.warning(f"Query result cache version lookup failed: {str(e)}")
+            return None
+
+def normalize_tables(tables: Iterable[str]) -> List[str]:
+    """Distinct, lower-cased table names without quoting"""
+    names = []
+    for table in tables:
+        name = str(table or '').replace('`', '').strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return sorted(names)
+
+query_cache = QueryResultCache()
+
+def invalidate_tables(*tables: str):
+    """
+    Invalidation hook for handlers that write to tables
+
+    Args:
+        tables: Table names written to
+    """
+    query_cache.invalidate(*tables)
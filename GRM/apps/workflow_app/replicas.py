@@ -0,0 +1,142 @@
+"""
+Read-replica routing - read-only node queries go to a replica while it keeps up with the primary
+"""
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+from django.conf import settings
+from django.db import connections, DatabaseError
+
+from .db_pool import pooled_cursor
+from .streams import _is_enabled
+
+logger = logging.getLogger(__name__)
+
+class ReplicaMonitor:
+    """
+    Tracks whether the configured read replica may serve reads.
+
+    The replica's lag is measured at most once per
+    WORKFLOW_REPLICA_CHECK_INTERVAL seconds, by one thread at a time; other
+    threads use the last result meanwhile. Until a check has succeeded, and
+    whenever the replica is unreachable, stopped replicating or lags more
+    than WORKFLOW_REPLICA_MAX_LAG_SECONDS, reads go to the primary.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._alias = None
+        self._healthy = False
+        self._lag = None
+        self._checked_at = None
+        self._checking = False
+        self._error = ''
+
+    def read_alias(self) -> str:
+        """Alias to send a read-only query to: the replica if it is fit, else 'default'"""
+        alias = getattr(settings, 'WORKFLOW_READ_REPLICA', None)
+        if not alias or alias == 'default' or alias not in settings.DATABASES:
+            return 'default'
+
+        interval = getattr(settings, 'WORKFLOW_REPLICA_CHECK_INTERVAL', 10)
+        with self._lock:
+            fresh = (
+                self._alias == alias and self._checked_at is not None and
+                time.monotonic() - self._checked_at < interval
+            )
+            if fresh or self._checking:
+                return alias if self._alias == alias and self._healthy else 'default'
+            self._checking = True
+
+        healthy, lag, error = False, None, ''
+        try:
+            lag = measure_lag(alias)
+            max_lag = getattr(settings, 'WORKFLOW_REPLICA_MAX_LAG_SECONDS', 30)
+            healthy = lag is not None and lag <= max_lag
+            if not healthy:
+                error = 'replication stopped' if lag is None else f'lag {lag:.0f}s exceeds {max_lag}s'
+        except Exception as e:
+            error = str(e)
+        finally:
+            with self._lock:
+                if self._healthy != healthy or self._alias != alias:
+                    log = logger.info if healthy else logger.warning
+                    log(f"Read replica '{alias}' {'in use' if healthy else 'bypassed: ' + error}")
+                self._alias = alias
+                self._healthy = healthy
+                self._lag = lag
+                self._error = error
+                self._checked_at = time.monotonic()
+                self._checking = False
+
+        return alias if healthy else 'default'
+
+    def status(self) -> Dict[str, Any]:
+        """Result of the last replica check"""
+        with self._lock:
+            return {
+                'alias': self._alias,
+                'healthy': self._healthy,
+                'lag_seconds': self._lag,
+                'error': self._error,
+                'checked_seconds_ago': (
+                    round(time.monotonic() - self._checked_at, 1) if self._checked_at is not None else None
+                )
+            }
+
+replica_monitor = ReplicaMonitor()
+
+def read_alias(config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Database alias for a read-only node query
+
+    Args:
+        config: Node configuration; use_replica: false keeps the node on the
+            primary (e.g. to read rows written earlier in the workflow)
+
+    Returns:
+        The read replica's alias when it is configured and fit, else 'default'
+    """
+    if config is not None and not _is_enabled(config.get('use_replica', True)):
+        return 'default'
+    return replica_monitor.read_alias()
+
+def measure_lag(alias: str) -> Optional[float]:
+    """
+    Replication lag of a database, in seconds
+
+    Uses WORKFLOW_REPLICA_LAG_QUERY when set (a query returning the lag in
+    seconds, e.g. from a heartbeat table), otherwise the replica status on
+    MySQL. A database that is not replicating is up to date by definition.
+
+    Args:
+        alias: Database alias
+
+    Returns:
+        Lag in seconds, or None if replication is stopped
+    """
+    lag_query = getattr(settings, 'WORKFLOW_REPLICA_LAG_QUERY', None)
+
+    with pooled_cursor(alias) as cursor:
+        if lag_query:
+            cursor.execute(lag_query)
+            row = cursor.fetchone()
+            return float(row[0]) if row and row[0] is not None else None
+
+        if connections[alias].vendor != 'mysql':
+            return 0.0
+
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except DatabaseError:
+            # MySQL before 8.0.22 and MariaDB
+            cursor.execute("SHOW SLAVE STATUS")
+
+        row = cursor.fetchone()
+        if row is None:
+            return 0.0
+
+        status = dict(zip([col[0] for col in cursor.description], row))
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        return float(lag) if lag is not None else None
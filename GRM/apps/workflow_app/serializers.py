@@ -57,7 +57,8 @@ class NodeExecutionSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'node_id', 'node_type', 'node_name', 'status',
             'execution_order', 'started_at', 'finished_at', 'duration_ms',
-            'input_data', 'output_data', 'error_message', 'error_details'
+            'input_data', 'output_data', 'error_message', 'error_details',
+            'cache_hit'
         ]
         read_only_fields = ['id']
 
@@ -2,6 +2,7 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.core.cache import cache
 from .models import Workflow, WorkflowExecution, NodeType
+from .execution_plan import invalidate_execution_plan
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,6 +12,7 @@ def workflow_saved(sender, instance, created, **kwargs):
     """Clear cache when workflow is saved"""
     cache_key = f"workflow_{instance.id}"
     cache.delete(cache_key)
+    invalidate_execution_plan(instance.id)
     
     if created:
         logger.info(f"New workflow created: {instance.name} (ID: {instance.id})")
@@ -30,4 +32,5 @@ def workflow_deleted(sender, instance, **kwargs):
     """Clean up when workflow is deleted"""
     cache_key = f"workflow_{instance.id}"
     cache.delete(cache_key)
+    invalidate_execution_plan(instance.id)
     logger.info(f"Workflow deleted: {instance.name} (ID: {instance.id})")
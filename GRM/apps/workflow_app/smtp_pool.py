@@ -0,0 +1,253 @@
+"""
+Email connection pool - reusable authenticated mail backend connections for email nodes
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+class PooledEmailConnection:
+    """An opened mail backend connection with its pool bookkeeping"""
+
+    __slots__ = ('backend', 'max_messages', 'opened_at', 'last_used', 'messages')
+
+    def __init__(self, backend, max_messages: int):
+        self.backend = backend
+        self.max_messages = max_messages
+        self.opened_at = time.monotonic()
+        self.last_used = self.opened_at
+        self.messages = 0
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the connection has sent as many messages as it may"""
+        return self.messages >= self.max_messages
+
+class EmailConnectionPool:
+    """
+    Thread-safe pool of opened Django mail backend connections.
+
+    For the SMTP backend an opened connection is a logged-in SMTP session,
+    so sending many messages through the pool skips the TCP, TLS and AUTH
+    exchange for all but the first. Idle connections are checked with NOOP
+    before reuse (servers drop idle sessions) and connections are replaced
+    after max_messages sends, since many servers cap messages per session.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 4,
+        max_idle_seconds: float = 60,
+        max_messages: int = 100,
+        timeout: float = 30
+    ):
+        """
+        Args:
+            max_size: Maximum open connections (idle and checked out)
+            max_idle_seconds: Idle time after which a connection is closed instead of reused
+            max_messages: Messages after which a connection is replaced
+            timeout: Seconds to wait for a free connection when the pool is full
+        """
+        self.max_size = max(1, max_size)
+        self.max_idle_seconds = max_idle_seconds
+        self.max_messages = max(1, max_messages)
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._idle = deque()
+        self._size = 0
+        self._stats = {
+            'opened': 0,
+            'closed': 0,
+            'reused': 0,
+            'health_check_failures': 0,
+            'checkouts': 0,
+            'messages': 0,
+            'timeouts': 0
+        }
+
+    def acquire(self) -> PooledEmailConnection:
+        """
+        Check out an opened connection
+
+        Raises:
+            TimeoutError: If no connection became free within the timeout
+        """
+        deadline = time.monotonic() + self.timeout
+        pooled = None
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise TimeoutError(f"No email connection available (max_size={self.max_size}) after {self.timeout}s")
+                self._condition.wait(remaining)
+
+            self._stats['checkouts'] += 1
+
+        try:
+            if pooled is not None and not self._reusable(pooled):
+                self._close(pooled)
+                pooled = None
+            if pooled is None:
+                pooled = self._open()
+            else:
+                with self._condition:
+                    self._stats['reused'] += 1
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        return pooled
+
+    def release(self, pooled: PooledEmailConnection, broken: bool = False):
+        """
+        Return a checked-out connection
+
+        Args:
+            pooled: Connection from acquire
+            broken: Close the connection instead of reusing it (e.g. after a disconnect)
+        """
+        if broken or pooled.exhausted:
+            self._close(pooled)
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            return
+
+        pooled.last_used = time.monotonic()
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def record_sent(self, count: int = 1):
+        """Count messages sent on the pool's connections"""
+        with self._condition:
+            self._stats['messages'] += count
+
+    def close_all(self):
+        """Close the idle connections (checked-out ones are closed when released)"""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+
+        for pooled in idle:
+            self._close(pooled)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current pool state and counters"""
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'max_size': self.max_size,
+                **self._stats
+            }
+
+    def _open(self) -> PooledEmailConnection:
+        """Open a new backend connection"""
+        backend = get_connection(fail_silently=False)
+        backend.open()
+        with self._condition:
+            self._stats['opened'] += 1
+        return PooledEmailConnection(backend, self.max_messages)
+
+    def _reusable(self, pooled: PooledEmailConnection) -> bool:
+        """Whether an idle connection is recent enough and still answers"""
+        if time.monotonic() - pooled.last_used > self.max_idle_seconds:
+            return False
+
+        smtp = getattr(pooled.backend, 'connection', None)
+        if smtp is None or not hasattr(smtp, 'noop'):
+            return True
+        try:
+            return smtp.noop()[0] == 250
+        except Exception:
+            with self._condition:
+                self._stats['health_check_failures'] += 1
+            return False
+
+    def _close(self, pooled: PooledEmailConnection):
+        """Close a connection, ignoring errors from one that is already dropped"""
+        try:
+            pooled.backend.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled email connection: {str(e)}")
+        with self._condition:
+            self._stats['closed'] += 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_email_pool() -> EmailConnectionPool:
+    """The process-wide email connection pool, created on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = EmailConnectionPool(
+                    max_size=getattr(settings, 'WORKFLOW_EMAIL_POOL_MAX_SIZE', 4),
+                    max_idle_seconds=getattr(settings, 'WORKFLOW_EMAIL_POOL_MAX_IDLE_SECONDS', 60),
+                    max_messages=getattr(settings, 'WORKFLOW_EMAIL_POOL_MAX_MESSAGES', 100),
+                    timeout=getattr(settings, 'WORKFLOW_EMAIL_POOL_TIMEOUT', 30)
+                )
+    return _pool
+
+@contextmanager
+def pooled_email_connection():
+    """
+    Opened mail backend connection for the duration of a block
+
+    Yields a PooledEmailConnection; send with its backend and count the
+    sends with record_sent(). Without WORKFLOW_EMAIL_POOL_ENABLED the
+    connection is opened for the block and closed afterwards. A block that
+    raises returns its connection closed.
+    """
+    if not getattr(settings, 'WORKFLOW_EMAIL_POOL_ENABLED', True):
+        backend = get_connection(fail_silently=False)
+        backend.open()
+        try:
+            yield PooledEmailConnection(backend, getattr(settings, 'WORKFLOW_EMAIL_POOL_MAX_MESSAGES', 100))
+        finally:
+            backend.close()
+        return
+
+    pool = get_email_pool()
+    pooled = pool.acquire()
+    broken = True
+    try:
+        yield pooled
+        broken = False
+    finally:
+        pool.release(pooled, broken=broken)
+
+def record_sent(pooled: PooledEmailConnection, count: int = 1):
+    """Count messages sent on a connection from pooled_email_connection"""
+    pooled.messages += count
+    if getattr(settings, 'WORKFLOW_EMAIL_POOL_ENABLED', True):
+        get_email_pool().record_sent(count)
+
+def email_pool_metrics() -> Dict[str, Any]:
+    """Metrics of the email connection pool"""
+    return {
+        'enabled': getattr(settings, 'WORKFLOW_EMAIL_POOL_ENABLED', True),
+        **(_pool.metrics() if _pool is not None else {})
+    }
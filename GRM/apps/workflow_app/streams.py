@@ -0,0 +1,246 @@
+"""
+Record streams - lazy batches of records passed between nodes
+"""
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional
+from django.conf import settings
+from django.db import connections
+
+from .db_pool import pooled_cursor
+from .tables import is_table, iter_records, make_table
+
+logger = logging.getLogger(__name__)
+
+class RecordStream:
+    """
+    Lazy, single-pass sequence of record batches.
+
+    A producer node returns a RecordStream as its 'data' instead of a list;
+    a consumer that supports streaming walks it batch by batch, so only one
+    batch is held in memory at a time. The engine materializes the stream
+    into a list for any other consumer.
+
+    The batches of a stream with tables set are columnar data
+    (tables.make_table) holding row tuples, and the stream materializes into
+    a single table. The engine only hands such a stream to handlers with
+    supports_columnar.
+    """
+
+    def __init__(
+        self,
+        source: Callable[[], Iterable[Any]],
+        columns: Optional[List[str]] = None,
+        tables: bool = False
+    ):
+        """
+        Args:
+            source: Callable returning an iterable of record batches; it is
+                called when iteration starts, on the consuming thread
+            columns: Column names, when known up front
+            tables: Whether the batches are columnar data instead of lists of records
+        """
+        self._source = source
+        self.columns = columns
+        self.tables = tables
+        self.consumed = False
+        self.record_count = 0
+
+    def batches(self) -> Iterator[Any]:
+        """
+        Iterate over the record batches (empty batches are skipped)
+
+        Raises:
+            RuntimeError: If the stream has already been consumed
+        """
+        if self.consumed:
+            raise RuntimeError("Record stream has already been consumed")
+        self.consumed = True
+
+        for batch in self._source():
+            size = len(batch['rows']) if is_table(batch) else len(batch)
+            if size:
+                self.record_count += size
+                yield batch
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the records (rows of columnar batches as dicts)"""
+        for batch in self.batches():
+            if is_table(batch):
+                yield from iter_records(batch)
+            else:
+                yield from batch
+
+    def materialize(self) -> Any:
+        """Read the whole stream into a list, or into one table if tables is set"""
+        records = []
+        columns = None
+        for batch in self.batches():
+            if is_table(batch):
+                columns = batch['columns']
+                records.extend(batch['rows'])
+            else:
+                records.extend(batch)
+
+        if self.tables:
+            # The query's columns when it returned no rows
+            return make_table(columns or self.columns or [], records)
+        return records
+
+    def map_batches(
+        self,
+        func: Callable[[Any], Any],
+        columns: Optional[List[str]] = None,
+        tables: bool = False,
+        keep_columns: bool = False
+    ) -> 'RecordStream':
+        """
+        Lazily apply a function to every batch
+
+        Args:
+            func: Function taking a batch and returning the transformed batch
+            columns: Column names of the transformed records, when known
+            tables: Whether func returns columnar data
+            keep_columns: The transformed records have this stream's columns
+                (e.g. a filter); they are read from it as its batches are
+                pulled, since a query stream learns them only when it runs
+
+        Returns:
+            New RecordStream over the transformed batches
+        """
+        def mapped_batches() -> Iterator[Any]:
+            for batch in self.batches():
+                if keep_columns:
+                    mapped.columns = self.columns
+                yield func(batch)
+            if keep_columns:
+                mapped.columns = self.columns
+
+        mapped = RecordStream(mapped_batches, columns=self.columns if keep_columns else columns, tables=tables)
+        return mapped
+
+    def __repr__(self):
+        state = f"consumed, {self.record_count} records" if self.consumed else "pending"
+        return f"<RecordStream ({state})>"
+
+@contextmanager
+def chunked_cursor(using: str = 'default'):
+    """
+    Cursor for reading a large result set with fetchmany
+
+    On MySQL this is an unbuffered server-side cursor (SSCursor) on a
+    dedicated connection: rows are sent as they are fetched instead of being
+    buffered in the client first, and the shared connection stays usable
+    while the result is read. Closing the dedicated connection discards any
+    rows that were not read. Other backends get a regular cursor.
+
+    Args:
+        using: Database alias
+    """
+    if connections[using].vendor != 'mysql':
+        with connections[using].cursor() as cursor:
+            yield cursor
+        return
+
+    from pymysql.cursors import SSCursor
+
+    wrapper = connections.create_connection(using)
+    try:
+        wrapper.ensure_connection()
+        yield wrapper.connection.cursor(SSCursor)
+    finally:
+        wrapper.close()
+
+def query_stream(
+    sql: str,
+    params: Optional[List[Any]] = None,
+    batch_size: int = 1000,
+    using: str = 'default',
+    server_side: bool = False,
+    tables: bool = False
+) -> RecordStream:
+    """
+    Stream the rows of a query as batches of dicts, or of columnar data
+
+    The query runs when the stream is first iterated, on the consumer's
+    thread, and rows are read with fetchmany.
+
+    Args:
+        sql: SELECT statement
+        params: Query parameters
+        batch_size: Rows per batch
+        using: Database alias
+        server_side: Read through a chunked_cursor instead of a pooled_cursor
+        tables: Yield each batch as columnar data holding the fetched row
+            tuples, with one column list, instead of a dict per row
+
+    Returns:
+        RecordStream of row dicts, or of tables if tables is set
+    """
+    batch_size = max(1, int(batch_size))
+
+    def read_batches() -> Iterator[Any]:
+        cursor_context = chunked_cursor(using) if server_side else pooled_cursor(using)
+        with cursor_context as cursor:
+            cursor.execute(sql, params or [])
+            columns = [col[0] for col in cursor.description]
+            stream.columns = columns
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if tables:
+                    yield make_table(columns, rows)
+                else:
+                    yield [dict(zip(columns, row)) for row in rows]
+
+    stream = RecordStream(read_batches, tables=tables)
+    return stream
+
+def stream_batch_size(config: Dict[str, Any]) -> Optional[int]:
+    """
+    Batch size for a node configured with stream: true
+
+    Args:
+        config: Resolved node configuration
+
+    Returns:
+        Records per batch, or None if the node should not stream its output
+    """
+    return _batch_size(config) if _is_enabled(config.get('stream')) else None
+
+def chunked_fetch_size(config: Dict[str, Any]) -> Optional[int]:
+    """
+    fetchmany size for a query node configured with chunked_fetch: true
+
+    Such a node streams its rows (as with stream: true) and reads them
+    through a chunked_cursor, so neither the client library nor the node
+    result ever holds the full result set. Its batches are columnar data
+    (the fetched row tuples with one column list), so a consumer that cannot
+    stream gets a single table rather than a dict per row.
+
+    Args:
+        config: Resolved node configuration
+
+    Returns:
+        Rows per fetch, or None if the node reads its result in one go
+    """
+    return _batch_size(config) if _is_enabled(config.get('chunked_fetch')) else None
+
+def _is_enabled(value: Any) -> bool:
+    """Read a boolean config flag, which may be a string from the node editor"""
+    return str(value).lower() in ('true', '1', 'yes', 'on')
+
+def _batch_size(config: Dict[str, Any]) -> int:
+    """batch_size from the node configuration, or WORKFLOW_STREAM_BATCH_SIZE"""
+    try:
+        batch_size = int(config.get('batch_size') or 0)
+    except (ValueError, TypeError):
+        batch_size = 0
+
+    return batch_size if batch_size > 0 else getattr(settings, 'WORKFLOW_STREAM_BATCH_SIZE', 1000)
+
+def is_stream(value: Any) -> bool:
+    """Whether a node's data is a RecordStream"""
+    return isinstance(value, RecordStream)
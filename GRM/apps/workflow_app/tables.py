@@ -0,0 +1,118 @@
+"""
+Columnar node data - {'format': 'columnar', 'columns': [...], 'rows': [[...], ...]} instead of a list of dicts
+"""
+from typing import Dict, List, Any, Callable, Iterator, Optional, Sequence
+
+# Marks data built by make_table, so other dicts with 'columns' and 'rows'
+# keys (HTTP responses, workflow input) are never taken for columnar data
+TABLE_FORMAT = 'columnar'
+
+def wants_table(config: Dict[str, Any]) -> bool:
+    """Whether a data node is configured with result_format: columnar"""
+    return str(config.get('result_format', 'records')).lower() == TABLE_FORMAT
+
+def is_table(value: Any) -> bool:
+    """Whether node data is in the columnar format"""
+    return (
+        isinstance(value, dict) and value.get('format') == TABLE_FORMAT and
+        isinstance(value.get('columns'), list) and isinstance(value.get('rows'), (list, tuple))
+    )
+
+def make_table(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> Dict[str, Any]:
+    """
+    Build columnar node data
+
+    Args:
+        columns: Column names
+        rows: Row values, in column order
+
+    Returns:
+        Dict with the 'format' mark and 'columns' and 'rows' lists
+    """
+    return {'format': TABLE_FORMAT, 'columns': list(columns), 'rows': list(rows)}
+
+def format_rows(columns: Sequence[str], rows: Sequence[Sequence[Any]], config: Dict[str, Any]) -> Any:
+    """
+    Shape query rows the way a data node is configured to return them
+
+    Args:
+        columns: Column names from cursor.description
+        rows: Row tuples from the cursor
+        config: Node configuration
+
+    Returns:
+        Columnar data if result_format is columnar, a list of dicts otherwise
+    """
+    if wants_table(config):
+        return make_table(columns, rows)
+    return [dict(zip(columns, row)) for row in rows]
+
+def from_records(records: List[Any]) -> Any:
+    """
+    Convert a list of dicts to columnar data
+
+    Columns are the keys in order of first appearance; keys missing from a
+    record become None. Anything but a list of dicts is returned unchanged.
+    """
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        return records
+
+    columns = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+
+    return make_table(columns, [[record.get(column) for column in columns] for record in records])
+
+def iter_records(table: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Iterate over the rows of columnar data as dicts"""
+    columns = table['columns']
+    for row in table['rows']:
+        yield dict(zip(columns, row))
+
+def to_records(table: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert columnar data to a list of dicts"""
+    return list(iter_records(table))
+
+def as_records(data: Any) -> Any:
+    """Adapter for code that expects records: columnar data becomes a list of dicts"""
+    return to_records(data) if is_table(data) else data
+
+def record_at(table: Dict[str, Any], index: int) -> Optional[Dict[str, Any]]:
+    """Row of columnar data as a dict, or None if the index is out of range"""
+    rows = table['rows']
+    if 0 <= index < len(rows):
+        return dict(zip(table['columns'], rows[index]))
+    return None
+
+def column_getter(columns: Sequence[str], get_nested: Callable[[Any, str], Any]) -> Callable[[Sequence[Any], str], Any]:
+    """
+    Build a dot-path accessor for rows of columnar data
+
+    The first path part selects the column, the rest is resolved in the
+    column value with get_nested, so paths mean the same as on records.
+
+    Args:
+        columns: Column names
+        get_nested: Dot-path accessor used for nested values
+
+    Returns:
+        Function (row, path) -> value
+    """
+    index = {column: position for position, column in enumerate(columns)}
+
+    def get_value(row: Sequence[Any], path: str) -> Any:
+        if not path:
+            return dict(zip(columns, row))
+
+        position = index.get(path)
+        if position is not None:
+            return row[position]
+
+        head, _, rest = path.partition('.')
+        position = index.get(head)
+        if position is None or not rest:
+            return None
+        return get_nested(row[position], rest)
+
+    return get_value
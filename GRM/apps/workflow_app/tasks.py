@@ -2,18 +2,20 @@
 Celery tasks for workflow execution
 """
 from celery import shared_task
+from celery.exceptions import Retry
 from django.utils import timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
 @shared_task(bind=True, max_retries=3)
-def execute_workflow_task(self, execution_id: str):
+def execute_workflow_task(self, execution_id: str, resume: bool = False):
     """
     Celery task to execute a workflow asynchronously
     
     Args:
         execution_id: UUID of the WorkflowExecution to run
+        resume: Continue from the execution's checkpoint (e.g. after a parked delay)
     """
     try:
         from .engine import WorkflowEngine
@@ -21,12 +23,13 @@ def execute_workflow_task(self, execution_id: str):
         logger.info(f"Starting workflow execution task for execution {execution_id}")
         
         engine = WorkflowEngine()
-        success = engine.execute_workflow(execution_id)
+        success = engine.execute_workflow(execution_id, resume=resume)
         
         if success:
             logger.info(f"Workflow execution {execution_id} completed successfully")
         else:
             logger.error(f"Workflow execution {execution_id} failed")
+            _retry_from_checkpoint(self, execution_id)
         
         return {
             'execution_id': execution_id,
@@ -34,13 +37,27 @@ def execute_workflow_task(self, execution_id: str):
             'completed_at': timezone.now().isoformat()
         }
         
+    except Retry:
+        raise
+        
     except Exception as e:
         logger.error(f"Workflow execution task failed: {str(e)}")
         
         # Retry the task if it hasn't exceeded max retries
         if self.request.retries < self.max_retries:
+            from .models import WorkflowExecution
+            # A resume only runs an execution that is queued (see WorkflowEngine._start_execution)
+            WorkflowExecution.objects.filter(
+                id=execution_id,
+                status__in=['failed', 'timeout']
+            ).update(status='queued', finished_at=None)
             logger.info(f"Retrying workflow execution {execution_id} (attempt {self.request.retries + 1})")
-            raise self.retry(countdown=60 * (self.request.retries + 1))  # Exponential backoff
+            # retry() keeps the original positional args, and callers pass the id positionally
+            raise self.retry(
+                args=[execution_id],
+                kwargs={'resume': True},
+                countdown=60 * (self.request.retries + 1)  # Exponential backoff
+            )
         
         # Mark execution as failed if max retries exceeded
         try:
@@ -55,6 +72,73 @@ def execute_workflow_task(self, execution_id: str):
         
         raise
 
+def _retry_from_checkpoint(task, execution_id: str):
+    """
+    Retry a failed execution from its checkpoint, within the workflow's
+    max_retries and retry_delay_seconds settings
+    
+    Args:
+        task: The bound execute_workflow_task
+        execution_id: UUID of the failed WorkflowExecution
+    """
+    from .models import WorkflowExecution
+    
+    execution = WorkflowExecution.objects.select_related('workflow').get(id=execution_id)
+    workflow = execution.workflow
+    
+    if execution.status != 'failed' or 'checkpoint' not in execution.execution_context:
+        return
+    
+    if task.request.retries >= workflow.max_retries:
+        return
+    
+    # Queue the execution before scheduling the retry, so a manual resume
+    # in the meantime is refused instead of running it a second time
+    queued = WorkflowExecution.objects.filter(id=execution_id, status='failed').update(status='queued', finished_at=None)
+    if not queued:
+        return
+    
+    countdown = workflow.retry_delay_seconds * (task.request.retries + 1)
+    logger.info(
+        f"Resuming workflow execution {execution_id} from its checkpoint in {countdown}s "
+        f"(attempt {task.request.retries + 1})"
+    )
+    raise task.retry(
+        args=[execution_id],
+        kwargs={'resume': True},
+        countdown=countdown,
+        max_retries=workflow.max_retries
+    )
+
+@shared_task
+def execute_workflows_async_task(execution_ids: list):
+    """
+    Celery task to run a batch of workflow executions concurrently on one
+    asyncio event loop, for I/O-bound workflows
+    
+    Args:
+        execution_ids: UUIDs of the WorkflowExecutions to run
+    """
+    from .async_engine import AsyncWorkflowEngine
+    
+    logger.info(f"Starting async execution of {len(execution_ids)} workflows")
+    
+    engine = AsyncWorkflowEngine()
+    try:
+        outcomes = engine.execute_workflows(execution_ids)
+    finally:
+        engine.close()
+    
+    succeeded = sum(1 for success in outcomes.values() if success)
+    logger.info(f"Async workflow batch finished: {succeeded}/{len(outcomes)} succeeded")
+    
+    return {
+        'executions': outcomes,
+        'succeeded': succeeded,
+        'failed': len(outcomes) - succeeded,
+        'completed_at': timezone.now().isoformat()
+    }
+
 @shared_task
 def cleanup_old_executions():
     """
@@ -232,3 +316,21 @@ def update_schedule_next_executions():
     logger.info(f"Updated next execution times for {updated_count} schedules")
     
     return {'updated_count': updated_count}
+
+@shared_task
+def refresh_payment_lookup_task(full: bool = False):
+    """
+    Refresh the precomputed GRM payment-percentage results
+    
+    Scheduled by beat; does nothing while WORKFLOW_GRM_PAYMENT_LOOKUP is off.
+    """
+    from .payment_lookup import lookup_enabled, refresh_payment_lookup
+    
+    if not lookup_enabled():
+        return {'full': full, 'pnrs': 0, 'skipped': True}
+    
+    result = refresh_payment_lookup(full=full)
+    
+    logger.info(f"Refreshed payment lookup for {result['pnrs']} PNRs")
+    
+    return result
@@ -0,0 +1,509 @@
+"""
+Tests for the workflow app
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from apps.shared.models import PnrPaymentLookup
+
+from .async_engine import AsyncWorkflowEngine
+from .engine import WorkflowEngine
+from .handlers import NODE_HANDLERS, BaseNodeHandler
+from .handlers.data_handlers import DatabaseQueryHandler
+from .handlers.grm_handlers import GRMPaymentCheckHandler
+from .handlers.transform_handlers import DataTransformHandler
+from .models import Workflow, WorkflowExecution, NodeExecution, WorkflowWatermark
+from .payment_lookup import lookup_enabled, refresh_payment_lookup
+from .streams import is_stream
+from .tables import from_records, is_table, make_table, to_records
+from .tasks import execute_workflow_task
+from .utils import ExpressionEvaluator, UnsafeExpressionError
+from .watermarks import fetch_incremental, get_watermark, watermark_output
+
+
+def traceback_depth(error):
+    depth, tb = 0, error.__traceback__
+    while tb is not None:
+        depth, tb = depth + 1, tb.tb_next
+    return depth
+
+
+class ExpressionEvaluatorTests(SimpleTestCase):
+    """ExpressionEvaluator must not give expressions access to interpreter internals"""
+
+    def setUp(self):
+        self.evaluator = ExpressionEvaluator()
+
+    def test_allowed_methods(self):
+        context = {'name': 'GRM', 'data': {'status': 'Y'}}
+        self.assertEqual(self.evaluator.evaluate("name.lower()", context), 'grm')
+        self.assertEqual(self.evaluator.evaluate("data.get('status') == 'Y'", context), True)
+
+    def test_frame_introspection_is_rejected(self):
+        expressions = [
+            "(x for x in []).gi_frame.f_globals",
+            "(x for x in []).gi_code",
+            "(x for x in []).gi_frame.f_back",
+            "data.items().mapping",
+        ]
+        for expression in expressions:
+            with self.subTest(expression=expression):
+                with self.assertRaises(UnsafeExpressionError):
+                    self.evaluator.compile(expression)
+                # evaluate() hands rejected expressions back unevaluated
+                self.assertEqual(self.evaluator.evaluate(expression, {'data': {}}), expression)
+
+    def test_dunder_attributes_are_rejected(self):
+        with self.assertRaises(UnsafeExpressionError):
+            self.evaluator.compile("''.__class__.__mro__")
+
+    def test_cached_rejections_raise_fresh_errors(self):
+        errors = []
+        for _ in range(3):
+            with self.assertRaises(UnsafeExpressionError) as raised:
+                self.evaluator.compile("x.__class__")
+            errors.append(raised.exception)
+
+        self.assertIsNot(errors[0], errors[1])
+        self.assertEqual(str(errors[0]), str(errors[2]))
+        # The traceback does not accumulate frames from earlier calls
+        self.assertEqual(traceback_depth(errors[0]), traceback_depth(errors[2]))
+
+        with self.assertRaises(SyntaxError):
+            self.evaluator.compile("x +")
+        with self.assertRaises(SyntaxError):
+            self.evaluator.compile("x +")
+
+
+class FailOnceHandler(BaseNodeHandler):
+    """Test node that fails on its first run when configured with fail_once"""
+    runs = []
+
+    def execute(self, config, input_data, context):
+        FailOnceHandler.runs.append(config['name'])
+        if config.get('fail_once') and FailOnceHandler.runs.count(config['name']) == 1:
+            raise ValueError('first run fails')
+        return {'data': {'name': config['name']}}
+
+
+class ResumeTests(TestCase):
+    """Failed executions resume from their checkpoint, once"""
+
+    def setUp(self):
+        FailOnceHandler.runs = []
+        patcher = mock.patch.dict(NODE_HANDLERS, {'fail_once': FailOnceHandler})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.workflow = Workflow.objects.create(
+            name='resume',
+            created_by_id=1,
+            retry_delay_seconds=0,
+            definition={
+                'nodes': [
+                    {'id': 'trigger', 'type': 'manual_trigger'},
+                    {'id': 'first', 'type': 'fail_once', 'config': {'name': 'first'}},
+                    {'id': 'second', 'type': 'fail_once', 'config': {'name': 'second', 'fail_once': True}},
+                ],
+                'connections': [
+                    {'source': 'trigger', 'target': 'first'},
+                    {'source': 'first', 'target': 'second'},
+                ],
+            }
+        )
+        self.execution = WorkflowExecution.objects.create(workflow=self.workflow)
+
+    def test_task_retries_from_checkpoint(self):
+        # Callers pass the execution id positionally
+        result = execute_workflow_task.apply(args=[str(self.execution.id)])
+
+        self.assertTrue(result.get()['success'])
+        self.execution.refresh_from_db()
+        self.assertEqual(self.execution.status, 'success')
+        # The retry reran only the failed node
+        self.assertEqual(FailOnceHandler.runs, ['first', 'second', 'second'])
+
+    def test_task_retries_after_unexpected_error(self):
+        run = WorkflowEngine.execute_workflow
+
+        def fail_first_call(engine, execution_id, resume=False):
+            if not resume:
+                WorkflowExecution.objects.filter(id=execution_id).update(status='failed')
+                raise RuntimeError('worker lost its connection')
+            return run(engine, execution_id, resume=resume)
+
+        with mock.patch.object(WorkflowEngine, 'execute_workflow', fail_first_call):
+            result = execute_workflow_task.apply(args=[str(self.execution.id)])
+
+        self.assertTrue(result.get()['success'])
+        self.execution.refresh_from_db()
+        self.assertEqual(self.execution.status, 'success')
+
+    def test_failed_execution_is_not_resumed_directly(self):
+        engine = WorkflowEngine()
+        self.assertFalse(engine.execute_workflow(str(self.execution.id)))
+        self.execution.refresh_from_db()
+        self.assertEqual(self.execution.status, 'failed')
+        self.assertIn('checkpoint', self.execution.execution_context)
+
+        # Only a queued (or parked) execution is claimed by a resume
+        self.assertFalse(engine.execute_workflow(str(self.execution.id), resume=True))
+        self.assertEqual(FailOnceHandler.runs, ['first', 'second'])
+
+    def test_resume_runs_once(self):
+        engine = WorkflowEngine()
+        engine.execute_workflow(str(self.execution.id))
+
+        queued = WorkflowExecution.objects.filter(
+            id=self.execution.id, status__in=['failed', 'timeout']
+        ).update(status='queued', finished_at=None)
+        self.assertEqual(queued, 1)
+
+        self.assertTrue(engine.execute_workflow(str(self.execution.id), resume=True))
+        self.assertFalse(engine.execute_workflow(str(self.execution.id), resume=True))
+
+        self.execution.refresh_from_db()
+        self.assertEqual(self.execution.status, 'success')
+        self.assertEqual(FailOnceHandler.runs, ['first', 'second', 'second'])
+        self.assertEqual(
+            NodeExecution.objects.filter(workflow_execution=self.execution, node_id='second', status='success').count(),
+            1
+        )
+
+
+class ColumnarTests(TestCase):
+    """Columnar data gives the same results as the equivalent list of dicts"""
+
+    def setUp(self):
+        self.records = [
+            {'pnr': f'P{i}', 'status': 'OPEN' if i % 3 else 'CLOSED', 'amount': i * 10, 'detail': {'seats': i % 4}}
+            for i in range(30)
+        ]
+        self.table = from_records(self.records)
+        self.handler = DataTransformHandler()
+
+    def transform(self, data, **config):
+        return self.handler.execute(config, {'data': data}, {})['data']
+
+    def test_only_marked_dicts_are_tables(self):
+        self.assertTrue(is_table(self.table))
+        self.assertEqual(to_records(self.table), self.records)
+        self.assertFalse(is_table({'columns': ['a'], 'rows': [[1]]}))
+
+    def test_transform_parity(self):
+        configs = [
+            {'transform_type': 'map', 'field_mappings': [{'source': 'pnr', 'target': 'id'}, {'source': 'detail.seats', 'target': 'seats'}]},
+            {'transform_type': 'filter', 'filter_field': 'status', 'filter_operator': 'equals', 'filter_value': 'OPEN'},
+            {'transform_type': 'filter', 'filter_field': 'detail.seats', 'filter_operator': 'greater_than', 'filter_value': '1'},
+            {'transform_type': 'aggregate', 'aggregation_type': 'sum', 'aggregation_field': 'amount', 'group_by': 'status'},
+            {'transform_type': 'aggregate', 'aggregation_type': 'max', 'aggregation_field': 'detail.seats'},
+            {'transform_type': 'aggregate', 'aggregation_type': 'avg', 'aggregation_field': 'amount'},
+        ]
+        for config in configs:
+            # columnar: false is the record-by-record path, true the vectorized one
+            expected = self.transform(self.records, columnar=False, **config)
+            for columnar in (False, True):
+                with self.subTest(config=config, columnar=columnar):
+                    self.assertEqual(self.transform(self.records, columnar=columnar, **config), expected)
+                    result = self.transform(self.table, columnar=columnar, **config)
+                    self.assertEqual(to_records(result) if is_table(result) else result, expected)
+
+    def test_unmarked_columns_and_rows_reach_handlers_unchanged(self):
+        received = []
+
+        class CaptureHandler(BaseNodeHandler):
+            def execute(self, config, input_data, context):
+                received.append(input_data['data'])
+                return {'data': input_data['data']}
+
+        workflow = Workflow.objects.create(
+            name='columnar',
+            created_by_id=1,
+            definition={
+                'nodes': [{'id': 'trigger', 'type': 'manual_trigger'}, {'id': 'capture', 'type': 'capture'}],
+                'connections': [{'source': 'trigger', 'target': 'capture'}],
+            }
+        )
+        response = {'columns': ['a', 'b'], 'rows': [[1, 2]]}
+        table = make_table(['a', 'b'], [[1, 2]])
+
+        with mock.patch.dict(NODE_HANDLERS, {'capture': CaptureHandler}):
+            for input_data in (response, table):
+                execution = WorkflowExecution.objects.create(workflow=workflow, input_data=input_data)
+                self.assertTrue(WorkflowEngine().execute_workflow(str(execution.id)))
+
+        self.assertEqual(received, [response, [{'a': 1, 'b': 2}]])
+
+
+class ChunkedFetchTests(TestCase):
+    """chunked_fetch streams row tuples that share one column list"""
+
+    def setUp(self):
+        for i in range(5):
+            Workflow.objects.create(name=f'workflow {i}', created_by_id=i % 2, definition={})
+        self.config = {'table_name': Workflow._meta.db_table, 'fields': 'name, created_by_id', 'limit': 0}
+
+    def query(self, **config):
+        return DatabaseQueryHandler().execute({**self.config, **config}, {}, {})['data']
+
+    def test_batches_are_tables_of_rows(self):
+        stream = self.query(chunked_fetch=True, batch_size=2)
+        self.assertTrue(is_stream(stream))
+
+        batches = list(stream.batches())
+        self.assertEqual([len(batch['rows']) for batch in batches], [2, 2, 1])
+        self.assertTrue(all(is_table(batch) for batch in batches))
+        self.assertEqual(batches[0]['columns'], ['name', 'created_by_id'])
+        self.assertEqual(stream.columns, ['name', 'created_by_id'])
+        self.assertEqual(stream.record_count, 5)
+
+    def test_materialized_stream_matches_records(self):
+        expected = self.query()
+        table = self.query(chunked_fetch=True, batch_size=2).materialize()
+
+        self.assertTrue(is_table(table))
+        self.assertEqual(to_records(table), expected)
+
+        empty = self.query(chunked_fetch=True, conditions="name = 'none'")
+        self.assertEqual(empty.materialize(), make_table(['name', 'created_by_id'], []))
+
+    def test_transforms_read_table_batches(self):
+        handler = DataTransformHandler()
+        configs = [
+            {'transform_type': 'filter', 'filter_field': 'created_by_id', 'filter_operator': 'equals', 'filter_value': '1'},
+            {'transform_type': 'map', 'field_mappings': [{'source': 'name', 'target': 'title'}]},
+            {'transform_type': 'aggregate', 'aggregation_type': 'count', 'group_by': 'created_by_id'},
+        ]
+        for config in configs:
+            with self.subTest(config=config):
+                expected = handler.execute(config, {'data': self.query()}, {})['data']
+                result = handler.execute(config, {'data': self.query(chunked_fetch=True, batch_size=2)}, {})['data']
+                if is_stream(result):
+                    result = to_records(result.materialize())
+                self.assertEqual(result, expected)
+
+    def test_filtered_stream_keeps_the_query_columns(self):
+        config = {'transform_type': 'filter', 'filter_field': 'created_by_id', 'filter_operator': 'equals', 'filter_value': '7'}
+        for query_config in ({'stream': True}, {'chunked_fetch': True}):
+            with self.subTest(query_config=query_config):
+                stream = self.query(**query_config)
+                filtered = DataTransformHandler().execute(config, {'data': stream}, {})['data']
+
+                # The query has not run yet, and none of its rows pass the filter
+                self.assertIsNone(filtered.columns)
+                self.assertEqual(list(filtered.batches()), [])
+                self.assertEqual(filtered.columns, ['name', 'created_by_id'])
+
+
+# Columns of the (unmanaged) GRM tables read by the payment check
+GRM_PAYMENT_TABLES = {
+    'pnr_blocking_details': "pnr_blocking_id integer PRIMARY KEY, pnr varchar(10), request_approved_flight_id integer, created_date datetime",
+    'request_approved_flight_details': "request_approved_flight_id integer PRIMARY KEY, transaction_master_id integer, series_request_id integer",
+    'series_request_details': "series_request_id integer PRIMARY KEY, series_group_id integer",
+    'request_timeline_details': (
+        "request_timeline_id integer PRIMARY KEY, transaction_id integer, series_group_id integer, pnr_blocking_id integer, "
+        "timeline_type varchar(30), status varchar(30), percentage_value double precision, absolute_amount double precision"
+    ),
+}
+
+
+class PaymentLookupTests(TestCase):
+    """The precomputed payment lookup gives the live query's results"""
+
+    @classmethod
+    def setUpClass(cls):
+        # DDL before the class transaction starts
+        with connection.cursor() as cursor:
+            for table, columns in GRM_PAYMENT_TABLES.items():
+                cursor.execute(f"CREATE TABLE {table} ({columns})")
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.cursor() as cursor:
+            for table in GRM_PAYMENT_TABLES:
+                cursor.execute(f"DROP TABLE {table}")
+
+    def setUp(self):
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.executemany("INSERT INTO series_request_details VALUES (%s, %s)", [(100, 1), (200, 2), (300, 1)])
+            cursor.executemany(
+                "INSERT INTO request_approved_flight_details VALUES (%s, %s, %s)",
+                [(1, 10, 100), (2, 20, 200), (3, 30, 300)]
+            )
+            cursor.executemany(
+                "INSERT INTO pnr_blocking_details VALUES (%s, %s, %s, %s)",
+                [(1, 'PCT', 1, now), (2, 'ABS', 2, now), (3, 'NOFLIGHT', None, now), (4, 'OLD', 3, now - timedelta(days=400))]
+            )
+            cursor.executemany(
+                "INSERT INTO request_timeline_details VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                [
+                    (1, 10, 1, 1, 'PAYMENT', 'OPEN', 50, 0),
+                    (2, 20, 2, 2, 'PAYMENT', 'OPEN', 0, 100),
+                    (3, 30, 1, 4, 'PAYMENT', 'OPEN', 0, 500),
+                ]
+            )
+        self.pnrs = ['PCT', 'ABS', 'NOFLIGHT', 'OLD']
+        self.handler = GRMPaymentCheckHandler()
+
+    def check(self, pnrs=None):
+        return self.handler.execute({'pnrs': pnrs or self.pnrs}, {}, {})['data']['payment_in_percent']
+
+    def test_lookup_is_off_by_default(self):
+        self.assertFalse(lookup_enabled())
+        self.assertEqual(self.check(), {'PCT': 'Y', 'ABS': 'N', 'NOFLIGHT': 'Y', 'OLD': 'N'})
+
+    @override_settings(WORKFLOW_GRM_PAYMENT_LOOKUP=True)
+    def test_refreshed_lookup_matches_live_query(self):
+        with self.settings(WORKFLOW_GRM_PAYMENT_LOOKUP=False):
+            live = self.check()
+
+        result = refresh_payment_lookup(full=True)
+
+        # The full refresh only covers recently created PNRs
+        self.assertEqual(result['pnrs'], 3)
+        stored = dict(PnrPaymentLookup.objects.values_list('pnr', 'payment_in_percent'))
+        self.assertEqual(stored, {pnr: live[pnr] for pnr in ['PCT', 'ABS', 'NOFLIGHT']})
+        self.assertEqual(self.check(), live)
+        self.assertEqual(self.handler.execute({'pnr': 'OLD'}, {}, {})['data']['payment_in_percent'], live['OLD'])
+
+    @override_settings(WORKFLOW_GRM_PAYMENT_LOOKUP=True, WORKFLOW_GRM_PAYMENT_LOOKUP_MAX_AGE=3600)
+    def test_rows_changed_in_place(self):
+        refresh_payment_lookup(full=True)
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE request_timeline_details SET percentage_value = 50, absolute_amount = 0 WHERE request_timeline_id = 2")
+
+        # No new source ids, so an incremental refresh does not see the change
+        self.assertEqual(refresh_payment_lookup()['pnrs'], 0)
+        self.assertEqual(self.check(['ABS']), {'ABS': 'N'})
+
+        # Rows older than the maximum age fall back to the live query
+        PnrPaymentLookup.objects.update(refreshed_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(self.check(['ABS']), {'ABS': 'Y'})
+
+        refresh_payment_lookup(full=True)
+        self.assertEqual(PnrPaymentLookup.objects.get(pnr='ABS').payment_in_percent, 'Y')
+
+    @override_settings(WORKFLOW_GRM_PAYMENT_LOOKUP=True)
+    def test_incremental_refresh_adds_new_rows(self):
+        refresh_payment_lookup(full=True)
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO pnr_blocking_details VALUES (5, 'NEW', 2, %s)", [timezone.now()])
+
+        self.assertEqual(refresh_payment_lookup()['pnrs'], 1)
+        self.assertEqual(PnrPaymentLookup.objects.get(pnr='NEW').payment_in_percent, 'N')
+
+
+class AsyncEngineConnectionTests(TestCase):
+    """Pool threads of the async engine keep their DB connections until close()"""
+
+    def test_sync_handlers_reuse_the_thread_connection(self):
+        class QueryHandler(BaseNodeHandler):
+            def execute(self, config, input_data, context):
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                return {'data': id(connection.connection)}
+
+        engine = AsyncWorkflowEngine(max_sync_workers=1)
+        connection_ids = {
+            engine._executor.submit(engine._run_sync_handler, QueryHandler(), {}, {}, {}).result()['data']
+            for _ in range(3)
+        }
+        self.assertEqual(len(connection_ids), 1)
+
+        thread_connections = list(engine._thread_connections)
+        self.assertEqual(len(thread_connections), 1)
+        # (SQLite keeps in-memory test databases open on close())
+        with mock.patch.object(thread_connections[0], 'close') as close:
+            engine.close()
+        close.assert_called_once_with()
+
+
+class IncrementalFetchHandler(BaseNodeHandler):
+    """Test node that reports having read up to config['position']"""
+
+    def execute(self, config, input_data, context):
+        return {'data': [], 'watermark': watermark_output('default', 'request_master_id', config['position'])}
+
+
+class WatermarkTests(TestCase):
+    """Watermarks advance only when the whole execution succeeds"""
+
+    def setUp(self):
+        patcher = mock.patch.dict(NODE_HANDLERS, {'incremental': IncrementalFetchHandler, 'fail_once': FailOnceHandler})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        FailOnceHandler.runs = []
+
+    def run_workflow(self, position, fail=False, test_mode=False, workflow=None):
+        workflow = workflow or Workflow.objects.create(
+            name='incremental',
+            created_by_id=1,
+            definition={
+                'nodes': [
+                    {'id': 'trigger', 'type': 'manual_trigger'},
+                    {'id': 'fetch', 'type': 'incremental', 'config': {'position': position}},
+                    {'id': 'save', 'type': 'fail_once', 'config': {'name': 'save', 'fail_once': fail}},
+                ],
+                'connections': [
+                    {'source': 'trigger', 'target': 'fetch'},
+                    {'source': 'fetch', 'target': 'save'},
+                ],
+            }
+        )
+        execution = WorkflowExecution.objects.create(workflow=workflow, execution_context={'test_mode': test_mode})
+        WorkflowEngine().execute_workflow(str(execution.id))
+        execution.refresh_from_db()
+        return workflow, execution
+
+    def position(self, workflow):
+        return get_watermark(str(workflow.id), 'default', 'request_master_id')
+
+    def test_success_commits_the_mark(self):
+        workflow, execution = self.run_workflow([10])
+        self.assertEqual(execution.status, 'success')
+        self.assertEqual(self.position(workflow), [10])
+        self.assertEqual(str(WorkflowWatermark.objects.get(workflow=workflow).execution_id), str(execution.id))
+
+    def test_failed_execution_keeps_the_mark(self):
+        workflow, execution = self.run_workflow([10], fail=True)
+        self.assertEqual(execution.status, 'failed')
+        self.assertIsNone(self.position(workflow))
+
+        # Resuming from the checkpoint commits the position read before the failure
+        WorkflowExecution.objects.filter(id=execution.id).update(status='queued')
+        self.assertTrue(WorkflowEngine().execute_workflow(str(execution.id), resume=True))
+        self.assertEqual(self.position(workflow), [10])
+
+    def test_mark_never_moves_backwards(self):
+        workflow, _ = self.run_workflow([10])
+        self.run_workflow([7], workflow=workflow)
+        self.assertEqual(self.position(workflow), [10])
+
+    def test_test_mode_does_not_commit(self):
+        workflow, execution = self.run_workflow([10], test_mode=True)
+        self.assertEqual(execution.status, 'success')
+        self.assertIsNone(self.position(workflow))
+
+    def test_keyset_pages_start_after_the_position(self):
+        for i in range(5):
+            Workflow.objects.create(name=f'workflow {i}', created_by_id=i + 1, definition={})
+        query = f"SELECT w.created_by_id FROM {Workflow._meta.db_table} w WHERE 1 = 1"
+
+        with connection.cursor() as cursor:
+            columns, rows, position, pages = fetch_incremental(cursor, query, [], ['w.created_by_id'], None, 2)
+            self.assertEqual([row[0] for row in rows], [1, 2, 3, 4, 5])
+            self.assertEqual((position, pages), ([5], 3))
+
+            columns, rows, position, pages = fetch_incremental(cursor, query, [], ['w.created_by_id'], [2], 2, max_rows=2)
+            self.assertEqual([row[0] for row in rows], [3, 4])
+            self.assertEqual(position, [4])
+
+            columns, rows, position, pages = fetch_incremental(cursor, query, [], ['w.created_by_id'], [5], 2)
+            self.assertEqual((rows, position), ([], [5]))
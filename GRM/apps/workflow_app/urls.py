@@ -21,6 +21,10 @@ urlpatterns = [
     # Additional API endpoints
     path('api/dashboard/stats/', api_views.dashboard_stats_api, name='dashboard_stats'),
     path('api/dashboard/recent-activity/', api_views.recent_activity_api, name='recent_activity'),
+    path('api/db-pools/stats/', api_views.db_pool_stats_api, name='db_pool_stats'),
+    path('api/query-cache/stats/', api_views.query_cache_stats_api, name='query_cache_stats'),
+    path('api/http-pool/stats/', api_views.http_pool_stats_api, name='http_pool_stats'),
+    path('api/email-pool/stats/', api_views.email_pool_stats_api, name='email_pool_stats'),
     path('api/executions/<uuid:execution_id>/logs/', api_views.execution_logs_api, name='execution_logs'),
     path('api/workflows/<uuid:workflow_id>/test/', api_views.test_workflow_api, name='test_workflow'),
     
@@ -2,14 +2,102 @@
 Utility classes for workflow execution
 """
 import re
+import ast
 import json
-from typing import Dict, Any, Optional
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Hashable, Tuple
 from django.template import Template, Context
 from django.template.engine import Engine
 
+class LRUCache:
+    """Thread-safe, size-bounded least-recently-used cache with optional TTL"""
+    
+    def __init__(self, max_size: int = 128, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value and mark it as most recently used
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss or an expired entry
+            
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value, evicting the least recently used entries when full
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds to keep the entry (defaults to the cache TTL)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: Hashable):
+        """Remove a key if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class CompiledTemplate:
+    """
+    A configuration string split once into literal text and accessors.
+    
+    Literal segments are plain strings; each {{ ... }} expression becomes an
+    accessor tuple of (kind, argument), with dotted paths already split.
+    """
+    
+    __slots__ = ('source', 'segments')
+    
+    def __init__(self, source: str, segments: Tuple):
+        self.source = source
+        self.segments = segments
+    
+    def __repr__(self):
+        return f"CompiledTemplate({self.source!r})"
+
 class VariableResolver:
     """Resolves variables and expressions in configuration strings"""
     
+    # Compiled templates are shared by every resolver, keyed by template text
+    _compiled_templates = LRUCache(max_size=4096)
+    
     def __init__(self):
         self.variable_pattern = re.compile(r'\{\{([^}]+)\}\}')
     
@@ -25,49 +113,199 @@ class VariableResolver:
         Returns:
             String with resolved variables
         """
-        if not isinstance(value, str):
+        if not isinstance(value, str) or '{{' not in value:
             return value
         
-        def replace_variable(match):
-            var_expression = match.group(1).strip()
-            return str(self._evaluate_expression(var_expression, context, input_data))
+        return self.render(self.compile(value), context, input_data)
+    
+    def compile(self, value: str) -> CompiledTemplate:
+        """
+        Compile a template string, reusing the cached form when available
         
-        return self.variable_pattern.sub(replace_variable, value)
+        Args:
+            value: String containing {{ ... }} variables
+            
+        Returns:
+            CompiledTemplate for the string
+        """
+        compiled = self._compiled_templates.get(value)
+        if compiled is not None:
+            return compiled
+        
+        segments = []
+        position = 0
+        for match in self.variable_pattern.finditer(value):
+            if match.start() > position:
+                segments.append(value[position:match.start()])
+            segments.append(self._compile_expression(match.group(1).strip()))
+            position = match.end()
+        
+        if position < len(value):
+            segments.append(value[position:])
+        
+        compiled = CompiledTemplate(value, tuple(segments))
+        self._compiled_templates.set(value, compiled)
+        return compiled
     
-    def _evaluate_expression(self, expression: str, context: Dict[str, Any], input_data: Dict[str, Any]) -> Any:
+    def render(self, template: CompiledTemplate, context: Dict[str, Any], input_data: Dict[str, Any]) -> str:
         """
-        Evaluate a variable expression
+        Render a compiled template
         
         Args:
-            expression: Variable expression to evaluate
+            template: Template from compile()
             context: Execution context
-            input_data: Input data
+            input_data: Input data from previous nodes
             
         Returns:
-            Evaluated value
+            String with resolved variables
+        """
+        return ''.join(
+            segment if isinstance(segment, str)
+            else str(self._evaluate_accessor(segment, context, input_data))
+            for segment in template.segments
+        )
+    
+    def compile_config(self, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Compile every template string in a node configuration
+        
+        Follows the traversal of WorkflowEngine._resolve_node_config: dicts
+        are walked recursively, lists only at their dict and string items.
+        
+        Args:
+            config: Raw node configuration
+            
+        Returns:
+            Configuration with template strings replaced by CompiledTemplate
+            objects, or None if it contains no templates at all
+        """
+        compiled, has_templates = self._compile_value(config)
+        return compiled if has_templates else None
+    
+    def render_config(self, compiled_config: Dict[str, Any], context: Dict[str, Any], input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Render a configuration from compile_config into a new dict
+        
+        Args:
+            compiled_config: Configuration from compile_config
+            context: Execution context
+            input_data: Input data from previous nodes
+            
+        Returns:
+            Dict with resolved configuration
+        """
+        return self._render_value(compiled_config, context, input_data)
+    
+    def _compile_value(self, value: Any) -> Tuple[Any, bool]:
+        """Compile templates in a config value, reporting whether any were found"""
+        if isinstance(value, str):
+            if '{{' in value and self.variable_pattern.search(value):
+                return self.compile(value), True
+            return value, False
+        
+        if isinstance(value, dict):
+            compiled = {}
+            has_templates = False
+            for key, item in value.items():
+                compiled[key], found = self._compile_value(item)
+                has_templates = has_templates or found
+            return compiled, has_templates
+        
+        if isinstance(value, list):
+            compiled = []
+            has_templates = False
+            for item in value:
+                if isinstance(item, (dict, str)):
+                    item, found = self._compile_value(item)
+                    has_templates = has_templates or found
+                compiled.append(item)
+            return compiled, has_templates
+        
+        return value, False
+    
+    def _render_value(self, value: Any, context: Dict[str, Any], input_data: Dict[str, Any]) -> Any:
+        """Render a value from _compile_value"""
+        if isinstance(value, CompiledTemplate):
+            return self.render(value, context, input_data)
+        if isinstance(value, dict):
+            return {key: self._render_value(item, context, input_data) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._render_value(item, context, input_data) for item in value]
+        return value
+    
+    def _compile_expression(self, expression: str) -> Tuple[str, Any]:
+        """
+        Compile a variable expression into an accessor
+        
+        Args:
+            expression: Variable expression (without braces)
+            
+        Returns:
+            Tuple of (accessor kind, name or path parts)
         """
         # Handle special variables
         if expression == 'now()':
-            from django.utils import timezone
-            return timezone.now().isoformat()
+            return ('now', None)
         elif expression == 'timestamp':
-            import time
-            return str(int(time.time()))
+            return ('timestamp', None)
         elif expression.startswith('env.'):
-            import os
-            env_var = expression[4:]
-            return os.getenv(env_var, '')
+            return ('env', expression[4:])
         
         # Handle input data references
         if expression.startswith('input.'):
-            return self._get_nested_value(input_data.get('data', {}), expression[6:])
+            return ('input', tuple(expression[6:].split('.')))
         elif expression.startswith('context.'):
-            return self._get_nested_value(context, expression[8:])
+            return ('context', tuple(expression[8:].split('.')))
         elif expression.startswith('variables.'):
-            return self._get_nested_value(context.get('variables', {}), expression[10:])
+            return ('variables', tuple(expression[10:].split('.')))
         
         # Default to looking in input data
-        return self._get_nested_value(input_data.get('data', {}), expression)
+        return ('input', tuple(expression.split('.')))
+    
+    def _evaluate_accessor(self, accessor: Tuple[str, Any], context: Dict[str, Any], input_data: Dict[str, Any]) -> Any:
+        """
+        Evaluate a compiled accessor
+        
+        Args:
+            accessor: Accessor from _compile_expression
+            context: Execution context
+            input_data: Input data
+            
+        Returns:
+            Evaluated value
+        """
+        kind, argument = accessor
+        
+        if kind == 'input':
+            return self._get_path_value(input_data.get('data', {}), argument)
+        elif kind == 'context':
+            return self._get_path_value(context, argument)
+        elif kind == 'variables':
+            return self._get_path_value(context.get('variables', {}), argument)
+        elif kind == 'env':
+            import os
+            return os.getenv(argument, '')
+        elif kind == 'now':
+            from django.utils import timezone
+            return timezone.now().isoformat()
+        elif kind == 'timestamp':
+            return str(int(time.time()))
+        
+        return ''
+    
+    def _evaluate_expression(self, expression: str, context: Dict[str, Any], input_data: Dict[str, Any]) -> Any:
+        """
+        Evaluate a variable expression
+        
+        Args:
+            expression: Variable expression to evaluate
+            context: Execution context
+            input_data: Input data
+            
+        Returns:
+            Evaluated value
+        """
+        return self._evaluate_accessor(self._compile_expression(expression), context, input_data)
     
     def _get_nested_value(self, data: Dict[str, Any], path: str) -> Any:
         """
@@ -77,11 +315,24 @@ class VariableResolver:
             data: Data dictionary
             path: Dot-separated path
             
+        Returns:
+            Value at path or empty string if not found
+        """
+        return self._get_path_value(data, path.split('.'))
+    
+    def _get_path_value(self, data: Dict[str, Any], parts) -> Any:
+        """
+        Get nested value from pre-split path parts
+        
+        Args:
+            data: Data dictionary
+            parts: Path components
+            
         Returns:
             Value at path or empty string if not found
         """
         current = data
-        for part in path.split('.'):
+        for part in parts:
             if isinstance(current, dict) and part in current:
                 current = current[part]
             elif isinstance(current, list) and part.isdigit():
@@ -95,8 +346,60 @@ class VariableResolver:
         
         return current
 
+class UnsafeExpressionError(ValueError):
+    """Raised when an expression uses syntax outside the evaluator's allow-list"""
+
+class RejectedExpression:
+    """
+    Cached rejection of an expression: the error type and arguments, so
+    each call raises a fresh exception instead of re-raising one instance
+    (whose traceback would keep growing and hold on to every context).
+    """
+    
+    __slots__ = ('error_type', 'args')
+    
+    def __init__(self, error: Exception):
+        self.error_type = type(error)
+        self.args = error.args
+    
+    def error(self) -> Exception:
+        return self.error_type(*self.args)
+
 class ExpressionEvaluator:
-    """Safely evaluates expressions in workflow configurations"""
+    """
+    Safely evaluates expressions in workflow configurations
+    
+    Expressions are parsed once, checked against an allow-list of AST nodes
+    and compiled; the code objects are cached by expression text. Context
+    values are looked up through the context mapping itself rather than a
+    merged copy.
+    """
+    
+    ALLOWED_NODES = (
+        ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Store,
+        ast.BoolOp, ast.And, ast.Or,
+        ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+        ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+        ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+        ast.In, ast.NotIn, ast.Is, ast.IsNot,
+        ast.IfExp, ast.Call, ast.keyword, ast.Attribute, ast.Subscript, ast.Slice,
+        ast.List, ast.Tuple, ast.Dict, ast.Set,
+        ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp, ast.comprehension,
+    )
+    
+    COMPREHENSION_NODES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+    
+    # The only attributes an expression may use, i.e. the methods it may call on
+    # values. Any other attribute could reach interpreter internals such as
+    # generator frames (gi_frame.f_globals).
+    ALLOWED_METHODS = frozenset({
+        'get', 'keys', 'values', 'items', 'count', 'index',
+        'lower', 'upper', 'strip', 'lstrip', 'rstrip', 'split', 'join', 'replace',
+        'startswith', 'endswith', 'isdigit',
+    })
+    
+    # Compiled expressions shared by every evaluator, keyed by expression text
+    _compiled_expressions = LRUCache(max_size=2048)
     
     def __init__(self):
         self.allowed_functions = {
@@ -111,6 +414,7 @@ class ExpressionEvaluator:
             'sum': sum,
             'round': round,
         }
+        self._globals = {'__builtins__': {}, **self.allowed_functions}
     
     def evaluate(self, expression: str, context: Dict[str, Any]) -> Any:
         """
@@ -121,23 +425,85 @@ class ExpressionEvaluator:
             context: Context variables
             
         Returns:
-            Evaluated result
+            Evaluated result, or the original expression if it is not allowed
+            or fails to evaluate
         """
-        # This is a simplified evaluator
-        # In production, you'd want a more robust and secure expression evaluator
         try:
-            # Create a safe evaluation context
-            safe_context = {
-                '__builtins__': {},
-                **self.allowed_functions,
-                **context
-            }
-            
-            # Evaluate the expression
-            return eval(expression, safe_context)
-        except Exception as e:
+            code, uses_comprehension = self.compile(expression)
+            
+            if uses_comprehension:
+                # Comprehension scopes only see globals, so context names must be there
+                return eval(code, {**self._globals, **context})
+            
+            # Context names take precedence over the allowed functions, as locals
+            return eval(code, self._globals, context)
+        except Exception:
             # Return the original expression if evaluation fails
             return expression
+    
+    def compile(self, expression: str) -> Tuple[Any, bool]:
+        """
+        Parse, validate and compile an expression, reusing the cached result
+        
+        Args:
+            expression: Expression to compile
+            
+        Returns:
+            Tuple of (code object, whether the expression uses comprehensions)
+            
+        Raises:
+            SyntaxError: If the expression cannot be parsed
+            UnsafeExpressionError: If the expression uses disallowed syntax
+        """
+        compiled = self._compiled_expressions.get(expression)
+        
+        if compiled is None:
+            try:
+                tree = ast.parse(expression.strip(), mode='eval')
+                uses_comprehension = self._validate(tree)
+                compiled = (compile(tree, '<expression>', 'eval'), uses_comprehension)
+            except (SyntaxError, UnsafeExpressionError) as e:
+                # Rejections are cached too, so bad expressions are not re-parsed
+                compiled = RejectedExpression(e)
+            self._compiled_expressions.set(expression, compiled)
+        
+        if isinstance(compiled, RejectedExpression):
+            raise compiled.error()
+        
+        return compiled
+    
+    def _validate(self, tree: ast.AST) -> bool:
+        """
+        Check every node of a parsed expression against the allow-list
+        
+        Args:
+            tree: Parsed expression
+            
+        Returns:
+            True if the expression uses comprehensions
+            
+        Raises:
+            UnsafeExpressionError: On the first disallowed node
+        """
+        uses_comprehension = False
+        
+        for node in ast.walk(tree):
+            if not isinstance(node, self.ALLOWED_NODES):
+                raise UnsafeExpressionError(f"{type(node).__name__} is not allowed in expressions")
+            
+            if isinstance(node, ast.Name) and node.id.startswith('__'):
+                raise UnsafeExpressionError(f"Name '{node.id}' is not allowed in expressions")
+            
+            if isinstance(node, ast.Attribute) and node.attr not in self.ALLOWED_METHODS:
+                raise UnsafeExpressionError(f"Attribute '{node.attr}' is not allowed in expressions")
+            
+            if isinstance(node, ast.Call) and not isinstance(node.func, (ast.Attribute, ast.Name)):
+                raise UnsafeExpressionError("Only named functions and allowed methods can be called")
+            
+            if isinstance(node, self.COMPREHENSION_NODES):
+                uses_comprehension = True
+        
+        return uses_comprehension
 
 class DataValidator:
     """Validates data against schemas"""
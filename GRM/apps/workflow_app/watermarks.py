@@ -0,0 +1,218 @@
+"""
+Incremental fetch - keyset pagination from a per-workflow high-water mark
+"""
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+from django.conf import settings
+from django.db import transaction
+
+from .models import WorkflowWatermark
+
+logger = logging.getLogger(__name__)
+
+# Keyset of each watermark column: the ordering columns, unique together,
+# that a mark on that column pages through
+KEYSETS = {
+    'request_master_id': ['request_master_id'],
+    'requested_date': ['requested_date', 'request_master_id'],
+}
+
+def incremental_batch_size(config: Dict[str, Any]) -> int:
+    """Rows fetched per keyset page"""
+    batch_size = config.get('batch_size') or getattr(settings, 'WORKFLOW_INCREMENTAL_BATCH_SIZE', 1000)
+    try:
+        return max(1, int(batch_size))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid batch_size: {batch_size}")
+
+def get_watermark(workflow_id: Optional[str], key: str, column: str) -> Optional[List[Any]]:
+    """
+    Last position read by a workflow's incremental fetch
+
+    Args:
+        workflow_id: Workflow ID from the execution context
+        key: Watermark key
+        column: Watermark column; a mark kept for another column is ignored
+
+    Returns:
+        Keyset values of the last row read, or None to start from the beginning
+    """
+    if not workflow_id:
+        return None
+
+    mark = WorkflowWatermark.objects.filter(workflow_id=workflow_id, key=key).first()
+    if mark is None or mark.column != column or not mark.position:
+        return None
+    return list(mark.position)
+
+def keyset_predicate(columns: List[str], position: List[Any]) -> Tuple[str, List[Any]]:
+    """
+    WHERE predicate for the rows after a position, in keyset order
+
+    Args:
+        columns: Qualified keyset columns, e.g. ['rm.requested_date', 'rm.request_master_id']
+        position: Values of the last row read
+
+    Returns:
+        Tuple of (sql, params); (a > x OR (a = x AND b > y)) for two columns
+    """
+    terms = []
+    params = []
+    for index, column in enumerate(columns):
+        equal = [f"{columns[i]} = %s" for i in range(index)]
+        terms.append('(' + ' AND '.join(equal + [f"{column} > %s"]) + ')')
+        params.extend(position[:index] + [position[index]])
+    return '(' + ' OR '.join(terms) + ')', params
+
+def fetch_incremental(
+    cursor,
+    query: str,
+    params: List[Any],
+    columns: List[str],
+    position: Optional[List[Any]],
+    batch_size: int,
+    max_rows: int = 0
+) -> Tuple[List[str], List[tuple], Optional[List[Any]], int]:
+    """
+    Read the rows after a position, one keyset page at a time
+
+    Each page is a separate LIMIT query starting after the last row of the
+    previous one, so every page is an index range scan however far the
+    table has grown, and the cost of a run follows the number of new rows.
+
+    Args:
+        cursor: Database cursor
+        query: SELECT ending in its WHERE clause (the keyset predicate is appended)
+        params: Parameters of the query
+        columns: Qualified keyset columns, also selected by the query
+        position: Position to start after, or None for the beginning
+        batch_size: Rows per page
+        max_rows: Rows to read at most in this run (0 reads all new rows)
+
+    Returns:
+        Tuple of (column names, rows, position of the last row read, pages)
+    """
+    # A NULL key would end up as the position and match no later row
+    query += ''.join(f" AND {column} IS NOT NULL" for column in columns)
+    order_by = ', '.join(f"{column} ASC" for column in columns)
+    names = [column.split('.')[-1] for column in columns]
+    result_columns = []
+    rows = []
+    pages = 0
+
+    while True:
+        limit = batch_size if not max_rows else min(batch_size, max_rows - len(rows))
+        if limit <= 0:
+            break
+
+        page_query = query
+        page_params = list(params)
+        if position is not None:
+            predicate, predicate_params = keyset_predicate(columns, position)
+            page_query += f" AND {predicate}"
+            page_params.extend(predicate_params)
+        page_query += f" ORDER BY {order_by} LIMIT {limit}"
+
+        cursor.execute(page_query, page_params)
+        result_columns = [col[0] for col in cursor.description]
+        page = cursor.fetchall()
+        pages += 1
+
+        if page:
+            rows.extend(page)
+            last = dict(zip(result_columns, page[-1]))
+            position = [_position_value(last[name]) for name in names]
+        if len(page) < limit:
+            break
+
+    return result_columns, rows, position, pages
+
+def read_incremental(
+    cursor,
+    config: Dict[str, Any],
+    context: Dict[str, Any],
+    query: str,
+    params: List[Any],
+    table_alias: str
+) -> Tuple[List[str], List[tuple], Dict[str, Any], int]:
+    """
+    Read the rows a node has not read in earlier successful executions
+
+    Args:
+        cursor: Database cursor
+        config: Node configuration (watermark_key, watermark_column, batch_size, max_rows)
+        context: Execution context
+        query: SELECT ending in its WHERE clause
+        params: Parameters of the query
+        table_alias: Alias of the table the keyset columns belong to
+
+    Returns:
+        Tuple of (column names, rows, watermark entry for the node result, pages)
+    """
+    key = config.get('watermark_key') or 'default'
+    column = config.get('watermark_column') or 'request_master_id'
+    if column not in KEYSETS:
+        raise ValueError(f"Unsupported watermark column: {column}")
+
+    try:
+        max_rows = max(0, int(config.get('max_rows') or 0))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid max_rows: {config.get('max_rows')}")
+
+    position = get_watermark(context.get('workflow_id'), key, column)
+    columns, rows, position, pages = fetch_incremental(
+        cursor,
+        query,
+        params,
+        [f"{table_alias}.{name}" for name in KEYSETS[column]],
+        position,
+        incremental_batch_size(config),
+        max_rows
+    )
+    return columns, rows, watermark_output(key, column, position), pages
+
+def watermark_output(key: str, column: str, position: Optional[List[Any]]) -> Dict[str, Any]:
+    """Watermark entry of a node result, committed when the execution succeeds"""
+    return {'key': key, 'column': column, 'position': position}
+
+def commit_watermarks(workflow_id: str, execution_id: str, node_results: Dict[str, Any]):
+    """
+    Advance the marks of the incremental fetch nodes of a successful execution
+
+    Marks are only stored once every node has run, so the rows of a failed
+    execution are read again by the next one. A mark never moves backwards.
+
+    Args:
+        workflow_id: Workflow ID
+        execution_id: Execution ID
+        node_results: Results of the execution's nodes
+    """
+    for node_id, result in node_results.items():
+        watermark = result.get('watermark') if isinstance(result, dict) else None
+        if not isinstance(watermark, dict) or not watermark.get('position'):
+            continue
+
+        try:
+            with transaction.atomic():
+                mark, created = WorkflowWatermark.objects.select_for_update().get_or_create(
+                    workflow_id=workflow_id,
+                    key=watermark['key'],
+                    defaults={'column': watermark['column'], 'position': watermark['position'], 'execution_id': execution_id}
+                )
+                if created:
+                    continue
+                if mark.column == watermark['column'] and mark.position and list(mark.position) >= list(watermark['position']):
+                    continue
+
+                mark.column = watermark['column']
+                mark.position = watermark['position']
+                mark.execution_id = execution_id
+                mark.save()
+        except Exception as e:
+            logger.error(f"Failed to store watermark of node {node_id}: {str(e)}")
+
+def _position_value(value: Any) -> Any:
+    """JSON-storable keyset value; dates keep the database's text format"""
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return str(value)
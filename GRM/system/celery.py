@@ -27,6 +27,15 @@ app.conf.beat_schedule = {
         'task': 'apps.workflow_app.tasks.cleanup_old_executions',
         'schedule': 3600.0,  # Run every hour
     },
+    'refresh-payment-lookup': {
+        'task': 'apps.workflow_app.tasks.refresh_payment_lookup_task',
+        'schedule': 300.0,  # Run every 5 minutes
+    },
+    'refresh-payment-lookup-full': {
+        'task': 'apps.workflow_app.tasks.refresh_payment_lookup_task',
+        'schedule': 3600.0,  # Run every hour (picks up rows changed in place)
+        'kwargs': {'full': True},
+    },
 }
 
 app.conf.timezone = 'UTC'
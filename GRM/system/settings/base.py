@@ -318,4 +318,123 @@ REST_FRAMEWORK = {
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'django-db' # Use the alias 'django-db' with a hyphen
 
-CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
\ No newline at end of file
+CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+
+# Workflow engine settings
+# 'sequential' runs nodes one at a time, 'parallel' runs independent branches concurrently
+WORKFLOW_EXECUTION_MODE = 'sequential'
+WORKFLOW_MAX_PARALLEL_NODES = 8
+# Number of compiled execution plans kept in memory per process
+WORKFLOW_PLAN_CACHE_SIZE = 256
+# 'immediate' saves each NodeExecution as the node finishes, 'buffered' writes them
+# in bulk every WORKFLOW_NODE_BUFFER_SIZE records / WORKFLOW_NODE_BUFFER_FLUSH_SECONDS
+# and when the execution ends
+WORKFLOW_NODE_PERSISTENCE = 'immediate'
+WORKFLOW_NODE_BUFFER_SIZE = 100
+WORKFLOW_NODE_BUFFER_FLUSH_SECONDS = 10
+# AsyncWorkflowEngine: executions in flight per event loop, and threads for sync handlers
+# (each thread keeps its DB connections until the engine is closed, or for CONN_MAX_AGE when set)
+WORKFLOW_ASYNC_MAX_EXECUTIONS = 100
+WORKFLOW_ASYNC_SYNC_WORKERS = 32
+# Node result cache (nodes opt in with cache_ttl): process-local entries and Django cache alias
+WORKFLOW_NODE_CACHE_SIZE = 512
+WORKFLOW_NODE_CACHE_ALIAS = 'default'
+# Record count from which data_transform nodes use the NumPy columnar path (if installed)
+WORKFLOW_COLUMNAR_MIN_ROWS = 10000
+# Records per batch for nodes configured with stream: true (unless they set batch_size)
+WORKFLOW_STREAM_BATCH_SIZE = 1000
+# Rows per multi-row INSERT statement of database_save nodes (unless they set chunk_size)
+WORKFLOW_SAVE_CHUNK_ROWS = 1000
+# Approximate maximum size of the values in one database_save INSERT statement
+WORKFLOW_SAVE_MAX_STATEMENT_BYTES = 1000000
+# GRM payment checks read precomputed results from pnr_payment_lookup (refresh_payment_lookup keeps it current).
+# Off by default: source rows changed in place reach the table only with the next full refresh, so results
+# may differ from the live query until then.
+WORKFLOW_GRM_PAYMENT_LOOKUP = False
+# Seconds a lookup row is trusted after its last refresh; older rows fall back to the live query.
+# Keep it above the interval of the full refresh in the beat schedule (system/celery.py).
+WORKFLOW_GRM_PAYMENT_LOOKUP_MAX_AGE = 7200
+# A full refresh recomputes the PNRs of pnr_blocking_details rows created within this many days;
+# lookup rows of older PNRs are dropped, and their checks use the live query
+WORKFLOW_GRM_PAYMENT_LOOKUP_FULL_REFRESH_DAYS = 30
+# Connection pools for database node handlers (off: handlers use Django's per-thread connection).
+# Pooled connections are separate from the request/task connection, so their queries run outside its transactions.
+WORKFLOW_DB_POOL_ENABLED = False
+WORKFLOW_DB_POOL_ALIASES = ('default', 'grm')
+WORKFLOW_DB_POOL_MIN_SIZE = 1
+WORKFLOW_DB_POOL_MAX_SIZE = 10
+# Seconds before a pooled connection is replaced, idle seconds before it is pinged on checkout,
+# and seconds to wait for a free connection when the pool is full
+WORKFLOW_DB_POOL_RECYCLE_SECONDS = 3600
+WORKFLOW_DB_POOL_HEALTH_CHECK_AFTER = 30
+WORKFLOW_DB_POOL_TIMEOUT = 30
+# Database alias that read-only data nodes query (None: everything goes to 'default').
+# Add it to WORKFLOW_DB_POOL_ALIASES to pool its connections.
+WORKFLOW_READ_REPLICA = None
+# Reads fall back to 'default' while the replica lags more than this or replication is stopped
+WORKFLOW_REPLICA_MAX_LAG_SECONDS = 30
+# Seconds between replica lag checks
+WORKFLOW_REPLICA_CHECK_INTERVAL = 10
+# Query returning the replica lag in seconds (None: SHOW REPLICA STATUS)
+WORKFLOW_REPLICA_LAG_QUERY = None
+# Query result cache for query_builder nodes with query_cache: true (Django cache alias, process-local entries).
+# Writes through database_query/database_save invalidate the tables they touch; with the default
+# per-process cache backend that invalidation only reaches the writing process, so share a cache (Redis) across workers.
+WORKFLOW_QUERY_CACHE_ALIAS = 'default'
+WORKFLOW_QUERY_CACHE_SIZE = 256
+# Seconds a result may be cached, per table read (the shortest applies; 0 disables caching for a table)
+WORKFLOW_QUERY_CACHE_DEFAULT_TTL = 60
+WORKFLOW_QUERY_CACHE_TABLE_TTLS = {}
+# Results larger than this (pickled bytes) are not cached
+WORKFLOW_QUERY_CACHE_MAX_BYTES = 1000000
+
+# Rows per keyset page of incremental fetch nodes (overridable per node with batch_size)
+WORKFLOW_INCREMENTAL_BATCH_SIZE = 1000
+
+# Keep-alive HTTP sessions shared by the HTTP request, webhook and Slack nodes, one per host
+WORKFLOW_HTTP_POOL_ENABLED = True
+# Connections kept alive per host
+WORKFLOW_HTTP_POOL_MAXSIZE = 10
+# Requests in flight to one host per process; further requests wait for a slot
+WORKFLOW_HTTP_MAX_CONCURRENCY_PER_HOST = 10
+# Seconds to wait for a slot when the request sets no timeout
+WORKFLOW_HTTP_ACQUIRE_TIMEOUT = 30
+# Hosts with a session; the least recently used idle one is closed beyond this
+WORKFLOW_HTTP_MAX_HOSTS = 100
+# Retries of connection errors and of these statuses (statuses only for idempotent methods)
+WORKFLOW_HTTP_RETRIES = 2
+WORKFLOW_HTTP_RETRY_BACKOFF = 0.5
+WORKFLOW_HTTP_RETRY_STATUSES = (502, 503, 504)
+# Requests per second allowed per host in this process, e.g. {'api.partner.com': 50}
+WORKFLOW_HTTP_RATE_LIMITS = {}
+# Requests in flight per HTTP request node in for-each mode, unless the node sets concurrency
+WORKFLOW_HTTP_FOR_EACH_CONCURRENCY = 8
+
+# HTTP response cache for GET requests of http_request nodes with http_cache: true. Entries live in
+# the Django cache alias below (point it at a Redis-backed cache to share them between workers) with
+# a process-local copy kept for WORKFLOW_HTTP_CACHE_LOCAL_TTL seconds.
+WORKFLOW_HTTP_CACHE_ALIAS = 'default'
+WORKFLOW_HTTP_CACHE_SIZE = 256
+WORKFLOW_HTTP_CACHE_LOCAL_TTL = 60
+# Responses with an ETag/Last-Modified are kept this long past their freshness for revalidation
+WORKFLOW_HTTP_CACHE_RETAIN_SECONDS = 86400
+# Response bodies larger than this (bytes) are not cached
+WORKFLOW_HTTP_CACHE_MAX_BYTES = 1000000
+
+# Opened (logged-in) mail connections reused by email nodes within a worker
+WORKFLOW_EMAIL_POOL_ENABLED = True
+WORKFLOW_EMAIL_POOL_MAX_SIZE = 4
+# Idle connections older than this are closed instead of reused (servers drop idle sessions)
+WORKFLOW_EMAIL_POOL_MAX_IDLE_SECONDS = 60
+# Messages after which a connection is replaced (servers cap messages per session)
+WORKFLOW_EMAIL_POOL_MAX_MESSAGES = 100
+# Seconds to wait for a free connection when the pool is full
+WORKFLOW_EMAIL_POOL_TIMEOUT = 30
+# Connections an email node in batch mode spreads its messages over, unless the node sets connections
+WORKFLOW_EMAIL_BATCH_CONNECTIONS = 3
+
+# split_in_batches nodes: items per chunk and chunks run at a time, unless the node sets batch_size/parallelism
+WORKFLOW_BATCH_SIZE = 100
+WORKFLOW_BATCH_PARALLELISM = 4
+# Chunks of a batch whose body nodes create NodeExecution records; later chunks only count towards the merge node
+WORKFLOW_BATCH_RECORDED_CHUNKS = 3